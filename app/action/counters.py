@@ -0,0 +1,133 @@
+"""
+Maintained per-target action counts (action_counts), kept in step with action_logs.
+
+Writers pass deltas keyed by (target_type, target_id, action_type) inside the
+transaction that changes action_logs; readers look counts up by primary key
+instead of counting log rows. ``reconcile_action_counts`` repairs any drift.
+"""
+from collections import defaultdict
+from typing import Dict, List, Tuple
+from sqlalchemy import and_, case, exists, func, select, tuple_, update
+from sqlalchemy.orm import Session, aliased
+from database import dialect_insert
+from . import models
+
+CountKey = Tuple[str, int, str]
+
+
+def adjust_action_counts(db: Session, deltas: Dict[CountKey, int]) -> None:
+    """Apply per-target action count deltas: one upsert for increments, one UPDATE per decrement size"""
+    counts = models.ActionCount
+    # Sorted keys make concurrent writers lock count rows in the same order
+    increments = sorted((key, amount) for key, amount in deltas.items() if amount > 0)
+    if increments:
+        stmt = dialect_insert(db, counts).values([
+            {"target_type": target_type, "target_id": target_id, "action_type": action_type, "count": amount}
+            for (target_type, target_id, action_type), amount in increments
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[counts.target_type, counts.target_id, counts.action_type],
+            set_={"count": counts.count + stmt.excluded.count}
+        )
+        db.execute(stmt)
+
+    decrements = defaultdict(list)
+    for key, amount in sorted(deltas.items()):
+        if amount < 0:
+            decrements[-amount].append(key)
+    for amount, keys in decrements.items():
+        value = case((counts.count > amount, counts.count - amount), else_=0)
+        db.execute(
+            update(counts)
+            .where(tuple_(counts.target_type, counts.target_id, counts.action_type).in_(keys))
+            .values(count=value),
+            execution_options={"synchronize_session": False}
+        )
+
+
+def get_action_counts(
+    db: Session,
+    target_type: str,
+    target_ids: List[int],
+    action_types: List[str]
+) -> Dict[int, Dict[str, int]]:
+    """Counts per target id and action type, with 0 for pairs that have no row"""
+    counts = models.ActionCount
+    rows = db.query(counts.target_id, counts.action_type, counts.count).filter(
+        counts.target_type == target_type,
+        counts.target_id.in_(target_ids),
+        counts.action_type.in_(action_types)
+    ).all()
+    result = {target_id: dict.fromkeys(action_types, 0) for target_id in target_ids}
+    for target_id, action_type, count in rows:
+        result[target_id][action_type] = count
+    return result
+
+
+def get_action_count(db: Session, target_type: str, target_id: int, action_type: str) -> int:
+    count = db.query(models.ActionCount.count).filter(
+        models.ActionCount.target_type == target_type,
+        models.ActionCount.target_id == target_id,
+        models.ActionCount.action_type == action_type
+    ).scalar()
+    return count or 0
+
+
+def reconcile_action_counts(db: Session) -> int:
+    """Correct counts that differ from action_logs, returning how many rows were repaired.
+
+    The error is measured in one snapshot and added to the stored count, never
+    written over it: the update applies to the latest row version, so actions
+    committed while this runs keep their increments. View counts are running
+    totals of view_logs, whose old partitions expire, so they are left alone.
+    """
+    logs, counts = models.ActionLog, models.ActionCount
+    stored = aliased(counts, name="stored")
+    actual = (
+        select(logs.target_type, logs.target_id, logs.action_type, func.count().label("count"))
+        .where(logs.is_on == True, logs.action_type != "view")
+        .group_by(logs.target_type, logs.target_id, logs.action_type)
+        .subquery("actual")
+    )
+    error = actual.c.count - func.coalesce(stored.count, 0)
+    drifted = (
+        select(actual.c.target_type, actual.c.target_id, actual.c.action_type, error)
+        .select_from(actual.outerjoin(stored, and_(
+            stored.target_type == actual.c.target_type,
+            stored.target_id == actual.c.target_id,
+            stored.action_type == actual.c.action_type
+        )))
+        .where(error != 0)
+    )
+    stmt = dialect_insert(db, counts).from_select(
+        ["target_type", "target_id", "action_type", "count"], drifted
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[counts.target_type, counts.target_id, counts.action_type],
+        set_={"count": counts.count + stmt.excluded.count}
+    )
+    repaired = db.execute(stmt).rowcount
+
+    # Counts left behind for targets with no active actions
+    has_actions = exists().where(and_(
+        logs.target_type == stored.target_type,
+        logs.target_id == stored.target_id,
+        logs.action_type == stored.action_type,
+        logs.is_on == True
+    ))
+    stale = (
+        select(stored.target_type, stored.target_id, stored.action_type, stored.count)
+        .where(stored.count != 0, stored.action_type != "view", ~has_actions)
+        .subquery("stale")
+    )
+    repaired += db.execute(
+        update(counts)
+        .where(
+            counts.target_type == stale.c.target_type,
+            counts.target_id == stale.c.target_id,
+            counts.action_type == stale.c.action_type
+        )
+        .values(count=counts.count - stale.c.count),
+        execution_options={"synchronize_session": False}
+    ).rowcount
+    return repaired
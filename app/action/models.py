@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, CheckConstraint, Index, Integer
+from sqlalchemy import DDL, Column, FetchedValue, String, DateTime, Boolean, ForeignKey, CheckConstraint, Index, Integer, event
 from sqlalchemy.sql import func
 from database import Base
 
@@ -17,5 +17,57 @@ class ActionLog(Base):
     __table_args__ = (
         CheckConstraint("action_type IN ('view', 'like', 'bookmark', 'report')", name='check_action_type'),
         CheckConstraint("target_type IN ('post', 'comment')", name='check_target_type'),
-        Index('idx_action_logs_target', 'target_type', 'target_id'),
+        # Keyset pagination of a user's and a target's history, newest first
+        Index('idx_action_logs_user_action_created', user_id, action_type, created_at.desc(), id.desc()),
+        Index('idx_action_logs_target_action_created', target_type, target_id, action_type, created_at.desc(), id.desc()),
+        Index('uq_action_logs_user_action_target', 'user_id', 'action_type', 'target_type', 'target_id', unique=True),
+        Index('idx_action_logs_user_target', 'user_id', 'target_type', 'target_id'),
     )
+
+
+class ViewLog(Base):
+    """Append-only view actions, range partitioned by month on created_at (see partitions.py).
+
+    Views are kept apart from action_logs so old months can be dropped as whole
+    partitions; action_logs keeps the unique (user, action, target) upsert key,
+    which a table partitioned by created_at could not enforce.
+    """
+    __tablename__ = "view_logs"
+
+    # On PostgreSQL drawn from action_logs' sequence so an id names one row across both tables;
+    # elsewhere the table numbers its own rows (see ActionLogService._log_views)
+    id = Column(Integer, primary_key=True, autoincrement=False, server_default=FetchedValue())
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    target_type = Column(String(50), nullable=False)
+    target_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+
+    # Read like an ActionLog row
+    action_type = "view"
+    is_on = True
+
+    __table_args__ = (
+        CheckConstraint("target_type IN ('post', 'comment')", name='check_view_target_type'),
+        Index('idx_view_logs_user_target', 'user_id', 'target_type', 'target_id', 'created_at'),
+        Index('idx_view_logs_target', 'target_type', 'target_id', 'created_at'),
+        Index('idx_view_logs_user_created', user_id, created_at.desc(), id.desc()),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
+
+
+# The id default needs action_logs_id_seq, which is created with action_logs
+ViewLog.__table__.add_is_dependent_on(ActionLog.__table__)
+event.listen(
+    ViewLog.__table__, "after_create",
+    DDL("ALTER TABLE view_logs ALTER COLUMN id SET DEFAULT nextval('action_logs_id_seq')").execute_if(dialect="postgresql")
+)
+
+
+class ActionCount(Base):
+    """Number of active (is_on) actions of one type on a target, maintained alongside action_logs"""
+    __tablename__ = "action_counts"
+
+    target_type = Column(String(50), primary_key=True)
+    target_id = Column(Integer, primary_key=True)
+    action_type = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
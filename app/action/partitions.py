@@ -0,0 +1,96 @@
+"""
+Monthly range partitions of view_logs and their retention.
+
+Each UTC month of view events lives in its own partition, view_logs_YYYY_MM.
+``maintain_partitions`` creates partitions ahead of time, since an insert with
+no partition to land in fails, and drops (or detaches, for archiving) the
+partitions that have fallen out of the retention window. Databases without
+declarative partitioning keep one plain table and delete expired rows instead.
+"""
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from . import models
+
+PARENT = "view_logs"
+# What happens to partitions past the retention window
+EXPIRED_ACTIONS = ("drop", "detach")
+
+
+def month_start(value: datetime) -> datetime:
+    value = value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{PARENT}_{month:%Y_%m}"
+
+
+def create_partition(db, month: datetime) -> None:
+    db.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARENT} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    ))
+
+
+def attached_partitions(db) -> List[str]:
+    return [row[0] for row in db.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = CAST(:parent AS regclass)"
+    ), {"parent": PARENT})]
+
+
+def maintain_partitions(
+    db: Session,
+    retention_months: int,
+    months_ahead: int,
+    expired: str = "drop",
+    now: Optional[datetime] = None
+) -> Dict[str, List[str]]:
+    """Create upcoming partitions and drop or detach expired ones; the caller commits"""
+    if expired not in EXPIRED_ACTIONS:
+        raise ValueError(f"Unknown expired partition action: {expired}")
+    current = month_start(now or datetime.now(timezone.utc))
+    oldest_kept = add_months(current, -retention_months) if retention_months > 0 else None
+
+    if db.get_bind().dialect.name != "postgresql":
+        if oldest_kept is not None:
+            db.query(models.ViewLog).filter(models.ViewLog.created_at < oldest_kept).delete(synchronize_session=False)
+        return {"created": [], "removed": []}
+
+    existing = set(attached_partitions(db))
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if partition_name(month) not in existing:
+            create_partition(db, month)
+            created.append(partition_name(month))
+
+    removed = []
+    if oldest_kept is not None:
+        # Names sort by month, so everything before the oldest kept month has expired
+        for name in sorted(existing):
+            if name.startswith(f"{PARENT}_") and name < partition_name(oldest_kept):
+                if expired == "detach":
+                    db.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+                elif expired == "drop":
+                    db.execute(text(f"DROP TABLE {name}"))
+                removed.append(name)
+    return {"created": created, "removed": removed}
+
+
+def ensure_view_log_partitions(engine, months_ahead: int) -> None:
+    """Create this month's partition and the next ones, so a fresh database accepts views right away"""
+    if engine.dialect.name != "postgresql":
+        return
+    current = month_start(datetime.now(timezone.utc))
+    with engine.begin() as conn:
+        for offset in range(months_ahead + 1):
+            create_partition(conn, add_months(current, offset))
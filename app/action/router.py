@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from database import get_db
+from app.batch import MAX_BATCH_IDS, parse_ids
+from app.pagination import MAX_PAGE_SIZE, set_next_cursor
 from . import schemas, service
 
 router = APIRouter(prefix="/actions", tags=["action-logs"])
@@ -12,6 +14,56 @@ def create_action_log(action_log: schemas.ActionLogCreate, db: Session = Depends
     return service.ActionLogService.create_action_log(db=db, action_log=action_log)
 
 
+@router.post("/batch",
+             response_model=schemas.ActionLogBatchResponse,
+             summary="Record many actions at once",
+             description=f"""
+Apply up to {schemas.MAX_BATCH_ACTIONS} actions in one transaction with a single multi-row upsert.
+
+- Each action sets `is_on` for its (user, action type, target) key, like `POST /actions/`
+- When a key appears more than once, the last action wins and the earlier ones are reported as `superseded`
+- Post like counts are updated in the same transaction
+
+Returns one result per action, in request order.
+             """,
+             response_description="Per-action results")
+def create_action_logs_batch(batch: schemas.ActionLogBatchCreate, db: Session = Depends(get_db)):
+    results = service.ActionLogService.create_action_logs_batch(db=db, actions=batch.actions)
+    return schemas.ActionLogBatchResponse(results=[
+        schemas.ActionLogBatchItem(
+            index=index, status=status, action_log=schemas.ActionLogResponse.model_validate(db_action_log)
+        )
+        for index, (status, db_action_log) in enumerate(results)
+    ])
+
+
+@router.post("/state",
+             response_model=List[schemas.ActionStateResponse],
+             summary="Get a viewer's action state for many targets",
+             description=f"""
+Look up which actions a user has on for up to {schemas.MAX_STATE_TARGETS} targets, e.g. to render
+like and bookmark icons for a feed page.
+
+- **viewer_id**: The user whose actions are looked up
+- **targets**: (target_type, target_id) pairs
+
+Returns one entry per distinct target, in request order, with a flag for every action type.
+Results may be cached per worker for a few seconds.
+             """,
+             response_description="Action flags per target")
+def get_action_states(state_request: schemas.ActionStateRequest, db: Session = Depends(get_db)):
+    targets = list(dict.fromkeys((target.target_type.value, target.target_id) for target in state_request.targets))
+    states = service.ActionLogService.get_action_states(db, user_id=state_request.viewer_id, targets=targets)
+    return [
+        {
+            "target_type": target_type,
+            "target_id": target_id,
+            "flags": {action_type.value: action_type.value in states[(target_type, target_id)] for action_type in schemas.ActionType}
+        }
+        for target_type, target_id in targets
+    ]
+
+
 @router.post("/toggle", response_model=schemas.ActionLogResponse)
 def toggle_action(
     user_id: int,
@@ -37,11 +89,25 @@ def toggle_action(
 @router.get("/user/{user_id}", response_model=List[schemas.ActionLogResponse])
 def get_user_actions(
     user_id: int,
+    response: Response,
     action_type: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    paginate: str = "offset",
     db: Session = Depends(get_db)
 ):
+    # Cursor mode: pass paginate=cursor for the first page, then the X-Next-Cursor header value as cursor
+    if cursor or paginate == "cursor":
+        try:
+            actions, next_cursor = service.ActionLogService.get_user_actions_cursor(
+                db, user_id=user_id, action_type=action_type, cursor=cursor, limit=limit
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        set_next_cursor(response, next_cursor)
+        return actions
+
     actions = service.ActionLogService.get_user_actions(
         db, user_id=user_id, action_type=action_type, skip=skip, limit=limit
     )
@@ -52,14 +118,27 @@ def get_user_actions(
 def get_target_actions(
     target_type: str,
     target_id: int,
+    response: Response,
     action_type: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    paginate: str = "offset",
     db: Session = Depends(get_db)
 ):
     if target_type not in ["post", "comment"]:
         raise HTTPException(status_code=400, detail="Invalid target type")
     
+    if cursor or paginate == "cursor":
+        try:
+            actions, next_cursor = service.ActionLogService.get_target_actions_cursor(
+                db, target_type=target_type, target_id=target_id, action_type=action_type, cursor=cursor, limit=limit
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        set_next_cursor(response, next_cursor)
+        return actions
+
     actions = service.ActionLogService.get_target_actions(
         db, target_type=target_type, target_id=target_id, action_type=action_type, skip=skip, limit=limit
     )
@@ -84,6 +163,44 @@ def get_action_count(
     return {"count": count}
 
 
+@router.get("/counts",
+            response_model=List[schemas.ActionCountsResponse],
+            summary="Get action counts for many targets",
+            description="""
+Retrieve maintained action counts for a batch of targets in one request.
+
+- **target_type**: Type of the targets (post or comment)
+- **target_ids**: Comma separated target IDs (max 100)
+- **action_types**: Comma separated action types to count (default: all)
+
+Results are returned in the order of `target_ids`; targets without actions have zero counts.
+            """,
+            response_description="Counts per target")
+def get_action_counts(
+    target_type: str,
+    target_ids: str,
+    action_types: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    if target_type not in ["post", "comment"]:
+        raise HTTPException(status_code=400, detail="Invalid target type")
+    try:
+        ids = parse_ids(target_ids, max_ids=MAX_BATCH_IDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    types = [action_type.value for action_type in schemas.ActionType]
+    if action_types is not None:
+        types = list(dict.fromkeys(part.strip() for part in action_types.split(",") if part.strip()))
+        if not types or any(action_type not in ["view", "like", "bookmark", "report"] for action_type in types):
+            raise HTTPException(status_code=400, detail="Invalid action type")
+
+    counts = service.ActionLogService.get_action_counts(db, target_type=target_type, target_ids=ids, action_types=types)
+    return [
+        {"target_type": target_type, "target_id": target_id, "counts": counts[target_id]}
+        for target_id in ids
+    ]
+
+
 @router.get("/{action_log_id}", response_model=schemas.ActionLogResponse)
 def get_action_log(action_log_id: int, db: Session = Depends(get_db)):
     db_action_log = service.ActionLogService.get_action_log(db, action_log_id=action_log_id)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -16,6 +16,19 @@ class TargetType(str, Enum):
     COMMENT = "comment"
 
 
+class ActionBatchStatus(str, Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"
+    SUPERSEDED = "superseded"
+
+
+# Upper bound on actions per POST /actions/batch
+MAX_BATCH_ACTIONS = 500
+# Upper bound on targets per POST /actions/state
+MAX_STATE_TARGETS = 100
+
+
 class ActionLogBase(BaseModel):
     action_type: ActionType = Field(description="Type of action performed")
     target_type: TargetType = Field(description="Type of target (post or comment)")
@@ -67,3 +80,80 @@ class ActionLogResponse(ActionLogBase):
                 "created_at": "2024-01-15T12:00:00Z"
             }
         }
+
+
+class ActionLogBatchCreate(BaseModel):
+    actions: List[ActionLogCreate] = Field(
+        min_length=1, max_length=MAX_BATCH_ACTIONS, description="Actions to apply, in order"
+    )
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "actions": [
+                    {"user_id": 1, "action_type": "like", "target_type": "post", "target_id": 1, "is_on": True},
+                    {"user_id": 1, "action_type": "view", "target_type": "post", "target_id": 2, "is_on": True}
+                ]
+            }
+        }
+
+
+class ActionLogBatchItem(BaseModel):
+    index: int = Field(description="Position of the action in the request")
+    status: ActionBatchStatus = Field(description="What the action did; superseded means a later action in the batch had the same key")
+    action_log: ActionLogResponse = Field(description="The action log row after the batch")
+
+
+class ActionLogBatchResponse(BaseModel):
+    results: List[ActionLogBatchItem] = Field(description="One result per requested action, in request order")
+
+
+class ActionCountsResponse(BaseModel):
+    target_type: TargetType = Field(description="Type of target (post or comment)")
+    target_id: int = Field(description="ID of the target item")
+    counts: Dict[ActionType, int] = Field(description="Number of active actions per action type")
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "target_type": "post",
+                "target_id": 1,
+                "counts": {"view": 12, "like": 3, "bookmark": 1, "report": 0}
+            }
+        }
+
+
+class ActionTarget(BaseModel):
+    target_type: TargetType = Field(description="Type of target (post or comment)")
+    target_id: int = Field(description="ID of the target item")
+
+
+class ActionStateRequest(BaseModel):
+    viewer_id: int = Field(description="ID of the user whose actions are looked up")
+    targets: List[ActionTarget] = Field(
+        min_length=1, max_length=MAX_STATE_TARGETS, description="Targets shown to the viewer"
+    )
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "viewer_id": 1,
+                "targets": [
+                    {"target_type": "post", "target_id": 1},
+                    {"target_type": "comment", "target_id": 3}
+                ]
+            }
+        }
+
+
+class ActionStateResponse(ActionTarget):
+    flags: Dict[ActionType, bool] = Field(description="Whether the viewer's action of each type is on")
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "target_type": "post",
+                "target_id": 1,
+                "flags": {"view": True, "like": True, "bookmark": False, "report": False}
+            }
+        }
@@ -1,93 +1,404 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, insert, literal_column, not_, select, tuple_
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Dict, Optional, List, Set, Tuple
+from database import dialect_insert
+from app.community import counters
+from app.community.view_buffer import view_counter
+from app.pagination import decode_time_cursor, encode_cursor
+from . import counters as action_counters
 from . import models, schemas
+from .state_cache import Target, action_state_cache
+
+
+# Columns of the unique index every action upsert conflicts on
+ACTION_KEY = ["user_id", "action_type", "target_type", "target_id"]
+ActionKey = Tuple[int, str, str, int]
 
 
 class ActionLogService:
     @staticmethod
     def create_action_log(db: Session, action_log: schemas.ActionLogCreate) -> models.ActionLog:
-        # Check if action already exists for this user and target
-        existing_action = db.query(models.ActionLog).filter(
-            models.ActionLog.user_id == action_log.user_id,
-            models.ActionLog.action_type == action_log.action_type,
-            models.ActionLog.target_type == action_log.target_type,
-            models.ActionLog.target_id == action_log.target_id
-        ).first()
-        
-        if existing_action:
-            # Update existing action
-            existing_action.is_on = action_log.is_on
-            from sqlalchemy.sql import func
-            existing_action.created_at = func.now()
-            db.commit()
-            db.refresh(existing_action)
-            return existing_action
-        else:
-            # Create new action
-            db_action_log = models.ActionLog(
-                user_id=action_log.user_id,
-                action_type=action_log.action_type,
-                target_type=action_log.target_type,
-                target_id=action_log.target_id,
-                is_on=action_log.is_on
+        if action_log.action_type == schemas.ActionType.VIEW:
+            # Views are append-only events in view_logs; a repeat within the dedup window returns the earlier row
+            key = _action_key(action_log)
+            rows, _ = ActionLogService._log_views(db, [key])
+            return ActionLogService._commit_returning(db, rows[key])
+
+        # One INSERT ... ON CONFLICT per call; the unique key on (user, action, target) absorbs double-taps
+        stmt = ActionLogService._upsert_statement(db, [{
+            "user_id": action_log.user_id,
+            "action_type": action_log.action_type,
+            "target_type": action_log.target_type,
+            "target_id": action_log.target_id,
+            "is_on": action_log.is_on
+        }])
+        inserted = None
+        if db.get_bind().dialect.name != "postgresql":
+            inserted = ActionLogService._find_action(
+                db, action_log.user_id, action_log.action_type, action_log.target_type, action_log.target_id
+            ) is None
+        db_action_log, was_inserted = ActionLogService._execute_upsert(db, stmt, inserted)
+
+        if db_action_log is None:
+            # Nothing changed; return the row as it is
+            db_action_log = ActionLogService._find_action(
+                db, action_log.user_id, action_log.action_type, action_log.target_type, action_log.target_id
             )
-            db.add(db_action_log)
-            db.commit()
-            db.refresh(db_action_log)
-            return db_action_log
+        elif db_action_log.is_on or not was_inserted:
+            ActionLogService._sync_target_counter(
+                db, action_log.action_type, action_log.target_type, action_log.target_id,
+                1 if db_action_log.is_on else -1
+            )
+        return ActionLogService._commit_returning(db, db_action_log)
 
     @staticmethod
-    def get_action_log(db: Session, action_log_id: int) -> Optional[models.ActionLog]:
-        return db.query(models.ActionLog).filter(models.ActionLog.id == action_log_id).first()
+    def create_action_logs_batch(db: Session, actions: List[schemas.ActionLogCreate]) -> List[Tuple[schemas.ActionBatchStatus, models.ActionLog]]:
+        """Apply many actions with one multi-row upsert (views: one insert), returning (status, row) per action in input order"""
+        # A key repeated within the batch keeps its last state; ON CONFLICT may touch each row only once
+        latest: Dict[ActionKey, int] = {}
+        for index, action in enumerate(actions):
+            latest[_action_key(action)] = index
+        # Sorted keys make concurrent batches lock rows in the same order
+        keys = sorted(latest)
+
+        rows: Dict[ActionKey, models.ActionLog] = {}
+        statuses: Dict[ActionKey, schemas.ActionBatchStatus] = {}
+        for written in (
+            ActionLogService._upsert_actions(
+                db, {key: actions[latest[key]].is_on for key in keys if key[1] != schemas.ActionType.VIEW}
+            ),
+            ActionLogService._log_views(db, [key for key in keys if key[1] == schemas.ActionType.VIEW])
+        ):
+            rows.update(written[0])
+            statuses.update(written[1])
+
+        for db_action_log in rows.values():
+            db.expunge(db_action_log)
+        db.commit()
+        action_state_cache.invalidate({key[0] for key in keys})
+
+        results = []
+        for index, action in enumerate(actions):
+            key = _action_key(action)
+            status = statuses[key] if latest[key] == index else schemas.ActionBatchStatus.SUPERSEDED
+            results.append((status, rows[key]))
+        return results
 
     @staticmethod
-    def get_user_actions(db: Session, user_id: int, action_type: Optional[str] = None, skip: int = 0, limit: int = 100) -> List[models.ActionLog]:
-        query = db.query(models.ActionLog).filter(models.ActionLog.user_id == user_id)
-        if action_type:
-            query = query.filter(models.ActionLog.action_type == action_type)
-        return query.order_by(models.ActionLog.created_at.desc()).offset(skip).limit(limit).all()
+    def get_action_log(db: Session, action_log_id: int):
+        db_action_log = db.query(models.ActionLog).filter(models.ActionLog.id == action_log_id).first()
+        if db_action_log is None:
+            # View events share the action log id sequence (on PostgreSQL)
+            db_action_log = db.query(models.ViewLog).filter(models.ViewLog.id == action_log_id).first()
+        return db_action_log
 
     @staticmethod
-    def get_target_actions(db: Session, target_type: str, target_id: int, action_type: Optional[str] = None, skip: int = 0, limit: int = 100) -> List[models.ActionLog]:
-        query = db.query(models.ActionLog).filter(
-            models.ActionLog.target_type == target_type,
-            models.ActionLog.target_id == target_id
+    def get_user_actions(db: Session, user_id: int, action_type: Optional[str] = None, skip: int = 0, limit: int = 100) -> List:
+        return ActionLogService._recent_actions(
+            db, action_type, skip, limit,
+            models.ActionLog.user_id == user_id,
+            models.ViewLog.user_id == user_id
+        )
+
+    @staticmethod
+    def get_target_actions(db: Session, target_type: str, target_id: int, action_type: Optional[str] = None, skip: int = 0, limit: int = 100) -> List:
+        return ActionLogService._recent_actions(
+            db, action_type, skip, limit,
+            (models.ActionLog.target_type == target_type) & (models.ActionLog.target_id == target_id),
+            (models.ViewLog.target_type == target_type) & (models.ViewLog.target_id == target_id)
+        )
+
+    @staticmethod
+    def get_user_actions_cursor(db: Session, user_id: int, action_type: Optional[str] = None, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List, Optional[str]]:
+        return ActionLogService._actions_page(
+            db, action_type, cursor, limit,
+            models.ActionLog.user_id == user_id,
+            models.ViewLog.user_id == user_id
         )
-        if action_type:
-            query = query.filter(models.ActionLog.action_type == action_type)
-        return query.order_by(models.ActionLog.created_at.desc()).offset(skip).limit(limit).all()
+
+    @staticmethod
+    def get_target_actions_cursor(db: Session, target_type: str, target_id: int, action_type: Optional[str] = None, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List, Optional[str]]:
+        return ActionLogService._actions_page(
+            db, action_type, cursor, limit,
+            (models.ActionLog.target_type == target_type) & (models.ActionLog.target_id == target_id),
+            (models.ViewLog.target_type == target_type) & (models.ViewLog.target_id == target_id)
+        )
+
+    @staticmethod
+    def _actions_page(db: Session, action_type: Optional[str], cursor: Optional[str], limit: int, action_filter, view_filter) -> Tuple[List, Optional[str]]:
+        """Keyset page over (created_at, id) descending, one index range scan per action type.
+
+        Ids are unique across action_logs and view_logs (on PostgreSQL), so merging the per-type
+        pages and keeping the first limit rows gives an exact page.
+        """
+        after = decode_time_cursor(cursor) if cursor else None
+        action_types = [action_type] if action_type else [value.value for value in schemas.ActionType]
+        rows = []
+        for current in action_types:
+            if current == schemas.ActionType.VIEW:
+                model, query = models.ViewLog, db.query(models.ViewLog).filter(view_filter)
+            else:
+                model = models.ActionLog
+                query = db.query(models.ActionLog).filter(action_filter, models.ActionLog.action_type == current)
+            if after is not None:
+                query = query.filter(tuple_(model.created_at, model.id) < after)
+            rows.extend(query.order_by(model.created_at.desc(), model.id.desc()).limit(limit).all())
+        rows.sort(key=lambda row: (row.created_at, row.id), reverse=True)
+        rows = rows[:limit]
+
+        next_cursor = None
+        if rows and len(rows) == limit:
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+        return rows, next_cursor
+
+    @staticmethod
+    def _recent_actions(db: Session, action_type: Optional[str], skip: int, limit: int, action_filter, view_filter) -> List:
+        """Newest first across action_logs and view_logs (views only live in the latter)"""
+        sources = []
+        if action_type != schemas.ActionType.VIEW:
+            query = db.query(models.ActionLog).filter(action_filter)
+            if action_type:
+                query = query.filter(models.ActionLog.action_type == action_type)
+            sources.append(query.order_by(models.ActionLog.created_at.desc()))
+        if action_type in (None, schemas.ActionType.VIEW):
+            sources.append(db.query(models.ViewLog).filter(view_filter).order_by(models.ViewLog.created_at.desc()))
+        if len(sources) == 1:
+            return sources[0].offset(skip).limit(limit).all()
+        # Each source's first skip + limit rows contain the merged page
+        merged = [row for source in sources for row in source.limit(skip + limit).all()]
+        merged.sort(key=lambda row: row.created_at, reverse=True)
+        return merged[skip:skip + limit]
 
     @staticmethod
     def toggle_action(db: Session, user_id: int, action_type: str, target_type: str, target_id: int) -> models.ActionLog:
-        existing_action = db.query(models.ActionLog).filter(
+        if action_type == schemas.ActionType.VIEW:
+            # A view cannot be taken back, so toggling one just logs it
+            key = (user_id, action_type, target_type, target_id)
+            rows, _ = ActionLogService._log_views(db, [key])
+            return ActionLogService._commit_returning(db, rows[key])
+
+        # New rows start on; existing rows flip in place, both in a single statement
+        stmt = dialect_insert(db, models.ActionLog).values(
+            user_id=user_id,
+            action_type=action_type,
+            target_type=target_type,
+            target_id=target_id,
+            is_on=True
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=ACTION_KEY,
+            set_={"is_on": not_(models.ActionLog.is_on), "created_at": func.now()}
+        )
+        db_action_log, _ = ActionLogService._execute_upsert(db, stmt, inserted=False)
+        ActionLogService._sync_target_counter(
+            db, action_type, target_type, target_id, 1 if db_action_log.is_on else -1
+        )
+        return ActionLogService._commit_returning(db, db_action_log)
+
+    @staticmethod
+    def get_action_count(db: Session, target_type: str, target_id: int, action_type: str) -> int:
+        return action_counters.get_action_count(db, target_type, target_id, action_type)
+
+    @staticmethod
+    def get_action_counts(db: Session, target_type: str, target_ids: List[int], action_types: List[str]) -> Dict[int, Dict[str, int]]:
+        return action_counters.get_action_counts(db, target_type, target_ids, action_types)
+
+    @staticmethod
+    def get_action_states(db: Session, user_id: int, targets: List[Target]) -> Dict[Target, Set[str]]:
+        """Action types that are on for each target, from the per-user cache or one indexed query"""
+        states = action_state_cache.get(user_id, targets)
+        missing = [target for target in targets if target not in states]
+        if missing:
+            found: Dict[Target, Set[str]] = {target: set() for target in missing}
+            rows = db.query(models.ActionLog.target_type, models.ActionLog.target_id, models.ActionLog.action_type).filter(
+                models.ActionLog.user_id == user_id,
+                tuple_(models.ActionLog.target_type, models.ActionLog.target_id).in_(missing),
+                models.ActionLog.is_on == True
+            ).all()
+            for target_type, target_id, action_type in rows:
+                found[(target_type, target_id)].add(action_type)
+            viewed = db.query(models.ViewLog.target_type, models.ViewLog.target_id).filter(
+                models.ViewLog.user_id == user_id,
+                tuple_(models.ViewLog.target_type, models.ViewLog.target_id).in_(missing)
+            ).distinct().all()
+            for target in viewed:
+                found[tuple(target)].add(schemas.ActionType.VIEW.value)
+            action_state_cache.put(user_id, found)
+            states.update(found)
+        return states
+
+    @staticmethod
+    def _sync_target_counter(db: Session, action_type: str, target_type: str, target_id: int, amount: int) -> None:
+        # Keep action_counts and posts.like_count in step with the action, inside the caller's transaction
+        action_counters.adjust_action_counts(db, {(target_type, target_id, action_type): amount})
+        if action_type == schemas.ActionType.LIKE and target_type == schemas.TargetType.POST:
+            counters.adjust_post_counter(db, target_id, "like_count", amount)
+
+    @staticmethod
+    def _upsert_actions(db: Session, states: Dict[ActionKey, bool]) -> Tuple[Dict[ActionKey, models.ActionLog], Dict[ActionKey, schemas.ActionBatchStatus]]:
+        """Upsert is_on for many keys with one statement, moving the counters by the changes"""
+        rows: Dict[ActionKey, models.ActionLog] = {}
+        statuses: Dict[ActionKey, schemas.ActionBatchStatus] = {}
+        if not states:
+            return rows, statuses
+        keys = list(states)
+
+        existing = None
+        if db.get_bind().dialect.name != "postgresql":
+            existing = {_action_key(row) for row in ActionLogService._find_actions(db, keys)}
+        stmt = ActionLogService._upsert_statement(
+            db, [dict(zip(ACTION_KEY, key), is_on=states[key]) for key in keys]
+        )
+        written = ActionLogService._execute_upsert_many(db, stmt, existing)
+
+        count_deltas: Dict[action_counters.CountKey, int] = defaultdict(int)
+        like_deltas: Dict[int, int] = defaultdict(int)
+        for db_action_log, was_inserted in written:
+            key = _action_key(db_action_log)
+            rows[key] = db_action_log
+            statuses[key] = schemas.ActionBatchStatus.CREATED if was_inserted else schemas.ActionBatchStatus.UPDATED
+            if db_action_log.is_on or not was_inserted:
+                amount = 1 if db_action_log.is_on else -1
+                count_deltas[(key[2], key[3], key[1])] += amount
+                if key[1] == schemas.ActionType.LIKE and key[2] == schemas.TargetType.POST:
+                    like_deltas[key[3]] += amount
+        # Rows the WHERE skipped already had the requested state
+        unchanged = [key for key in keys if key not in rows]
+        if unchanged:
+            for db_action_log in ActionLogService._find_actions(db, unchanged):
+                key = _action_key(db_action_log)
+                rows[key] = db_action_log
+                statuses[key] = schemas.ActionBatchStatus.UNCHANGED
+        action_counters.adjust_action_counts(db, count_deltas)
+        counters.apply_post_counter_deltas(db, "like_count", like_deltas)
+        return rows, statuses
+
+    @staticmethod
+    def _log_views(db: Session, keys: List[ActionKey]) -> Tuple[Dict[ActionKey, models.ViewLog], Dict[ActionKey, schemas.ActionBatchStatus]]:
+        """Append view events, except repeats within the view dedup window which return the earlier row"""
+        rows: Dict[ActionKey, models.ViewLog] = {}
+        statuses: Dict[ActionKey, schemas.ActionBatchStatus] = {}
+        if not keys:
+            return rows, statuses
+
+        repeats = [key for key in keys if not view_counter.first_view(_view_log_viewer(key), key[3])]
+        if repeats:
+            since = datetime.now(timezone.utc) - timedelta(seconds=view_counter.dedup_window)
+            for view_log in ActionLogService._find_views(db, repeats, since):
+                key = _action_key(view_log)
+                if key not in rows or view_log.created_at > rows[key].created_at:
+                    rows[key] = view_log
+                    statuses[key] = schemas.ActionBatchStatus.UNCHANGED
+
+        # Repeats whose earlier row is gone (or was logged by a request still in flight) are logged again
+        new_keys = [key for key in keys if key not in rows]
+        if new_keys:
+            values = [
+                {"user_id": user_id, "target_type": target_type, "target_id": target_id}
+                for user_id, _, target_type, target_id in new_keys
+            ]
+            if db.get_bind().dialect.name == "postgresql":
+                inserted = db.execute(insert(models.ViewLog).values(values).returning(models.ViewLog)).scalars().all()
+            else:
+                # No shared sequence: each row takes the next id of view_logs, read by the insert itself
+                next_id = select(func.coalesce(func.max(models.ViewLog.id), 0) + 1).scalar_subquery()
+                inserted = [
+                    db.execute(insert(models.ViewLog).values(id=next_id, **row).returning(models.ViewLog)).scalar_one()
+                    for row in values
+                ]
+            for view_log in inserted:
+                key = _action_key(view_log)
+                rows[key] = view_log
+                statuses[key] = schemas.ActionBatchStatus.CREATED
+            action_counters.adjust_action_counts(db, {
+                (target_type, target_id, action_type): 1 for _, action_type, target_type, target_id in new_keys
+            })
+        return rows, statuses
+
+    @staticmethod
+    def _upsert_statement(db: Session, rows: List[dict]):
+        """INSERT ... ON CONFLICT that sets is_on, skipping rows whose state would not change"""
+        stmt = dialect_insert(db, models.ActionLog).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=ACTION_KEY,
+            set_={"is_on": stmt.excluded.is_on, "created_at": func.now()},
+            # Re-sending the current state is a no-op, so counters only move on real changes
+            where=models.ActionLog.is_on.is_distinct_from(stmt.excluded.is_on)
+        )
+
+    @staticmethod
+    def _execute_upsert(db: Session, stmt, inserted: Optional[bool]) -> Tuple[Optional[models.ActionLog], bool]:
+        """Run an action upsert, returning the written row (None if the WHERE skipped it) and whether it was new"""
+        if inserted is None:
+            # xmax is 0 only for rows this statement inserted rather than updated
+            row = db.execute(
+                stmt.returning(models.ActionLog, literal_column("xmax = 0").label("inserted")),
+                execution_options={"populate_existing": True}
+            ).first()
+            return (row[0], row[1]) if row else (None, False)
+        db_action_log = db.execute(
+            stmt.returning(models.ActionLog), execution_options={"populate_existing": True}
+        ).scalar_one_or_none()
+        return db_action_log, inserted
+
+    @staticmethod
+    def _execute_upsert_many(db: Session, stmt, existing: Optional[Set[ActionKey]]) -> List[Tuple[models.ActionLog, bool]]:
+        """Run a multi-row action upsert, returning the written rows and whether each was new"""
+        if existing is None:
+            result = db.execute(
+                stmt.returning(models.ActionLog, literal_column("xmax = 0").label("inserted")),
+                execution_options={"populate_existing": True}
+            )
+            return [(row[0], row[1]) for row in result]
+        result = db.execute(stmt.returning(models.ActionLog), execution_options={"populate_existing": True})
+        return [(db_action_log, _action_key(db_action_log) not in existing) for db_action_log in result.scalars()]
+
+    @staticmethod
+    def _commit_returning(db: Session, db_action_log):
+        # RETURNING already loaded every column; detach so the commit does not expire it into a reload
+        db.expunge(db_action_log)
+        db.commit()
+        action_state_cache.invalidate([db_action_log.user_id])
+        return db_action_log
+
+    @staticmethod
+    def _find_action(db: Session, user_id: int, action_type: str, target_type: str, target_id: int) -> Optional[models.ActionLog]:
+        return db.query(models.ActionLog).filter(
             models.ActionLog.user_id == user_id,
             models.ActionLog.action_type == action_type,
             models.ActionLog.target_type == target_type,
             models.ActionLog.target_id == target_id
         ).first()
-        
-        if existing_action:
-            existing_action.is_on = not existing_action.is_on
-            from sqlalchemy.sql import func
-            existing_action.created_at = func.now()
-            db.commit()
-            db.refresh(existing_action)
-            return existing_action
-        else:
-            action_log = schemas.ActionLogCreate(
-                user_id=user_id,
-                action_type=action_type,
-                target_type=target_type,
-                target_id=target_id,
-                is_on=True
-            )
-            return ActionLogService.create_action_log(db, action_log)
 
     @staticmethod
-    def get_action_count(db: Session, target_type: str, target_id: int, action_type: str) -> int:
-        return db.query(models.ActionLog).filter(
-            models.ActionLog.target_type == target_type,
-            models.ActionLog.target_id == target_id,
-            models.ActionLog.action_type == action_type,
-            models.ActionLog.is_on == True
-        ).count()
+    def _find_actions(db: Session, keys: List[ActionKey]) -> List[models.ActionLog]:
+        columns = [getattr(models.ActionLog, name) for name in ACTION_KEY]
+        return db.query(models.ActionLog).filter(tuple_(*columns).in_(keys)).all()
+
+    @staticmethod
+    def _find_views(db: Session, keys: List[ActionKey], since: datetime) -> List[models.ViewLog]:
+        # The created_at bound lets PostgreSQL skip all but the latest partitions
+        return db.query(models.ViewLog).filter(
+            tuple_(models.ViewLog.user_id, models.ViewLog.target_type, models.ViewLog.target_id).in_(
+                [(user_id, target_type, target_id) for user_id, _, target_type, target_id in keys]
+            ),
+            models.ViewLog.created_at >= since
+        ).all()
+
+
+def _action_key(action) -> ActionKey:
+    """(user_id, action_type, target_type, target_id) of a request item or a row"""
+    return (
+        action.user_id,
+        schemas.ActionType(action.action_type).value,
+        schemas.TargetType(action.target_type).value,
+        action.target_id
+    )
+
+
+def _view_log_viewer(key: ActionKey) -> str:
+    """Dedup key for logged views, kept apart from the keys read_post uses for view counting"""
+    user_id, _, target_type, _ = key
+    return f"log:{target_type}:{user_id}"
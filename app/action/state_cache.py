@@ -0,0 +1,73 @@
+"""
+Short-lived per-user cache of which targets a user has acted on.
+
+Feed pages ask for the same viewer's like/bookmark state again and again while
+scrolling. Entries live for ``ttl`` seconds in this process and are dropped as
+soon as this process records an action for the user; writes handled by other
+workers become visible once the entry expires.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from config.config import settings
+
+Target = Tuple[str, int]
+
+
+class ActionStateCache:
+    def __init__(self, ttl: float, max_users: int):
+        self.ttl = ttl
+        self.max_users = max_users
+        # user_id -> (expires_at, {target: action types that are on}), least recently used first
+        self._entries: "OrderedDict[int, Tuple[float, Dict[Target, Set[str]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_users > 0
+
+    def get(self, user_id: int, targets: Iterable[Target]) -> Dict[Target, Set[str]]:
+        """Cached state for whichever of targets are known, leaving the rest out"""
+        if not self.enabled:
+            return {}
+        with self._lock:
+            entry = self._entry(user_id)
+            if entry is None:
+                return {}
+            return {target: entry[target] for target in targets if target in entry}
+
+    def put(self, user_id: int, states: Dict[Target, Set[str]]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self._entry(user_id)
+            if entry is None:
+                entry = {}
+                self._entries[user_id] = (time.monotonic() + self.ttl, entry)
+                while len(self._entries) > self.max_users:
+                    self._entries.popitem(last=False)
+            entry.update(states)
+
+    def invalidate(self, user_ids: Iterable[int]) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def _entry(self, user_id: int) -> Optional[Dict[Target, Set[str]]]:
+        found = self._entries.get(user_id)
+        if found is None:
+            return None
+        expires_at, entry = found
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return entry
+
+
+action_state_cache = ActionStateCache(
+    ttl=settings.ACTION_STATE_CACHE_TTL,
+    max_users=settings.ACTION_STATE_CACHE_MAX_USERS,
+)
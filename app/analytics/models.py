@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, DateTime, Integer
+from database import Base
+
+
+class ActionRollupHourly(Base):
+    """Active actions per target and hour, folded in from action_logs by the rollup job"""
+    __tablename__ = "action_rollups_hourly"
+
+    target_type = Column(String(50), primary_key=True)
+    target_id = Column(Integer, primary_key=True)
+    action_type = Column(String(50), primary_key=True)
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class ActionRollupDaily(Base):
+    """Active actions per target and UTC day, folded in from action_logs by the rollup job"""
+    __tablename__ = "action_rollups_daily"
+
+    target_type = Column(String(50), primary_key=True)
+    target_id = Column(Integer, primary_key=True)
+    action_type = Column(String(50), primary_key=True)
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,88 @@
+"""
+Incremental hourly and daily rollups of action_logs and view_logs.
+
+Each run folds log rows with ids above the job's high-water mark into the
+rollup tables with one ``INSERT ... SELECT ... GROUP BY ... ON CONFLICT`` per
+granularity, then advances the mark in the same transaction. Each log table
+has its own mark.
+
+Ids are handed out when a row is inserted but become visible when its
+transaction commits, so a run stops at the newest row older than
+``lag`` seconds; a row still uncommitted after that is not picked up.
+Action logs are upserted in place, so each row is folded in once, into the
+bucket of its created_at at that time; later toggles of the same row do not
+add events.
+"""
+from datetime import timedelta
+from typing import Dict, Tuple
+from sqlalchemy import func, literal_column, select, true
+from sqlalchemy.orm import Session
+from database import dialect_insert
+from app.action.models import ActionLog, ViewLog
+from app.jobs.service import JobStateService
+from . import models
+
+# (job name, log table, action type of its rows, which rows count)
+SOURCES = (
+    ("rollup_actions", ActionLog, ActionLog.action_type, ActionLog.is_on == True),
+    ("rollup_view_logs", ViewLog, literal_column("'view'"), true()),
+)
+
+ROLLUP_TABLES = {
+    "hour": models.ActionRollupHourly,
+    "day": models.ActionRollupDaily,
+}
+
+
+def bucket_expression(db: Session, granularity: str, column):
+    """column truncated to the start of its UTC hour or day"""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.timezone("UTC", func.date_trunc(granularity, func.timezone("UTC", column)))
+    pattern = "%Y-%m-%d %H:00:00.000000" if granularity == "hour" else "%Y-%m-%d 00:00:00.000000"
+    return func.strftime(pattern, column)
+
+
+def rollup_actions(db: Session, lag: float, batch_size: int) -> Dict:
+    """Fold the next batch of settled rows of every log table into the rollups; the caller commits"""
+    buckets, last_ids = 0, {}
+    for job_name, table, action_type, counted in SOURCES:
+        folded, last_ids[job_name] = _rollup_source(db, job_name, table, action_type, counted, lag, batch_size)
+        buckets += folded
+    return {"buckets": buckets, "last_ids": last_ids}
+
+
+def _rollup_source(db: Session, job_name: str, table, action_type, counted, lag: float, batch_size: int) -> Tuple[int, int]:
+    state = JobStateService.get_state(db, job_name, for_update=True)
+    last_id = state.last_id or 0
+
+    settled_before = db.query(func.now()).scalar() - timedelta(seconds=lag)
+    next_ids = select(table.id).where(table.id > last_id).order_by(table.id).limit(batch_size).subquery()
+    upper_id = db.query(func.max(table.id)).filter(
+        table.id.in_(select(next_ids.c.id)),
+        table.created_at < settled_before
+    ).scalar()
+    if upper_id is None:
+        return 0, last_id
+
+    in_batch = (table.id > last_id) & (table.id <= upper_id) & counted
+    # A constant action type must not appear in GROUP BY
+    group_action = [action_type] if table is ActionLog else []
+    buckets = 0
+    for granularity, rollup_table in ROLLUP_TABLES.items():
+        bucket = bucket_expression(db, granularity, table.created_at).label("bucket")
+        source = (
+            select(table.target_type, table.target_id, action_type.label("action_type"), bucket, func.count().label("count"))
+            .where(in_batch)
+            .group_by(table.target_type, table.target_id, *group_action, bucket)
+        )
+        stmt = dialect_insert(db, rollup_table).from_select(
+            ["target_type", "target_id", "action_type", "bucket", "count"], source
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[rollup_table.target_type, rollup_table.target_id, rollup_table.action_type, rollup_table.bucket],
+            set_={"count": rollup_table.count + stmt.excluded.count}
+        )
+        buckets += db.execute(stmt).rowcount
+
+    JobStateService.advance(db, state, last_id=upper_id)
+    return buckets, upper_id
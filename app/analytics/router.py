@@ -0,0 +1,101 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from database import get_db
+from . import schemas, service
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+# Longest range one request may cover, so a response stays within a few hundred buckets
+MAX_RANGE = {
+    schemas.Granularity.HOUR: timedelta(days=31),
+    schemas.Granularity.DAY: timedelta(days=366),
+}
+DEFAULT_RANGE = {
+    schemas.Granularity.HOUR: timedelta(days=1),
+    schemas.Granularity.DAY: timedelta(days=30),
+}
+
+
+@router.get("/actions/{target_type}/{target_id}",
+            response_model=List[schemas.RollupPoint],
+            summary="Action counts over time for a target",
+            description="""
+Hourly or daily counts of one action type on a post or comment, read from the rollup tables.
+
+- **action_type**: view, like, bookmark or report
+- **granularity**: hour (up to 31 days) or day (up to 366 days)
+- **start** / **end**: Time range, end exclusive (default: the last day for hours, the last 30 days for days)
+
+Buckets without actions are omitted. The most recent minutes may not be rolled up yet.
+            """,
+            response_description="Counts per bucket, oldest first")
+def read_target_series(
+    target_type: str,
+    target_id: int,
+    action_type: str,
+    granularity: schemas.Granularity = schemas.Granularity.HOUR,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    if target_type not in ["post", "comment"]:
+        raise HTTPException(status_code=400, detail="Invalid target type")
+    _check_action_type(action_type)
+    start, end = _time_range(granularity, start, end)
+    return [
+        {"bucket": bucket, "count": count}
+        for bucket, count in service.AnalyticsService.get_target_series(
+            db, target_type=target_type, target_id=target_id, action_type=action_type,
+            granularity=granularity.value, start=start, end=end
+        )
+    ]
+
+
+@router.get("/boards/{board_id}/actions",
+            response_model=List[schemas.RollupPoint],
+            summary="Action counts over time for a board",
+            description="""
+Hourly or daily counts of one action type on all posts of a board, e.g. likes per hour on a board last week.
+
+- **action_type**: view, like, bookmark or report
+- **granularity**: hour (up to 31 days) or day (up to 366 days)
+- **start** / **end**: Time range, end exclusive (default: the last day for hours, the last 30 days for days)
+            """,
+            response_description="Counts per bucket, oldest first")
+def read_board_series(
+    board_id: int,
+    action_type: str,
+    granularity: schemas.Granularity = schemas.Granularity.HOUR,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    _check_action_type(action_type)
+    start, end = _time_range(granularity, start, end)
+    return [
+        {"bucket": bucket, "count": count}
+        for bucket, count in service.AnalyticsService.get_board_series(
+            db, board_id=board_id, action_type=action_type,
+            granularity=granularity.value, start=start, end=end
+        )
+    ]
+
+
+def _check_action_type(action_type: str) -> None:
+    if action_type not in ["view", "like", "bookmark", "report"]:
+        raise HTTPException(status_code=400, detail="Invalid action type")
+
+
+def _time_range(granularity: schemas.Granularity, start: Optional[datetime], end: Optional[datetime]) -> Tuple[datetime, datetime]:
+    # Times without an offset are taken as UTC
+    end = _as_utc(end) if end is not None else datetime.now(timezone.utc)
+    start = _as_utc(start) if start is not None else end - DEFAULT_RANGE[granularity]
+    if start >= end or end - start > MAX_RANGE[granularity]:
+        raise HTTPException(status_code=400, detail="Invalid time range")
+    return start, end
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
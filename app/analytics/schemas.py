@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from enum import Enum
+
+
+class Granularity(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+
+
+class RollupPoint(BaseModel):
+    bucket: datetime = Field(description="Start of the hour or UTC day")
+    count: int = Field(description="Number of actions recorded in the bucket")
+
+    class Config:
+        from_attributes = True
+        schema_extra = {
+            "example": {
+                "bucket": "2024-01-15T12:00:00Z",
+                "count": 42
+            }
+        }
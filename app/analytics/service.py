@@ -0,0 +1,51 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from typing import List
+from datetime import datetime
+from app.community.models import Post
+from . import models
+from .rollup import ROLLUP_TABLES
+
+
+class AnalyticsService:
+    @staticmethod
+    def get_target_series(
+        db: Session,
+        target_type: str,
+        target_id: int,
+        action_type: str,
+        granularity: str,
+        start: datetime,
+        end: datetime
+    ) -> List[tuple]:
+        """(bucket, count) rows for one target, read from the rollup primary key"""
+        table = ROLLUP_TABLES[granularity]
+        return db.query(table.bucket, table.count).filter(
+            table.target_type == target_type,
+            table.target_id == target_id,
+            table.action_type == action_type,
+            table.bucket >= start,
+            table.bucket < end
+        ).order_by(table.bucket).all()
+
+    @staticmethod
+    def get_board_series(
+        db: Session,
+        board_id: int,
+        action_type: str,
+        granularity: str,
+        start: datetime,
+        end: datetime
+    ) -> List[tuple]:
+        """(bucket, count) rows summed over the posts of a board"""
+        table = ROLLUP_TABLES[granularity]
+        total = func.sum(table.count).label("count")
+        return db.query(table.bucket, total).join(
+            Post, Post.id == table.target_id
+        ).filter(
+            Post.board_id == board_id,
+            table.target_type == "post",
+            table.action_type == action_type,
+            table.bucket >= start,
+            table.bucket < end
+        ).group_by(table.bucket).order_by(table.bucket).all()
@@ -0,0 +1,46 @@
+"""
+Helpers for batch get endpoints (?ids=1,2,3)
+"""
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from fastapi import Response
+from sqlalchemy import Integer, any_, literal
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+
+# Response header listing requested ids that do not exist
+MISSING_IDS_HEADER = "X-Missing-Ids"
+MAX_BATCH_IDS = 100
+
+
+def parse_ids(value: str, max_ids: int = MAX_BATCH_IDS) -> List[int]:
+    """Parse a comma separated id list, dropping duplicates but keeping the order"""
+    try:
+        ids = [int(part) for part in value.split(",") if part.strip()]
+    except ValueError as e:
+        raise ValueError("Invalid ids") from e
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise ValueError("Invalid ids")
+    if len(ids) > max_ids:
+        raise ValueError(f"Too many ids (max {max_ids})")
+    return ids
+
+
+def id_in(db: Session, column, ids: List[int]):
+    """column = ANY(:ids) on PostgreSQL (one plan for any list length), IN elsewhere"""
+    if db.get_bind().dialect.name == "postgresql":
+        return column == any_(literal(ids, ARRAY(Integer)))
+    return column.in_(ids)
+
+
+def order_by_ids(rows: Iterable[Any], ids: List[int], key: Callable[[Any], int] = lambda row: row.id) -> Tuple[List[Any], List[int]]:
+    """Arrange rows in the order of ids, returning them with the ids that had no row"""
+    by_id = {key(row): row for row in rows}
+    return [by_id[row_id] for row_id in ids if row_id in by_id], [row_id for row_id in ids if row_id not in by_id]
+
+
+def set_missing_ids(response: Response, missing: Optional[List[int]]) -> None:
+    """Report requested ids that were not found, if there are any"""
+    if missing:
+        response.headers[MISSING_IDS_HEADER] = ",".join(str(row_id) for row_id in missing)
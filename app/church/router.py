@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 from database import get_db
+from app.http_cache import PUBLIC_DIRECTORY, conditional_response
 from . import schemas, service
 
 router = APIRouter(prefix="/churches", tags=["churches"])
@@ -35,10 +36,14 @@ Retrieve a paginated list of all churches in the directory.
 - **limit**: Maximum number of churches to return (max 100)
 
 This endpoint is useful for populating church selection dropdowns in user interfaces.
+Responses carry an `ETag` and are publicly cacheable for a few minutes.
             """,
             response_description="List of churches")
-def read_churches(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    churches = service.ChurchService.get_churches(db, skip=skip, limit=limit)
+def read_churches(request: Request, response: Response, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    churches, etag = service.ChurchService.get_churches_with_etag(db, skip=skip, limit=limit)
+    not_modified = conditional_response(request, response, etag, cache_control=PUBLIC_DIRECTORY)
+    if not_modified is not None:
+        return not_modified
     return churches
 
 
@@ -1,8 +1,19 @@
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Tuple
+from app.http_cache import make_etag
+from app.refcache.cache import reference_cache
 from . import models, schemas
 
 
+def _load_churches(db: Session) -> List[schemas.ChurchResponse]:
+    churches = db.query(models.Church).order_by(models.Church.id).all()
+    return [schemas.ChurchResponse.model_validate(church) for church in churches]
+
+
+# Every worker keeps all churches in memory; writes below announce changes through reference_cache
+church_cache = reference_cache.register("churches", _load_churches)
+
+
 class ChurchService:
     @staticmethod
     def create_church(db: Session, church: schemas.ChurchCreate) -> models.Church:
@@ -12,17 +23,23 @@ class ChurchService:
             phone_number=church.phone_number
         )
         db.add(db_church)
+        reference_cache.changed(db, "churches")
         db.commit()
         db.refresh(db_church)
         return db_church
 
     @staticmethod
-    def get_church(db: Session, church_id: int) -> Optional[models.Church]:
-        return db.query(models.Church).filter(models.Church.id == church_id).first()
+    def get_church(db: Session, church_id: int) -> Optional[schemas.ChurchResponse]:
+        return church_cache.get(db, church_id)
+
+    @staticmethod
+    def get_churches(db: Session, skip: int = 0, limit: int = 100) -> List[schemas.ChurchResponse]:
+        return church_cache.all(db)[skip:skip + limit]
 
     @staticmethod
-    def get_churches(db: Session, skip: int = 0, limit: int = 100) -> List[models.Church]:
-        return db.query(models.Church).offset(skip).limit(limit).all()
+    def get_churches_with_etag(db: Session, skip: int = 0, limit: int = 100) -> Tuple[List[schemas.ChurchResponse], str]:
+        churches, directory_etag = church_cache.all_with_etag(db)
+        return churches[skip:skip + limit], make_etag(directory_etag, skip, limit)
 
     @staticmethod
     def update_church(db: Session, church_id: int, church_update: schemas.ChurchUpdate) -> Optional[models.Church]:
@@ -31,6 +48,7 @@ class ChurchService:
             update_data = church_update.dict(exclude_unset=True)
             for field, value in update_data.items():
                 setattr(db_church, field, value)
+            reference_cache.changed(db, "churches")
             db.commit()
             db.refresh(db_church)
         return db_church
@@ -40,6 +58,7 @@ class ChurchService:
         db_church = db.query(models.Church).filter(models.Church.id == church_id).first()
         if db_church:
             db.delete(db_church)
+            reference_cache.changed(db, "churches")
             db.commit()
             return True
         return False
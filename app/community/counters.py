@@ -0,0 +1,185 @@
+"""
+Atomic counter updates for the denormalized board, post, comment and tag counters.
+
+Every change is a single ``UPDATE ... SET x = x + :n RETURNING`` statement so
+concurrent requests never lose increments. Callers own the transaction.
+"""
+from collections import defaultdict
+from typing import Dict, Optional
+from sqlalchemy import Integer, case, column, func, or_, update, values
+from sqlalchemy.orm import Session
+from database import dialect_insert
+from . import models
+from .hll import HyperLogLog
+
+
+POST_COUNTERS = ("view_count", "like_count", "comment_count")
+COMMENT_COUNTERS = ("reply_count",)
+
+
+def adjust_post_counter(db: Session, post_id: int, field: str, amount: int) -> Optional[models.Post]:
+    """Add amount (which may be negative) to a post counter, never going below zero"""
+    if field not in POST_COUNTERS:
+        raise ValueError(f"Unknown post counter: {field}")
+    return _adjust_counter(db, models.Post, post_id, field, amount, touch=True)
+
+
+def adjust_comment_counter(db: Session, comment_id: int, field: str, amount: int) -> Optional[models.Comment]:
+    """Add amount (which may be negative) to a comment counter, never going below zero"""
+    if field not in COMMENT_COUNTERS:
+        raise ValueError(f"Unknown comment counter: {field}")
+    return _adjust_counter(db, models.Comment, comment_id, field, amount)
+
+
+def _adjust_counter(db: Session, model, row_id: int, field: str, amount: int, touch: bool = False):
+    column_ = getattr(model, field)
+    if amount >= 0:
+        value = column_ + amount
+    else:
+        value = case((column_ + amount > 0, column_ + amount), else_=0)
+
+    changes = {field: value}
+    if touch:
+        # Marks the post for the next ranking refresh (see ranking.refresh_scores)
+        changes["activity_at"] = func.now()
+    stmt = (
+        update(model)
+        .where(model.id == row_id)
+        .values(changes)
+        .returning(model)
+    )
+    return db.execute(
+        stmt, execution_options={"synchronize_session": False, "populate_existing": True}
+    ).scalar_one_or_none()
+
+
+def increment_post_counter(db: Session, post_id: int, field: str, amount: int = 1) -> Optional[models.Post]:
+    return adjust_post_counter(db, post_id, field, amount)
+
+
+def decrement_post_counter(db: Session, post_id: int, field: str, amount: int = 1) -> Optional[models.Post]:
+    return adjust_post_counter(db, post_id, field, -amount)
+
+
+def apply_post_counter_deltas(db: Session, field: str, deltas: Dict[int, int]) -> None:
+    """Apply many per-post deltas to one counter in a single batched UPDATE"""
+    if field not in POST_COUNTERS:
+        raise ValueError(f"Unknown post counter: {field}")
+    # Applied in id order, like merge_viewer_sketches, so concurrent flushes lock rows in the same order
+    deltas = sorted((post_id, amount) for post_id, amount in deltas.items() if amount)
+    if not deltas:
+        return
+
+    column_ = getattr(models.Post, field)
+    if db.get_bind().dialect.name != "postgresql":
+        # SQLite cannot alias VALUES columns, so fall back to one statement per post
+        for post_id, amount in deltas:
+            adjust_post_counter(db, post_id, field, amount)
+        return
+
+    batch = values(column("id", Integer), column("delta", Integer), name="v").data(deltas)
+    value = case((column_ + batch.c.delta > 0, column_ + batch.c.delta), else_=0)
+    stmt = (
+        update(models.Post)
+        .where(models.Post.id == batch.c.id)
+        .values({field: value, "activity_at": func.now()})
+    )
+    db.execute(stmt, execution_options={"synchronize_session": False})
+
+
+def merge_viewer_sketches(db: Session, sketches: Dict[int, HyperLogLog]) -> None:
+    """Fold buffered viewer sketches into posts.viewer_sketch and refresh unique_viewer_count"""
+    if not sketches:
+        return
+    # Locked in id order so concurrent flushes cannot deadlock or lose each other's registers
+    rows = (
+        db.query(models.Post.id, models.Post.viewer_sketch)
+        .filter(models.Post.id.in_(sorted(sketches)))
+        .order_by(models.Post.id)
+        .with_for_update()
+        .all()
+    )
+    changes = []
+    for post_id, stored in rows:
+        sketch = HyperLogLog(stored)
+        sketch.merge(sketches[post_id])
+        changes.append({"id": post_id, "viewer_sketch": sketch.to_bytes(), "unique_viewer_count": sketch.count()})
+    if changes:
+        db.execute(update(models.Post), changes)
+
+
+def set_unique_viewer_counts(db: Session, counts: Dict[int, int]) -> None:
+    """Store unique viewer estimates computed elsewhere (e.g. Redis PFCOUNT)"""
+    if counts:
+        db.execute(
+            update(models.Post),
+            [{"id": post_id, "unique_viewer_count": count} for post_id, count in sorted(counts.items())]
+        )
+
+
+def record_board_post(db: Session, board_id: int, post_id: int) -> None:
+    """Count a post created in this transaction and make it the board's latest post"""
+    board = models.Board
+    # now() is the transaction start, i.e. the new post's created_at; an older transaction
+    # committing late must not replace a newer latest post
+    is_newer = or_(board.last_post_at.is_(None), board.last_post_at <= func.now())
+    db.execute(
+        update(board).where(board.id == board_id).values(
+            post_count=board.post_count + 1,
+            last_post_at=case((is_newer, func.now()), else_=board.last_post_at),
+            last_post_id=case((is_newer, post_id), else_=board.last_post_id)
+        ),
+        execution_options={"synchronize_session": False}
+    )
+
+
+def remove_board_post(db: Session, board_id: int, post_id: int) -> None:
+    """Uncount a post deleted in this transaction, picking a new latest post if it was the latest"""
+    board = models.Board
+    # The UPDATE locks the board row, so concurrent creates wait until the latest post is recomputed
+    last_post_id = db.execute(
+        update(board).where(board.id == board_id).values(
+            post_count=case((board.post_count > 1, board.post_count - 1), else_=0)
+        ).returning(board.last_post_id),
+        execution_options={"synchronize_session": False}
+    ).scalar_one_or_none()
+    if last_post_id != post_id:
+        return
+
+    latest = db.query(models.Post.id, models.Post.created_at).filter(
+        models.Post.board_id == board_id,
+        models.Post.id != post_id
+    ).order_by(models.Post.created_at.desc(), models.Post.id.desc()).first()
+    db.execute(
+        update(board).where(board.id == board_id).values(
+            last_post_id=latest.id if latest else None,
+            last_post_at=latest.created_at if latest else None
+        ),
+        execution_options={"synchronize_session": False}
+    )
+
+
+def adjust_tag_counts(db: Session, deltas: Dict[str, int]) -> None:
+    """Apply per-tag post count deltas: one upsert for increments, one UPDATE per decrement size"""
+    # Sorted tags make concurrent writers lock count rows in the same order
+    increments = sorted((tag, amount) for tag, amount in deltas.items() if amount > 0)
+    if increments:
+        stmt = dialect_insert(db, models.TagCount).values(
+            [{"tag": tag, "post_count": amount} for tag, amount in increments]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[models.TagCount.tag],
+            set_={"post_count": models.TagCount.post_count + stmt.excluded.post_count}
+        )
+        db.execute(stmt)
+
+    decrements = defaultdict(list)
+    for tag, amount in sorted(deltas.items()):
+        if amount < 0:
+            decrements[-amount].append(tag)
+    for amount, tags in decrements.items():
+        value = case((models.TagCount.post_count > amount, models.TagCount.post_count - amount), else_=0)
+        db.execute(
+            update(models.TagCount).where(models.TagCount.tag.in_(tags)).values(post_count=value),
+            execution_options={"synchronize_session": False}
+        )
@@ -0,0 +1,45 @@
+"""
+HyperLogLog sketch for estimating the number of distinct viewers of a post.
+
+A sketch is 2**12 one-byte registers (4 KiB, about 1.6% standard error) and is
+stored as-is in posts.viewer_sketch. Sketches merge by taking the register-wise
+maximum, so buffered sketches can be folded into the stored one at flush time.
+"""
+import hashlib
+import math
+from typing import Optional
+
+PRECISION = 12
+REGISTERS = 1 << PRECISION
+_ALPHA = 0.7213 / (1 + 1.079 / REGISTERS)
+
+
+class HyperLogLog:
+    def __init__(self, registers: Optional[bytes] = None):
+        if registers is not None and len(registers) == REGISTERS:
+            self.registers = bytearray(registers)
+        else:
+            self.registers = bytearray(REGISTERS)
+
+    def add(self, value: str) -> None:
+        hashed = int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+        index = hashed >> (64 - PRECISION)
+        rest = hashed & ((1 << (64 - PRECISION)) - 1)
+        # Position of the leftmost 1 bit in the remaining 52 bits
+        rank = (64 - PRECISION) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        estimate = _ALPHA * REGISTERS * REGISTERS / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * REGISTERS and zeros:
+            # Linear counting is more accurate while many registers are still empty
+            estimate = REGISTERS * math.log(REGISTERS / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Integer
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Integer, Index, Float, LargeBinary
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from database import Base
 
@@ -10,6 +11,10 @@ class Board(Base):
     title = Column(Text, nullable=False)
     description = Column(Text)
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # Summary of the board's posts, maintained by post create/delete (see counters.py)
+    post_count = Column(Integer, nullable=False, default=0)
+    last_post_at = Column(DateTime(timezone=True))
+    last_post_id = Column(Integer)
 
 
 class Post(Base):
@@ -20,11 +25,35 @@ class Post(Base):
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     title = Column(Text, nullable=False)
     contents = Column(Text, nullable=False)
+    # Preview of contents computed on write so list screens never load the full text
+    excerpt = Column(Text)
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True))
     like_count = Column(Integer, nullable=False, default=0)
     comment_count = Column(Integer, nullable=False, default=0)
     view_count = Column(Integer, nullable=False, default=0)
+    # Distinct viewers, estimated from a HyperLogLog sketch merged in on each view flush (see hll.py)
+    unique_viewer_count = Column(Integer, nullable=False, default=0)
+    viewer_sketch = deferred(Column(LargeBinary))
+    # Bumped whenever a counter changes so ranking refreshes can find touched posts
+    activity_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+
+    __table_args__ = (
+        Index('idx_posts_board_created_id', board_id, created_at.desc(), id.desc()),
+    )
+
+
+class PostScore(Base):
+    __tablename__ = "post_scores"
+
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+    board_id = Column(Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=False)
+    score = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index('idx_post_scores_board_score', board_id, score.desc(), post_id.desc()),
+    )
 
 
 class PostTag(Base):
@@ -33,6 +62,17 @@ class PostTag(Base):
     post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
     tag = Column(Text, primary_key=True)
 
+    __table_args__ = (
+        Index('idx_post_tags_tag_post', tag, post_id),
+    )
+
+
+class TagCount(Base):
+    __tablename__ = "tag_counts"
+
+    tag = Column(Text, primary_key=True)
+    post_count = Column(Integer, nullable=False, default=0)
+
 
 class Comment(Base):
     __tablename__ = "comments"
@@ -43,3 +83,9 @@ class Comment(Base):
     contents = Column(Text, nullable=False)
     parent_id = Column(Integer, ForeignKey("comments.id"))
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    reply_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('idx_comments_post_created_id', post_id, created_at, id),
+        Index('idx_comments_parent_created_id', parent_id, created_at, id),
+    )
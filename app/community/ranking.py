@@ -0,0 +1,78 @@
+"""
+"Hot" ranking for board listings.
+
+The score is log10(engagement) + created_at / HOT_SCORE_TIME_SCALE, so a post
+needs ten times the engagement to outrank one created HOT_SCORE_TIME_SCALE
+seconds later. Older posts decay relative to newer ones without their stored
+score ever changing, which means only posts whose counters moved since the
+last refresh need to be re-scored.
+"""
+import math
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session, load_only
+from database import dialect_insert
+from . import models
+
+
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+VIEW_WEIGHT = 0.1
+HOT_SCORE_TIME_SCALE = 45000
+
+REFRESH_BATCH_SIZE = 1000
+
+
+def hot_score(like_count: int, comment_count: int, view_count: int, created_at: datetime) -> float:
+    engagement = like_count * LIKE_WEIGHT + comment_count * COMMENT_WEIGHT + view_count * VIEW_WEIGHT
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return round(math.log10(max(engagement, 1.0)) + created_at.timestamp() / HOT_SCORE_TIME_SCALE, 7)
+
+
+def score_new_post(db: Session, post: models.Post) -> None:
+    """Give a freshly flushed post its initial score so it is listed before the next refresh"""
+    # created_at is a server default that has not been loaded yet; the insert happened just now
+    score = hot_score(0, 0, 0, datetime.now(timezone.utc))
+    db.add(models.PostScore(post_id=post.id, board_id=post.board_id, score=score))
+
+
+def refresh_scores(db: Session, since: Optional[datetime]) -> int:
+    """Re-score every post whose counters changed since then (all posts when since is None)"""
+    # Only the columns the score needs; contents would otherwise be streamed for every touched post
+    query = db.query(models.Post).options(load_only(
+        models.Post.id, models.Post.board_id, models.Post.created_at,
+        models.Post.like_count, models.Post.comment_count, models.Post.view_count
+    ))
+    if since is not None:
+        query = query.filter(models.Post.activity_at >= since)
+
+    refreshed = 0
+    batch = []
+    for post in query.order_by(models.Post.id).yield_per(REFRESH_BATCH_SIZE):
+        batch.append(post)
+        if len(batch) == REFRESH_BATCH_SIZE:
+            refreshed += _upsert_scores(db, batch)
+            batch = []
+    refreshed += _upsert_scores(db, batch)
+    return refreshed
+
+
+def _upsert_scores(db: Session, posts) -> int:
+    if not posts:
+        return 0
+    stmt = dialect_insert(db, models.PostScore).values([
+        {
+            "post_id": post.id,
+            "board_id": post.board_id,
+            "score": hot_score(post.like_count or 0, post.comment_count or 0, post.view_count or 0, post.created_at)
+        }
+        for post in posts
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.PostScore.post_id],
+        set_={"score": stmt.excluded.score, "board_id": stmt.excluded.board_id, "updated_at": func.now()}
+    )
+    db.execute(stmt)
+    return len(posts)
@@ -1,11 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import hashlib
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from config.config import settings
 from database import get_db
+from app.loader import DataLoader, get_loader
+from app.pagination import MAX_PAGE_SIZE, set_next_cursor
+from app.http_cache import conditional_response, make_etag
+from app.batch import MAX_BATCH_IDS, parse_ids, set_missing_ids
 from . import schemas, service
+from .view_buffer import view_counter
 
 
 router = APIRouter(prefix="/boards", tags=["boards"])
+tag_router = APIRouter(prefix="/tags", tags=["tags"])
 
 
 # Board endpoints
@@ -20,6 +28,19 @@ def read_boards(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     return boards
 
 
+# Declared before /{board_id} so "posts" is not parsed as a board id
+@router.get("/posts", response_model=List[schemas.PostResponse])
+def read_posts_by_ids(ids: str, response: Response, db: Session = Depends(get_db), loader: DataLoader = Depends(get_loader)):
+    # ids=3,1,2 returns the posts in that order; ids that do not exist are listed in X-Missing-Ids
+    try:
+        post_ids = parse_ids(ids, max_ids=MAX_BATCH_IDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    posts, missing = service.PostService.get_posts_by_ids(db, ids=post_ids)
+    set_missing_ids(response, missing)
+    return _with_pending_views(posts, loader)
+
+
 @router.get("/{board_id}", response_model=schemas.BoardResponse)
 def read_board(board_id: int, db: Session = Depends(get_db)):
     db_board = service.BoardService.get_board(db, board_id=board_id)
@@ -51,21 +72,164 @@ def create_post(board_id: int, post: schemas.PostCreate, author_id: int, db: Ses
     return service.PostService.create_post(db=db, post=post, author_id=author_id)
 
 
-@router.get("/{board_id}/posts", response_model=List[schemas.PostResponse])
-def read_posts(board_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    posts = service.PostService.get_posts_by_board(db, board_id=board_id, skip=skip, limit=limit)
-    return posts
+@router.get("/{board_id}/posts", response_model=List[schemas.PostListItem], response_model_exclude_unset=True)
+def read_posts(
+    board_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    paginate: str = "offset",
+    sort: str = "new",
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db),
+    loader: DataLoader = Depends(get_loader)
+):
+    if sort not in ("new", "hot"):
+        raise HTTPException(status_code=400, detail="Invalid sort")
+
+    # Sparse fieldset: fields=title,excerpt,like_count narrows both the SELECT and the response
+    selected = _parse_post_fields(fields)
+    columns = _post_columns(selected)
+
+    # Cursor mode: pass paginate=cursor for the first page, then the X-Next-Cursor header value as cursor.
+    # The hot ranking is always cursor-paginated.
+    if cursor or paginate == "cursor" or sort == "hot":
+        get_page = (
+            service.PostService.get_hot_posts_by_board if sort == "hot"
+            else service.PostService.get_posts_by_board_cursor
+        )
+        try:
+            posts, next_cursor = get_page(db, board_id=board_id, cursor=cursor, limit=limit, fields=columns)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        set_next_cursor(response, next_cursor)
+        return _post_list_items(posts, selected, loader)
+
+    posts = service.PostService.get_posts_by_board(db, board_id=board_id, skip=skip, limit=limit, fields=columns)
+    return _post_list_items(posts, selected, loader)
+
+
+def _parse_post_fields(fields: Optional[str]) -> List[str]:
+    if fields is None:
+        return list(service.POST_LIST_FIELDS + service.POST_LIST_AUTHOR_FIELDS)
+    selected = [name.strip() for name in fields.split(",") if name.strip()]
+    allowed = service.POST_LIST_FIELDS + service.POST_LIST_AUTHOR_FIELDS + service.POST_LIST_OPTIONAL_FIELDS
+    if not selected or any(name not in allowed for name in selected):
+        raise HTTPException(status_code=400, detail="Invalid fields")
+    # id is always returned so clients can link to the post
+    return list(dict.fromkeys(["id", *selected]))
+
+
+def _post_columns(fields: List[str]) -> List[str]:
+    """Post columns the SELECT needs for the requested fields"""
+    columns = [name for name in fields if name in service.POST_LIST_FIELDS or name == "contents"]
+    if any(name in service.POST_LIST_AUTHOR_FIELDS for name in fields):
+        columns.append("author_id")
+    return columns
+
+
+def _post_list_items(posts: List, fields: List[str], loader: DataLoader) -> List[schemas.PostListItem]:
+    # Only touch the requested attributes; anything else was deferred and would lazy-load per row
+    pending = view_counter.pending_many(post.id for post in posts) if "view_count" in fields else {}
+    author_fields = [name for name in service.POST_LIST_AUTHOR_FIELDS if name in fields]
+    if author_fields:
+        loader.want("profile", (post.author_id for post in posts))
+    if "tags" in fields:
+        loader.want("post_tags", (post.id for post in posts))
+
+    columns = [name for name in _post_columns(fields) if name in fields]
+    results = []
+    for post in posts:
+        values = {name: getattr(post, name) for name in columns}
+        if "view_count" in values:
+            values["view_count"] += pending.get(post.id, 0)
+        if author_fields:
+            profile = loader.get("profile", post.author_id)
+            for name in author_fields:
+                values[name] = getattr(profile, name[len("author_"):]) if profile else None
+        if "tags" in fields:
+            values["tags"] = loader.get("post_tags", post.id, [])
+        results.append(schemas.PostListItem(**values))
+    return results
+
+
+def _with_pending_views(posts: List, loader: DataLoader) -> List[schemas.PostResponse]:
+    pending = view_counter.pending_many(post.id for post in posts)
+    results = []
+    for post in posts:
+        result = schemas.PostResponse.model_validate(post)
+        result.view_count += pending.get(post.id, 0)
+        results.append(result)
+    service.embed_authors(loader, results)
+    return results
 
 
 @router.get("/posts/{post_id}", response_model=schemas.PostResponse)
-def read_post(post_id: int, db: Session = Depends(get_db)):
-    # Increment view count
-    service.PostService.increment_view_count(db, post_id=post_id)
-    
+def read_post(
+    post_id: int,
+    request: Request,
+    response: Response,
+    viewer_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    loader: DataLoader = Depends(get_loader)
+):
     db_post = service.PostService.get_post(db, post_id=post_id)
     if db_post is None:
         raise HTTPException(status_code=404, detail="Post not found")
-    return db_post
+
+    # Views are buffered and flushed in batches; add the unflushed delta so the count looks live.
+    # Repeat views by the same viewer within the dedup window are not counted.
+    view_counter.record(post_id, viewer=_viewer_key(request, viewer_id))
+
+    # View counts change on every read, so they are left out of the validator and the ETag is weak
+    author = loader.get("profile", db_post.author_id)
+    etag = make_etag(
+        db_post.id, db_post.title, db_post.contents, db_post.updated_at, db_post.like_count, db_post.comment_count,
+        author.nickname if author else None, author.thumbnail if author else None,
+        weak=True
+    )
+    last_modified = max(value for value in (db_post.created_at, db_post.updated_at, db_post.activity_at) if value)
+    not_modified = conditional_response(request, response, etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+    return _with_pending_views([db_post], loader)[0]
+
+
+@router.get("/posts/{post_id}/full", response_model=schemas.PostDetail)
+def read_post_detail(
+    post_id: int,
+    request: Request,
+    viewer_id: Optional[int] = None,
+    comment_limit: int = Query(100, ge=0, le=100),
+    db: Session = Depends(get_db),
+    loader: DataLoader = Depends(get_loader)
+):
+    # One round trip for the post screen: post, tags, comments, author profiles and the viewer's actions
+    detail = service.PostService.get_post_detail(
+        db, post_id=post_id, viewer_id=viewer_id, comment_limit=comment_limit, loader=loader
+    )
+    if detail is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    view_counter.record(post_id, viewer=_viewer_key(request, viewer_id))
+    detail.post.view_count += view_counter.pending(post_id)
+    return detail
+
+
+def _viewer_key(request: Request, viewer_id: Optional[int]) -> Optional[str]:
+    """Identity used for view dedup and unique viewer counting: the user, or a hash of client address and agent.
+
+    request.client is the proxy unless uvicorn runs with --proxy-headers and trusts it, so anonymous
+    viewers can be left out (every view counted, none deduped) with VIEW_DEDUP_ANONYMOUS=False.
+    """
+    if viewer_id is not None:
+        return f"user:{viewer_id}"
+    if not settings.VIEW_DEDUP_ANONYMOUS:
+        return None
+    client = request.client.host if request.client else ""
+    agent = request.headers.get("user-agent", "")
+    return "anon:" + hashlib.blake2b(f"{client}|{agent}".encode("utf-8"), digest_size=8).hexdigest()
 
 
 @router.put("/posts/{post_id}", response_model=schemas.PostResponse)
@@ -76,6 +240,14 @@ def update_post(post_id: int, post_update: schemas.PostUpdate, db: Session = Dep
     return db_post
 
 
+@router.delete("/posts/{post_id}")
+def delete_post(post_id: int, db: Session = Depends(get_db)):
+    success = service.PostService.delete_post(db, post_id=post_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Post not found")
+    return {"message": "Post deleted successfully"}
+
+
 # Comment endpoints
 @router.post("/posts/{post_id}/comments", response_model=schemas.CommentResponse)
 def create_comment(post_id: int, comment: schemas.CommentCreate, author_id: int, db: Session = Depends(get_db)):
@@ -84,11 +256,61 @@ def create_comment(post_id: int, comment: schemas.CommentCreate, author_id: int,
 
 
 @router.get("/posts/{post_id}/comments", response_model=List[schemas.CommentResponse])
-def read_comments(post_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    comments = service.CommentService.get_comments_by_post(db, post_id=post_id, skip=skip, limit=limit)
+def read_comments(
+    post_id: int,
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    top_level: bool = False,
+    db: Session = Depends(get_db),
+    loader: DataLoader = Depends(get_loader)
+):
+    # top_level=true returns only root comments; each carries reply_count for lazy reply loading
+    comments = service.CommentService.get_comments_by_post(
+        db, post_id=post_id, skip=skip, limit=limit, top_level=top_level
+    )
+    comments = _with_authors(comments, loader)
+    # Comments have no row version, so hash the values the response is built from
+    etag = make_etag(skip, limit, top_level, comments)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified is not None:
+        return not_modified
     return comments
 
 
+@router.get("/posts/{post_id}/comments/tree", response_model=List[schemas.CommentTreeNode])
+def read_comment_tree(
+    post_id: int,
+    max_depth: int = 5,
+    order: str = "asc",
+    reply_order: str = "asc",
+    db: Session = Depends(get_db),
+    loader: DataLoader = Depends(get_loader)
+):
+    if order not in ["asc", "desc"] or reply_order not in ["asc", "desc"]:
+        raise HTTPException(status_code=400, detail="Invalid order")
+    if max_depth < 0:
+        raise HTTPException(status_code=400, detail="Invalid max_depth")
+    
+    roots = service.CommentService.get_comment_tree(
+        db, post_id=post_id, max_depth=max_depth, order=order, reply_order=reply_order
+    )
+    nodes, stack = [], list(roots)
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        stack.extend(node.children)
+    service.embed_authors(loader, nodes)
+    return roots
+
+
+def _with_authors(comments: List, loader: DataLoader) -> List[schemas.CommentResponse]:
+    results = [schemas.CommentResponse.model_validate(comment) for comment in comments]
+    service.embed_authors(loader, results)
+    return results
+
+
 @router.get("/comments/{comment_id}", response_model=schemas.CommentResponse)
 def read_comment(comment_id: int, db: Session = Depends(get_db)):
     db_comment = service.CommentService.get_comment(db, comment_id=comment_id)
@@ -97,6 +319,25 @@ def read_comment(comment_id: int, db: Session = Depends(get_db)):
     return db_comment
 
 
+@router.get("/comments/{comment_id}/replies", response_model=List[schemas.CommentResponse])
+def read_replies(
+    comment_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    loader: DataLoader = Depends(get_loader)
+):
+    try:
+        replies, next_cursor = service.CommentService.get_replies(
+            db, comment_id=comment_id, cursor=cursor, limit=limit
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    set_next_cursor(response, next_cursor)
+    return _with_authors(replies, loader)
+
+
 @router.put("/comments/{comment_id}", response_model=schemas.CommentResponse)
 def update_comment(comment_id: int, comment_update: schemas.CommentUpdate, db: Session = Depends(get_db)):
     db_comment = service.CommentService.update_comment(db, comment_id=comment_id, comment_update=comment_update)
@@ -111,6 +352,13 @@ def add_post_tag(post_id: int, tag: str, db: Session = Depends(get_db)):
     return service.PostTagService.add_tag(db=db, post_id=post_id, tag=tag)
 
 
+@router.put("/posts/{post_id}/tags", response_model=List[schemas.PostTagResponse])
+def set_post_tags(post_id: int, tag_set: schemas.PostTagSet, db: Session = Depends(get_db)):
+    if service.PostService.get_post(db, post_id=post_id) is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    return service.PostTagService.set_tags(db=db, post_id=post_id, tags=tag_set.tags)
+
+
 @router.get("/posts/{post_id}/tags", response_model=List[schemas.PostTagResponse])
 def get_post_tags(post_id: int, db: Session = Depends(get_db)):
     tags = service.PostTagService.get_tags_by_post(db, post_id=post_id)
@@ -123,3 +371,29 @@ def remove_post_tag(post_id: int, tag: str, db: Session = Depends(get_db)):
     if not success:
         raise HTTPException(status_code=404, detail="Tag not found")
     return {"message": "Tag removed successfully"}
+
+
+# Tag browsing endpoints
+@tag_router.get("/", response_model=List[schemas.TagCountResponse])
+def read_tags(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    return service.PostTagService.get_tag_counts(db, skip=skip, limit=limit)
+
+
+@tag_router.get("/{tag}/posts", response_model=List[schemas.PostResponse])
+def read_tag_posts(
+    tag: str,
+    response: Response,
+    board_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    loader: DataLoader = Depends(get_loader)
+):
+    try:
+        posts, next_cursor = service.PostTagService.get_posts_by_tag(
+            db, tag=tag, board_id=board_id, cursor=cursor, limit=limit
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    set_next_cursor(response, next_cursor)
+    return _with_pending_views(posts, loader)
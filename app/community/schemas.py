@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, constr
 from typing import Optional, List
 from datetime import datetime
+from app.user.schemas import ProfileResponse
 
 
 class BoardBase(BaseModel):
@@ -34,6 +35,9 @@ class BoardUpdate(BaseModel):
 class BoardResponse(BoardBase):
     id: int = Field(description="Unique identifier for the board")
     created_at: datetime = Field(description="When the board was created")
+    post_count: int = Field(0, description="Number of posts on the board")
+    last_post_at: Optional[datetime] = Field(None, description="When the latest post was created")
+    last_post_id: Optional[int] = Field(None, description="ID of the latest post")
 
     class Config:
         from_attributes = True
@@ -42,7 +46,10 @@ class BoardResponse(BoardBase):
                 "id": 1,
                 "title": "General Discussion",
                 "description": "A place for general community discussions and announcements",
-                "created_at": "2024-01-15T10:00:00Z"
+                "created_at": "2024-01-15T10:00:00Z",
+                "post_count": 42,
+                "last_post_at": "2024-02-01T09:30:00Z",
+                "last_post_id": 128
             }
         }
 
@@ -87,6 +94,9 @@ class PostResponse(PostBase):
     like_count: int = Field(description="Number of likes this post has received")
     comment_count: int = Field(description="Number of comments on this post")
     view_count: int = Field(description="Number of times this post has been viewed")
+    unique_viewer_count: int = Field(0, description="Estimated number of distinct viewers")
+    author_nickname: Optional[str] = Field(None, description="Nickname of the author, on list and detail reads")
+    author_thumbnail: Optional[str] = Field(None, description="Profile image URL of the author, on list and detail reads")
 
     class Config:
         from_attributes = True
@@ -101,7 +111,46 @@ class PostResponse(PostBase):
                 "updated_at": None,
                 "like_count": 5,
                 "comment_count": 3,
-                "view_count": 25
+                "view_count": 25,
+                "unique_viewer_count": 18,
+                "author_nickname": "John",
+                "author_thumbnail": None
+            }
+        }
+
+
+class PostListItem(BaseModel):
+    """Summary row for post listings; only the requested fields are present"""
+    id: int = Field(description="Unique identifier for the post")
+    board_id: Optional[int] = Field(None, description="ID of the board this post belongs to")
+    author_id: Optional[int] = Field(None, description="ID of the user who created this post")
+    title: Optional[str] = Field(None, description="Title of the post")
+    excerpt: Optional[str] = Field(None, description="Short preview of the post contents")
+    contents: Optional[str] = Field(None, description="Full contents, only when explicitly requested")
+    created_at: Optional[datetime] = Field(None, description="When the post was created")
+    updated_at: Optional[datetime] = Field(None, description="When the post was last updated")
+    like_count: Optional[int] = Field(None, description="Number of likes this post has received")
+    comment_count: Optional[int] = Field(None, description="Number of comments on this post")
+    view_count: Optional[int] = Field(None, description="Number of times this post has been viewed")
+    author_nickname: Optional[str] = Field(None, description="Nickname of the author")
+    author_thumbnail: Optional[str] = Field(None, description="Profile image URL of the author")
+    tags: Optional[List[str]] = Field(None, description="Tags of the post, only when explicitly requested")
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "id": 1,
+                "board_id": 1,
+                "author_id": 1,
+                "title": "Welcome to our community!",
+                "excerpt": "Hello everyone! Welcome to our church community board. Feel free to…",
+                "created_at": "2024-01-15T11:00:00Z",
+                "updated_at": None,
+                "like_count": 5,
+                "comment_count": 3,
+                "view_count": 25,
+                "author_nickname": "John",
+                "author_thumbnail": None
             }
         }
 
@@ -135,6 +184,33 @@ class PostTagResponse(PostTagBase):
         }
 
 
+class PostTagSet(BaseModel):
+    tags: List[constr(strip_whitespace=True, min_length=1, max_length=50)] = Field(
+        description="Complete set of tags for the post; tags not listed are removed", max_length=30
+    )
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "tags": ["welcome", "introductions", "prayer"]
+            }
+        }
+
+
+class TagCountResponse(BaseModel):
+    tag: str = Field(description="Tag name")
+    post_count: int = Field(description="Number of posts carrying this tag")
+
+    class Config:
+        from_attributes = True
+        schema_extra = {
+            "example": {
+                "tag": "prayer",
+                "post_count": 42
+            }
+        }
+
+
 class CommentBase(BaseModel):
     contents: str = Field(description="Content of the comment")
 
@@ -170,6 +246,9 @@ class CommentResponse(CommentBase):
     author_id: int = Field(description="ID of the user who created this comment")
     parent_id: Optional[int] = Field(None, description="ID of the parent comment (for nested comments)")
     created_at: datetime = Field(description="When the comment was created")
+    reply_count: int = Field(0, description="Number of direct replies to this comment")
+    author_nickname: Optional[str] = Field(None, description="Nickname of the author, on list reads")
+    author_thumbnail: Optional[str] = Field(None, description="Profile image URL of the author, on list reads")
 
     class Config:
         from_attributes = True
@@ -180,6 +259,91 @@ class CommentResponse(CommentBase):
                 "author_id": 1,
                 "parent_id": None,
                 "contents": "Thank you for the warm welcome! Excited to be part of this community.",
-                "created_at": "2024-01-15T11:30:00Z"
+                "created_at": "2024-01-15T11:30:00Z",
+                "reply_count": 2,
+                "author_nickname": "Mary",
+                "author_thumbnail": None
+            }
+        }
+
+
+class CommentTreeNode(CommentResponse):
+    children: List["CommentTreeNode"] = Field(default_factory=list, description="Replies to this comment, nested")
+
+    class Config:
+        from_attributes = True
+        schema_extra = {
+            "example": {
+                "id": 1,
+                "post_id": 1,
+                "author_id": 1,
+                "parent_id": None,
+                "contents": "Thank you for the warm welcome! Excited to be part of this community.",
+                "created_at": "2024-01-15T11:30:00Z",
+                "reply_count": 1,
+                "children": [
+                    {
+                        "id": 2,
+                        "post_id": 1,
+                        "author_id": 2,
+                        "parent_id": 1,
+                        "contents": "Glad to have you here!",
+                        "created_at": "2024-01-15T11:45:00Z",
+                        "reply_count": 0,
+                        "children": []
+                    }
+                ]
+            }
+        }
+
+
+class ViewerState(BaseModel):
+    liked: bool = Field(False, description="Whether the viewer likes the post")
+    bookmarked: bool = Field(False, description="Whether the viewer bookmarked the post")
+    reported: bool = Field(False, description="Whether the viewer reported the post")
+    liked_comment_ids: List[int] = Field(default_factory=list, description="IDs of the returned comments the viewer likes")
+
+
+class PostDetail(BaseModel):
+    post: PostResponse = Field(description="The post itself")
+    tags: List[str] = Field(default_factory=list, description="Tags of the post")
+    comments: List[CommentResponse] = Field(default_factory=list, description="Comments on the post, oldest first")
+    authors: List[ProfileResponse] = Field(
+        default_factory=list, description="Profiles of the post and comment authors that have one"
+    )
+    viewer: Optional[ViewerState] = Field(None, description="The viewer's own actions; present when viewer_id is given")
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "post": {
+                    "id": 1,
+                    "board_id": 1,
+                    "author_id": 1,
+                    "title": "Welcome to our community!",
+                    "contents": "Hello everyone! Welcome to our church community board.",
+                    "created_at": "2024-01-15T11:00:00Z",
+                    "updated_at": None,
+                    "like_count": 5,
+                    "comment_count": 1,
+                    "view_count": 25
+                },
+                "tags": ["welcome"],
+                "comments": [
+                    {
+                        "id": 1,
+                        "post_id": 1,
+                        "author_id": 2,
+                        "parent_id": None,
+                        "contents": "Thank you for the warm welcome!",
+                        "created_at": "2024-01-15T11:30:00Z",
+                        "reply_count": 0
+                    }
+                ],
+                "authors": [
+                    {"id": 1, "user_id": 1, "nickname": "John", "thumbnail": None, "church_id": 1, "created_at": "2024-01-15T10:30:00Z"},
+                    {"id": 2, "user_id": 2, "nickname": "Mary", "thumbnail": None, "church_id": 1, "created_at": "2024-01-15T10:40:00Z"}
+                ],
+                "viewer": {"liked": True, "bookmarked": False, "reported": False, "liked_comment_ids": [1]}
             }
         }
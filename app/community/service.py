@@ -1,6 +1,74 @@
-from sqlalchemy.orm import Session
-from typing import Optional, List
-from . import models, schemas
+from sqlalchemy import delete, func, tuple_
+from sqlalchemy.orm import Session, load_only
+from typing import Dict, Optional, List, Sequence, Tuple
+from config.config import settings
+from database import dialect_insert
+from app.pagination import encode_cursor, decode_cursor, decode_time_cursor
+from app.batch import id_in, order_by_ids
+from app.loader import DataLoader, batch_loader
+from app.search.inverted_index import search_index, post_document
+from app.refcache.cache import reference_cache
+from app.action.models import ActionLog
+from app.user import schemas as user_schemas
+from app.user import service as user_service  # noqa: F401 - registers the "profile" batch loader
+from . import counters, models, ranking, schemas
+
+
+EXCERPT_LENGTH = 160
+
+# Columns a post listing may select; contents is opt-in and never part of the default projection
+POST_LIST_FIELDS = (
+    "id", "board_id", "author_id", "title", "excerpt", "created_at", "updated_at",
+    "like_count", "comment_count", "view_count"
+)
+# Resolved from the author's profile and the post's tags through the request's DataLoader
+POST_LIST_AUTHOR_FIELDS = ("author_nickname", "author_thumbnail")
+POST_LIST_OPTIONAL_FIELDS = ("contents", "tags")
+
+
+def make_excerpt(contents: str) -> str:
+    """Collapse whitespace and cut the contents down to a list preview"""
+    text = " ".join(contents.split())
+    if len(text) <= EXCERPT_LENGTH:
+        return text
+    return text[:EXCERPT_LENGTH].rstrip() + "…"
+
+
+def embed_authors(loader: DataLoader, items) -> None:
+    """Fill author_nickname/author_thumbnail of response models with one profile query for all of them"""
+    loader.want("profile", (item.author_id for item in items))
+    for item in items:
+        profile = loader.get("profile", item.author_id)
+        item.author_nickname = profile.nickname if profile else None
+        item.author_thumbnail = profile.thumbnail if profile else None
+
+
+@batch_loader("post_tags")
+def _load_post_tags(db: Session, post_ids: List[int]) -> Dict[int, List[str]]:
+    rows = db.query(models.PostTag.post_id, models.PostTag.tag).filter(
+        id_in(db, models.PostTag.post_id, post_ids)
+    ).order_by(models.PostTag.post_id, models.PostTag.tag).all()
+    tags: Dict[int, List[str]] = {}
+    for post_id, tag in rows:
+        tags.setdefault(post_id, []).append(tag)
+    return tags
+
+
+def _load_fields(query, fields: Optional[Sequence[str]], *required: str):
+    """Narrow the SELECT to the given post columns (plus any the query itself needs)"""
+    if fields is None:
+        return query
+    names = dict.fromkeys([*fields, *required])
+    return query.options(load_only(*(getattr(models.Post, name) for name in names)))
+
+
+def _load_boards(db: Session) -> List[schemas.BoardResponse]:
+    boards = db.query(models.Board).order_by(models.Board.id).all()
+    return [schemas.BoardResponse.model_validate(board) for board in boards]
+
+
+# Every worker keeps all boards in memory; writes below announce changes through reference_cache
+board_cache = reference_cache.register("boards", _load_boards)
 
 
 class BoardService:
@@ -11,17 +79,18 @@ class BoardService:
             description=board.description
         )
         db.add(db_board)
+        reference_cache.changed(db, "boards")
         db.commit()
         db.refresh(db_board)
         return db_board
 
     @staticmethod
-    def get_board(db: Session, board_id: int) -> Optional[models.Board]:
-        return db.query(models.Board).filter(models.Board.id == board_id).first()
+    def get_board(db: Session, board_id: int) -> Optional[schemas.BoardResponse]:
+        return board_cache.get(db, board_id)
 
     @staticmethod
-    def get_boards(db: Session, skip: int = 0, limit: int = 100) -> List[models.Board]:
-        return db.query(models.Board).offset(skip).limit(limit).all()
+    def get_boards(db: Session, skip: int = 0, limit: int = 100) -> List[schemas.BoardResponse]:
+        return board_cache.all(db)[skip:skip + limit]
 
     @staticmethod
     def update_board(db: Session, board_id: int, board_update: schemas.BoardUpdate) -> Optional[models.Board]:
@@ -30,6 +99,7 @@ class BoardService:
             update_data = board_update.dict(exclude_unset=True)
             for field, value in update_data.items():
                 setattr(db_board, field, value)
+            reference_cache.changed(db, "boards")
             db.commit()
             db.refresh(db_board)
         return db_board
@@ -39,6 +109,7 @@ class BoardService:
         db_board = db.query(models.Board).filter(models.Board.id == board_id).first()
         if db_board:
             db.delete(db_board)
+            reference_cache.changed(db, "boards")
             db.commit()
             return True
         return False
@@ -51,9 +122,17 @@ class PostService:
             board_id=post.board_id,
             author_id=author_id,
             title=post.title,
-            contents=post.contents
+            contents=post.contents,
+            excerpt=make_excerpt(post.contents)
         )
         db.add(db_post)
+        db.flush()
+        counters.record_board_post(db, db_post.board_id, db_post.id)
+        # The board's post_count and latest post are part of the cached board rows
+        reference_cache.changed(db, "boards")
+        ranking.score_new_post(db, db_post)
+        if settings.SEARCH_INDEX_ENABLED:
+            search_index.index_document(db, "post", db_post.id, post_document(db_post.title, db_post.contents))
         db.commit()
         db.refresh(db_post)
         return db_post
@@ -63,47 +142,164 @@ class PostService:
         return db.query(models.Post).filter(models.Post.id == post_id).first()
 
     @staticmethod
-    def get_posts_by_board(db: Session, board_id: int, skip: int = 0, limit: int = 100) -> List[models.Post]:
-        return db.query(models.Post).filter(
+    def get_post_detail(
+        db: Session,
+        post_id: int,
+        viewer_id: Optional[int] = None,
+        comment_limit: int = 100,
+        loader: Optional[DataLoader] = None
+    ) -> Optional[schemas.PostDetail]:
+        """Everything the post screen shows, in at most five queries whatever the number of comments"""
+        loader = loader or DataLoader(db)
+        db_post = db.query(models.Post).filter(models.Post.id == post_id).first()
+        if db_post is None:
+            return None
+        tags = loader.get("post_tags", post_id, [])
+        comments = CommentService.get_comments_by_post(db, post_id=post_id, limit=comment_limit)
+
+        author_ids = list(dict.fromkeys([db_post.author_id, *(comment.author_id for comment in comments)]))
+        profiles = loader.get_many("profile", author_ids)
+
+        viewer = None
+        if viewer_id is not None:
+            viewer = schemas.ViewerState()
+            comment_ids = [comment.id for comment in comments]
+            targets = (ActionLog.target_type == "post") & (ActionLog.target_id == post_id)
+            if comment_ids:
+                targets = targets | ((ActionLog.target_type == "comment") & id_in(db, ActionLog.target_id, comment_ids))
+            actions = db.query(ActionLog.action_type, ActionLog.target_type, ActionLog.target_id).filter(
+                ActionLog.user_id == viewer_id,
+                ActionLog.is_on == True,
+                targets
+            ).all()
+            for action_type, target_type, target_id in actions:
+                if target_type == "comment":
+                    if action_type == "like":
+                        viewer.liked_comment_ids.append(target_id)
+                elif action_type == "like":
+                    viewer.liked = True
+                elif action_type == "bookmark":
+                    viewer.bookmarked = True
+                elif action_type == "report":
+                    viewer.reported = True
+
+        post = schemas.PostResponse.model_validate(db_post)
+        comment_responses = [schemas.CommentResponse.model_validate(comment) for comment in comments]
+        embed_authors(loader, [post, *comment_responses])
+        return schemas.PostDetail(
+            post=post,
+            tags=tags,
+            comments=comment_responses,
+            authors=[user_schemas.ProfileResponse.model_validate(profile) for profile in profiles.values() if profile],
+            viewer=viewer
+        )
+
+    @staticmethod
+    def get_posts_by_ids(db: Session, ids: List[int]) -> Tuple[List[models.Post], List[int]]:
+        """Posts in the order of ids, plus the ids that do not exist"""
+        posts = db.query(models.Post).filter(id_in(db, models.Post.id, ids)).all()
+        return order_by_ids(posts, ids)
+
+    @staticmethod
+    def get_posts_by_board(db: Session, board_id: int, skip: int = 0, limit: int = 100, fields: Optional[Sequence[str]] = None) -> List[models.Post]:
+        query = _load_fields(db.query(models.Post), fields)
+        return query.filter(
             models.Post.board_id == board_id
-        ).order_by(models.Post.created_at.desc()).offset(skip).limit(limit).all()
+        ).order_by(models.Post.created_at.desc(), models.Post.id.desc()).offset(skip).limit(limit).all()
+
+    @staticmethod
+    def get_posts_by_board_cursor(db: Session, board_id: int, cursor: Optional[str] = None, limit: int = 100, fields: Optional[Sequence[str]] = None) -> Tuple[List[models.Post], Optional[str]]:
+        # Keyset pagination over idx_posts_board_created_id: every page is an index range scan
+        query = _load_fields(db.query(models.Post), fields, "created_at")
+        query = query.filter(models.Post.board_id == board_id)
+        if cursor:
+            created_at, post_id = decode_time_cursor(cursor)
+            query = query.filter(tuple_(models.Post.created_at, models.Post.id) < (created_at, post_id))
+        posts = query.order_by(models.Post.created_at.desc(), models.Post.id.desc()).limit(limit).all()
+
+        next_cursor = None
+        if posts and len(posts) == limit:
+            next_cursor = encode_cursor(posts[-1].created_at, posts[-1].id)
+        return posts, next_cursor
+
+    @staticmethod
+    def get_hot_posts_by_board(db: Session, board_id: int, cursor: Optional[str] = None, limit: int = 100, fields: Optional[Sequence[str]] = None) -> Tuple[List[models.Post], Optional[str]]:
+        # Reads idx_post_scores_board_score in order; scores are refreshed by the refresh_post_scores task
+        query = _load_fields(db.query(models.Post, models.PostScore.score), fields).join(
+            models.PostScore, models.PostScore.post_id == models.Post.id
+        ).filter(models.PostScore.board_id == board_id)
+        if cursor:
+            values = decode_cursor(cursor)
+            try:
+                score, post_id = float(values[0]), int(values[1])
+            except (IndexError, ValueError, TypeError) as e:
+                raise ValueError("Invalid cursor") from e
+            query = query.filter(tuple_(models.PostScore.score, models.PostScore.post_id) < (score, post_id))
+        rows = query.order_by(models.PostScore.score.desc(), models.PostScore.post_id.desc()).limit(limit).all()
+
+        next_cursor = None
+        if rows and len(rows) == limit:
+            next_cursor = encode_cursor(rows[-1].score, rows[-1].Post.id)
+        return [row.Post for row in rows], next_cursor
 
     @staticmethod
     def update_post(db: Session, post_id: int, post_update: schemas.PostUpdate) -> Optional[models.Post]:
         db_post = db.query(models.Post).filter(models.Post.id == post_id).first()
         if db_post:
+            previous_text = post_document(db_post.title, db_post.contents)
             update_data = post_update.dict(exclude_unset=True)
             for field, value in update_data.items():
                 setattr(db_post, field, value)
+            if "contents" in update_data:
+                db_post.excerpt = make_excerpt(db_post.contents)
+            db_post.updated_at = func.now()
+            if settings.SEARCH_INDEX_ENABLED:
+                search_index.index_document(
+                    db, "post", db_post.id, post_document(db_post.title, db_post.contents), previous_text=previous_text
+                )
             db.commit()
             db.refresh(db_post)
         return db_post
 
     @staticmethod
-    def increment_view_count(db: Session, post_id: int) -> Optional[models.Post]:
+    def delete_post(db: Session, post_id: int) -> bool:
         db_post = db.query(models.Post).filter(models.Post.id == post_id).first()
-        if db_post:
-            db_post.view_count += 1
-            db.commit()
-            db.refresh(db_post)
-        return db_post
+        if not db_post:
+            return False
+        tags = [tag for (tag,) in db.query(models.PostTag.tag).filter(models.PostTag.post_id == post_id)]
+        if tags:
+            counters.adjust_tag_counts(db, {tag: -1 for tag in tags})
+        if settings.SEARCH_INDEX_ENABLED:
+            # Comment postings are left behind; search drops hits whose document no longer exists
+            search_index.remove_document(db, "post", post_id, post_document(db_post.title, db_post.contents))
+        board_id = db_post.board_id
+        # Comments, tags and the score row go with the post through ON DELETE CASCADE
+        db.delete(db_post)
+        db.flush()
+        counters.remove_board_post(db, board_id, post_id)
+        reference_cache.changed(db, "boards")
+        db.commit()
+        return True
+
+    @staticmethod
+    def increment_view_count(db: Session, post_id: int) -> Optional[models.Post]:
+        return PostService._commit_counter(db, post_id, "view_count", 1)
 
     @staticmethod
     def increment_like_count(db: Session, post_id: int) -> Optional[models.Post]:
-        db_post = db.query(models.Post).filter(models.Post.id == post_id).first()
-        if db_post:
-            db_post.like_count += 1
-            db.commit()
-            db.refresh(db_post)
-        return db_post
+        return PostService._commit_counter(db, post_id, "like_count", 1)
 
     @staticmethod
     def decrement_like_count(db: Session, post_id: int) -> Optional[models.Post]:
-        db_post = db.query(models.Post).filter(models.Post.id == post_id).first()
-        if db_post and db_post.like_count > 0:
-            db_post.like_count -= 1
-            db.commit()
-            db.refresh(db_post)
+        return PostService._commit_counter(db, post_id, "like_count", -1)
+
+    @staticmethod
+    def _commit_counter(db: Session, post_id: int, field: str, amount: int) -> Optional[models.Post]:
+        db_post = counters.adjust_post_counter(db, post_id, field, amount)
+        if db_post:
+            # Detach so the RETURNING values stay readable after commit without a reload
+            db.expunge(db_post)
+        db.commit()
         return db_post
 
 
@@ -117,11 +313,14 @@ class CommentService:
             parent_id=comment.parent_id
         )
         db.add(db_comment)
+        db.flush()
+        if settings.SEARCH_INDEX_ENABLED:
+            search_index.index_document(db, "comment", db_comment.id, db_comment.contents)
         
-        # Update comment count on post
-        db_post = db.query(models.Post).filter(models.Post.id == comment.post_id).first()
-        if db_post:
-            db_post.comment_count += 1
+        # Update comment count on post, and reply count on the parent comment
+        counters.increment_post_counter(db, comment.post_id, "comment_count")
+        if comment.parent_id is not None:
+            counters.adjust_comment_counter(db, comment.parent_id, "reply_count", 1)
         
         db.commit()
         db.refresh(db_comment)
@@ -132,18 +331,71 @@ class CommentService:
         return db.query(models.Comment).filter(models.Comment.id == comment_id).first()
 
     @staticmethod
-    def get_comments_by_post(db: Session, post_id: int, skip: int = 0, limit: int = 100) -> List[models.Comment]:
-        return db.query(models.Comment).filter(
+    def get_comments_by_post(db: Session, post_id: int, skip: int = 0, limit: int = 100, top_level: bool = False) -> List[models.Comment]:
+        query = db.query(models.Comment).filter(models.Comment.post_id == post_id)
+        if top_level:
+            query = query.filter(models.Comment.parent_id.is_(None))
+        return query.order_by(models.Comment.created_at.asc()).offset(skip).limit(limit).all()
+
+    @staticmethod
+    def get_replies(db: Session, comment_id: int, cursor: Optional[str] = None, limit: int = 20) -> Tuple[List[models.Comment], Optional[str]]:
+        # Keyset pagination over idx_comments_parent_created_id, oldest reply first
+        query = db.query(models.Comment).filter(models.Comment.parent_id == comment_id)
+        if cursor:
+            created_at, reply_id = decode_time_cursor(cursor)
+            query = query.filter(tuple_(models.Comment.created_at, models.Comment.id) > (created_at, reply_id))
+        replies = query.order_by(models.Comment.created_at.asc(), models.Comment.id.asc()).limit(limit).all()
+
+        next_cursor = None
+        if replies and len(replies) == limit:
+            next_cursor = encode_cursor(replies[-1].created_at, replies[-1].id)
+        return replies, next_cursor
+
+    @staticmethod
+    def get_comment_tree(db: Session, post_id: int, max_depth: int = 5, order: str = "asc", reply_order: str = "asc") -> List[schemas.CommentTreeNode]:
+        # One scan of idx_comments_post_created_id, then the tree is linked in memory in O(n)
+        comments = db.query(models.Comment).filter(
             models.Comment.post_id == post_id
-        ).order_by(models.Comment.created_at.asc()).offset(skip).limit(limit).all()
+        ).order_by(models.Comment.created_at.asc(), models.Comment.id.asc()).all()
+
+        nodes = {comment.id: schemas.CommentTreeNode.model_validate(comment) for comment in comments}
+        roots = []
+        for comment in comments:
+            parent = nodes.get(comment.parent_id) if comment.parent_id is not None else None
+            if parent is None:
+                roots.append(nodes[comment.id])
+            else:
+                parent.children.append(nodes[comment.id])
+
+        if order == "desc":
+            roots.reverse()
+
+        # Walk top-down to cut replies below max_depth and apply the reply ordering per level
+        level, depth = roots, 0
+        while level:
+            next_level = []
+            for node in level:
+                if depth >= max_depth:
+                    node.children = []
+                    continue
+                if reply_order == "desc":
+                    node.children.reverse()
+                next_level.extend(node.children)
+            level, depth = next_level, depth + 1
+        return roots
 
     @staticmethod
     def update_comment(db: Session, comment_id: int, comment_update: schemas.CommentUpdate) -> Optional[models.Comment]:
         db_comment = db.query(models.Comment).filter(models.Comment.id == comment_id).first()
         if db_comment:
+            previous_text = db_comment.contents
             update_data = comment_update.dict(exclude_unset=True)
             for field, value in update_data.items():
                 setattr(db_comment, field, value)
+            if settings.SEARCH_INDEX_ENABLED:
+                search_index.index_document(
+                    db, "comment", db_comment.id, db_comment.contents, previous_text=previous_text
+                )
             db.commit()
             db.refresh(db_comment)
         return db_comment
@@ -154,10 +406,38 @@ class PostTagService:
     def add_tag(db: Session, post_id: int, tag: str) -> models.PostTag:
         db_tag = models.PostTag(post_id=post_id, tag=tag)
         db.add(db_tag)
+        counters.adjust_tag_counts(db, {tag: 1})
         db.commit()
         db.refresh(db_tag)
         return db_tag
 
+    @staticmethod
+    def set_tags(db: Session, post_id: int, tags: List[str]) -> List[models.PostTag]:
+        # Replace the whole tag set with one DELETE and one bulk INSERT in a single transaction
+        tags = list(dict.fromkeys(tags))
+        
+        delete_stmt = delete(models.PostTag).where(models.PostTag.post_id == post_id)
+        if tags:
+            delete_stmt = delete_stmt.where(models.PostTag.tag.not_in(tags))
+        removed = db.execute(
+            delete_stmt.returning(models.PostTag.tag), execution_options={"synchronize_session": False}
+        ).scalars().all()
+        
+        added = []
+        if tags:
+            insert_stmt = dialect_insert(db, models.PostTag).values(
+                [{"post_id": post_id, "tag": tag} for tag in tags]
+            ).on_conflict_do_nothing()
+            # RETURNING only yields rows that were actually inserted
+            added = db.execute(insert_stmt.returning(models.PostTag.tag)).scalars().all()
+        
+        deltas = {tag: 1 for tag in added}
+        deltas.update({tag: -1 for tag in removed})
+        counters.adjust_tag_counts(db, deltas)
+        
+        db.commit()
+        return [models.PostTag(post_id=post_id, tag=tag) for tag in tags]
+
     @staticmethod
     def get_tags_by_post(db: Session, post_id: int) -> List[models.PostTag]:
         return db.query(models.PostTag).filter(models.PostTag.post_id == post_id).all()
@@ -170,6 +450,33 @@ class PostTagService:
         ).first()
         if db_tag:
             db.delete(db_tag)
+            counters.adjust_tag_counts(db, {tag: -1})
             db.commit()
             return True
         return False
+
+    @staticmethod
+    def get_tag_counts(db: Session, skip: int = 0, limit: int = 100) -> List[models.TagCount]:
+        return db.query(models.TagCount).filter(
+            models.TagCount.post_count > 0
+        ).order_by(models.TagCount.post_count.desc(), models.TagCount.tag.asc()).offset(skip).limit(limit).all()
+
+    @staticmethod
+    def get_posts_by_tag(db: Session, tag: str, board_id: Optional[int] = None, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[models.Post], Optional[str]]:
+        # Walks idx_post_tags_tag_post backwards from the cursor, newest post first
+        query = db.query(models.Post).join(
+            models.PostTag, models.PostTag.post_id == models.Post.id
+        ).filter(models.PostTag.tag == tag)
+        if board_id is not None:
+            query = query.filter(models.Post.board_id == board_id)
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != 1 or not isinstance(values[0], int):
+                raise ValueError("Invalid cursor")
+            query = query.filter(models.PostTag.post_id < values[0])
+        posts = query.order_by(models.PostTag.post_id.desc()).limit(limit).all()
+
+        next_cursor = None
+        if posts and len(posts) == limit:
+            next_cursor = encode_cursor(posts[-1].id)
+        return posts, next_cursor
@@ -0,0 +1,274 @@
+"""
+Write-behind buffer for post view counts.
+
+Reads record a view in memory (or Redis) instead of committing to
+posts.view_count. Pending views are coalesced per post and written with one
+batched UPDATE on an interval, when the buffer grows past a threshold, and
+on shutdown.
+
+Views that carry a viewer key are also added to the post's HyperLogLog
+sketch of distinct viewers, and a repeat view by the same viewer within the
+dedup window is dropped before it reaches either.
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from config.config import settings
+from database import SessionLocal
+from . import counters
+from .hll import HyperLogLog
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryViewStore:
+    """Pending view deltas and viewer sketches held in this process"""
+
+    def __init__(self, dedup_max_entries: int):
+        self._pending: Dict[int, int] = defaultdict(int)
+        self._sketches: Dict[int, HyperLogLog] = {}
+        # (viewer, post_id) -> when the dedup window ends, least recently seen first
+        self._seen: "OrderedDict[Tuple[str, int], float]" = OrderedDict()
+        self._dedup_max_entries = dedup_max_entries
+        self._lock = threading.Lock()
+
+    def first_view(self, viewer: str, post_id: int, window: float) -> bool:
+        now = time.monotonic()
+        key = (viewer, post_id)
+        with self._lock:
+            expires_at = self._seen.pop(key, None)
+            if expires_at is not None and expires_at > now:
+                self._seen[key] = expires_at
+                return False
+            self._seen[key] = now + window
+            while len(self._seen) > self._dedup_max_entries:
+                self._seen.popitem(last=False)
+            return True
+
+    def add_viewer(self, post_id: int, viewer: str) -> None:
+        with self._lock:
+            sketch = self._sketches.get(post_id)
+            if sketch is None:
+                sketch = self._sketches[post_id] = HyperLogLog()
+            sketch.add(viewer)
+
+    def add(self, post_id: int, amount: int = 1) -> int:
+        with self._lock:
+            self._pending[post_id] += amount
+            return len(self._pending)
+
+    def pending(self, post_ids: Iterable[int]) -> Dict[int, int]:
+        with self._lock:
+            return {post_id: self._pending.get(post_id, 0) for post_id in post_ids}
+
+    def drain(self) -> Dict[int, int]:
+        with self._lock:
+            drained, self._pending = dict(self._pending), defaultdict(int)
+            return drained
+
+    def restore(self, deltas: Dict[int, int]) -> None:
+        with self._lock:
+            for post_id, amount in deltas.items():
+                self._pending[post_id] += amount
+
+    def drain_viewers(self) -> Dict[int, HyperLogLog]:
+        with self._lock:
+            drained, self._sketches = self._sketches, {}
+            return drained
+
+    def write_viewers(self, db, sketches: Dict[int, HyperLogLog]) -> None:
+        counters.merge_viewer_sketches(db, sketches)
+
+    def restore_viewers(self, sketches: Dict[int, HyperLogLog]) -> None:
+        with self._lock:
+            for post_id, sketch in sketches.items():
+                if post_id in self._sketches:
+                    self._sketches[post_id].merge(sketch)
+                else:
+                    self._sketches[post_id] = sketch
+
+
+class RedisViewStore:
+    """Pending view deltas shared by every worker through a Redis hash.
+
+    Viewer sketches live in Redis HyperLogLogs (PFADD) for good; flushes only
+    copy PFCOUNT of the posts that gained viewers into posts.unique_viewer_count.
+    """
+
+    KEY = "post_views:pending"
+    SEEN_KEY = "post_views:seen"
+    VIEWERS_KEY = "post_viewers"
+    DIRTY_KEY = "post_viewers:dirty"
+
+    def __init__(self, url: str):
+        import redis
+
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._response_error = redis.exceptions.ResponseError
+
+    def first_view(self, viewer: str, post_id: int, window: float) -> bool:
+        # SET NX succeeds only for the first view in the window, across every worker
+        return bool(self._redis.set(f"{self.SEEN_KEY}:{post_id}:{viewer}", 1, nx=True, px=int(window * 1000)))
+
+    def add_viewer(self, post_id: int, viewer: str) -> None:
+        pipe = self._redis.pipeline()
+        pipe.pfadd(f"{self.VIEWERS_KEY}:{post_id}", viewer)
+        pipe.sadd(self.DIRTY_KEY, post_id)
+        pipe.execute()
+
+    def add(self, post_id: int, amount: int = 1) -> int:
+        pipe = self._redis.pipeline()
+        pipe.hincrby(self.KEY, post_id, amount)
+        pipe.hlen(self.KEY)
+        return pipe.execute()[1]
+
+    def pending(self, post_ids: Iterable[int]) -> Dict[int, int]:
+        post_ids = list(post_ids)
+        if not post_ids:
+            return {}
+        values = self._redis.hmget(self.KEY, post_ids)
+        return {post_id: int(value or 0) for post_id, value in zip(post_ids, values)}
+
+    def drain(self) -> Dict[int, int]:
+        # Renaming is atomic, so increments landing during the flush go to a fresh hash
+        batch_key = f"{self.KEY}:flushing:{uuid.uuid4().hex}"
+        if not self._redis.exists(self.KEY):
+            return {}
+        try:
+            self._redis.rename(self.KEY, batch_key)
+        except self._response_error:
+            # Another worker drained the hash first
+            return {}
+        pipe = self._redis.pipeline()
+        pipe.hgetall(batch_key)
+        pipe.delete(batch_key)
+        drained = pipe.execute()[0]
+        return {int(post_id): int(amount) for post_id, amount in drained.items()}
+
+    def restore(self, deltas: Dict[int, int]) -> None:
+        pipe = self._redis.pipeline()
+        for post_id, amount in deltas.items():
+            pipe.hincrby(self.KEY, post_id, amount)
+        pipe.execute()
+
+    def drain_viewers(self) -> Dict[int, int]:
+        batch_key = f"{self.DIRTY_KEY}:flushing:{uuid.uuid4().hex}"
+        if not self._redis.exists(self.DIRTY_KEY):
+            return {}
+        try:
+            self._redis.rename(self.DIRTY_KEY, batch_key)
+        except self._response_error:
+            return {}
+        pipe = self._redis.pipeline()
+        pipe.smembers(batch_key)
+        pipe.delete(batch_key)
+        post_ids = sorted(int(post_id) for post_id in pipe.execute()[0])
+        pipe = self._redis.pipeline()
+        for post_id in post_ids:
+            pipe.pfcount(f"{self.VIEWERS_KEY}:{post_id}")
+        return dict(zip(post_ids, pipe.execute()))
+
+    def write_viewers(self, db, counts: Dict[int, int]) -> None:
+        counters.set_unique_viewer_counts(db, counts)
+
+    def restore_viewers(self, counts: Dict[int, int]) -> None:
+        if counts:
+            self._redis.sadd(self.DIRTY_KEY, *counts)
+
+
+class ViewCounterBuffer:
+    def __init__(self, store, flush_interval: float, flush_threshold: int, dedup_window: float = 0):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.dedup_window = dedup_window
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def first_view(self, viewer: str, post_id: int) -> bool:
+        """False if viewer already viewed the post within the dedup window (always True when dedup is off)"""
+        return self.dedup_window <= 0 or self.store.first_view(viewer, post_id, self.dedup_window)
+
+    def record(self, post_id: int, viewer: Optional[str] = None) -> bool:
+        """Buffer a view, returning False if viewer already viewed the post within the dedup window"""
+        if viewer is not None:
+            if not self.first_view(viewer, post_id):
+                return False
+            self.store.add_viewer(post_id, viewer)
+        size = self.store.add(post_id)
+        if size >= self.flush_threshold:
+            # Never flushed on the request path: the flusher is started here if the app has not started it
+            self.start()
+            self._wakeup.set()
+        return True
+
+    def pending(self, post_id: int) -> int:
+        return self.store.pending([post_id])[post_id]
+
+    def pending_many(self, post_ids: Iterable[int]) -> Dict[int, int]:
+        return self.store.pending(post_ids)
+
+    def flush(self) -> int:
+        """Write all pending views and viewer sketches to posts, returning the number of posts touched"""
+        deltas = self.store.drain()
+        viewers = self.store.drain_viewers()
+        if not deltas and not viewers:
+            return 0
+        db = SessionLocal()
+        try:
+            counters.apply_post_counter_deltas(db, "view_count", deltas)
+            self.store.write_viewers(db, viewers)
+            db.commit()
+        except Exception:
+            db.rollback()
+            self.store.restore(deltas)
+            self.store.restore_viewers(viewers)
+            raise
+        finally:
+            db.close()
+        return len(set(deltas) | set(viewers))
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="view-counter-flush", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stopping = True
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush buffered view counts")
+
+
+def _create_store():
+    if settings.VIEW_COUNTER_BACKEND == "redis":
+        return RedisViewStore(settings.REDIS_URL)
+    return MemoryViewStore(dedup_max_entries=settings.VIEW_DEDUP_MAX_ENTRIES)
+
+
+view_counter = ViewCounterBuffer(
+    _create_store(),
+    flush_interval=settings.VIEW_COUNTER_FLUSH_INTERVAL,
+    flush_threshold=settings.VIEW_COUNTER_FLUSH_THRESHOLD,
+    dedup_window=settings.VIEW_DEDUP_WINDOW,
+)
@@ -0,0 +1,80 @@
+"""
+Conditional GET helpers: ETag / Last-Modified validators, 304 responses and Cache-Control
+"""
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# Cache-Control policies used by the read endpoints
+NO_CACHE = "no-cache"                    # may be stored, but revalidated on every use
+PRIVATE_NO_CACHE = "private, no-cache"   # per-user data: browsers only, never shared caches
+PUBLIC_DIRECTORY = "public, max-age=300" # rarely changing directories a CDN may serve for a while
+
+
+def make_etag(*parts: Any, weak: bool = False) -> str:
+    """ETag from a row version or the raw values a response is built from"""
+    raw = json.dumps(parts, default=_json_default, separators=(",", ":"), sort_keys=True)
+    tag = '"' + hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest() + '"'
+    return "W/" + tag if weak else tag
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = NO_CACHE
+) -> Optional[Response]:
+    """Return a 304 response if the client's copy is current, otherwise set the validators on response"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def _not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since and uses weak comparison
+        if if_none_match.strip() == "*":
+            return True
+        return _opaque(etag) in {_opaque(tag) for tag in if_none_match.split(",")}
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return _as_utc(last_modified).replace(microsecond=0) <= since
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    return str(value)
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, DateTime, BigInteger
+from database import Base
+
+
+class JobState(Base):
+    __tablename__ = "job_states"
+
+    name = Column(String(100), primary_key=True)
+    # Watermarks recording how far an incremental background job has progressed
+    last_run_at = Column(DateTime(timezone=True))
+    last_id = Column(BigInteger)
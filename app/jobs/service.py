@@ -0,0 +1,30 @@
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
+from . import models
+
+
+class JobStateService:
+    @staticmethod
+    def get_state(db: Session, name: str, for_update: bool = False) -> models.JobState:
+        """Load a job's watermark row, creating it on first use"""
+        query = db.query(models.JobState).filter(models.JobState.name == name)
+        if for_update:
+            # Serializes concurrent runs of the same job
+            query = query.with_for_update()
+        state = query.first()
+        if state is None:
+            state = models.JobState(name=name)
+            db.add(state)
+            db.flush()
+        return state
+
+    @staticmethod
+    def advance(db: Session, state: models.JobState, last_run_at: Optional[datetime] = None, last_id: Optional[int] = None) -> models.JobState:
+        """Move a watermark forward; committed together with the job's own writes"""
+        if last_run_at is not None:
+            state.last_run_at = last_run_at
+        if last_id is not None:
+            state.last_id = last_id
+        db.flush()
+        return state
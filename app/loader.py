@@ -0,0 +1,68 @@
+"""
+Request-scoped batching of related-row lookups.
+
+Code that enriches a list queues the keys it needs with ``want``; the first
+``get`` for an entity then resolves every queued key with one ``IN`` query.
+Results, including misses, are kept for the rest of the request so no key is
+fetched twice.
+"""
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, Iterable, List
+
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+from database import get_db
+
+BatchFunction = Callable[[Session, List[Hashable]], Dict[Hashable, Any]]
+
+_batch_functions: Dict[str, BatchFunction] = {}
+
+
+def batch_loader(entity: str):
+    """Register fn(db, keys) -> {key: value} as the batch query for an entity"""
+    def register(fn: BatchFunction) -> BatchFunction:
+        _batch_functions[entity] = fn
+        return fn
+    return register
+
+
+class DataLoader:
+    def __init__(self, db: Session):
+        self.db = db
+        self._cache: Dict[str, Dict[Hashable, Any]] = defaultdict(dict)
+        # Insertion-ordered sets of keys waiting for the next query
+        self._queued: Dict[str, Dict[Hashable, None]] = defaultdict(dict)
+
+    def want(self, entity: str, keys: Iterable[Hashable]) -> None:
+        cache, queued = self._cache[entity], self._queued[entity]
+        for key in keys:
+            if key not in cache:
+                queued[key] = None
+
+    def get(self, entity: str, key: Hashable, default: Any = None) -> Any:
+        if key not in self._cache[entity]:
+            self.want(entity, [key])
+            self._dispatch(entity)
+        value = self._cache[entity][key]
+        return default if value is None else value
+
+    def get_many(self, entity: str, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        keys = list(keys)
+        self.want(entity, keys)
+        self._dispatch(entity)
+        return {key: self._cache[entity][key] for key in keys}
+
+    def _dispatch(self, entity: str) -> None:
+        keys = list(self._queued.pop(entity, {}))
+        if not keys:
+            return
+        found = _batch_functions[entity](self.db, keys)
+        cache = self._cache[entity]
+        for key in keys:
+            cache[key] = found.get(key)
+
+
+def get_loader(db: Session = Depends(get_db)) -> DataLoader:
+    """One loader per request, sharing the request's session"""
+    return DataLoader(db)
@@ -6,8 +6,12 @@ Centralized models registry to avoid circular imports
 from app.user.models import User, Profile
 from app.church.models import Church
 from app.verification.models import IdentityVerification
-from app.community.models import Board, Post, PostTag, Comment
-from app.action.models import ActionLog
+from app.community.models import Board, Post, PostScore, PostTag, TagCount, Comment
+from app.action.models import ActionLog, ViewLog, ActionCount
+from app.search.models import SearchPosting
+from app.jobs.models import JobState
+from app.refcache.models import RefCacheVersion
+from app.analytics.models import ActionRollupHourly, ActionRollupDaily
 
 # Export all models for easy importing
 __all__ = [
@@ -17,9 +21,18 @@ __all__ = [
     'IdentityVerification',
     'Board',
     'Post',
+    'PostScore',
     'PostTag',
+    'TagCount',
     'Comment',
-    'ActionLog'
+    'ActionLog',
+    'ViewLog',
+    'ActionCount',
+    'SearchPosting',
+    'JobState',
+    'RefCacheVersion',
+    'ActionRollupHourly',
+    'ActionRollupDaily'
 ]
 
 # Models dictionary for dynamic access
@@ -30,9 +43,18 @@ MODELS = {
     'IdentityVerification': IdentityVerification,
     'Board': Board,
     'Post': Post,
+    'PostScore': PostScore,
     'PostTag': PostTag,
+    'TagCount': TagCount,
     'Comment': Comment,
-    'ActionLog': ActionLog
+    'ActionLog': ActionLog,
+    'ViewLog': ViewLog,
+    'ActionCount': ActionCount,
+    'SearchPosting': SearchPosting,
+    'JobState': JobState,
+    'RefCacheVersion': RefCacheVersion,
+    'ActionRollupHourly': ActionRollupHourly,
+    'ActionRollupDaily': ActionRollupDaily
 }
 
 def get_model(model_name: str):
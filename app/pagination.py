@@ -0,0 +1,49 @@
+"""
+Opaque cursor helpers for keyset pagination
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional
+
+from fastapi import Response
+
+# Response header carrying the cursor for the next page of a keyset-paginated list
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Upper bound on the limit of a keyset-paginated list
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row of a page into an opaque cursor"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def decode_time_cursor(cursor: str) -> tuple:
+    """Decode a (created_at, id) cursor"""
+    values = decode_cursor(cursor)
+    try:
+        created_at, row_id = values
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """Expose the next page cursor to the client, if there is one"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
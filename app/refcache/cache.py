@@ -0,0 +1,207 @@
+"""
+In-process cache of small, rarely changing reference tables (boards, churches).
+
+Each worker keeps whole tables in memory and serves reads without touching the
+database. Services call ``reference_cache.changed(db, name)`` before
+committing a write:
+
+- on PostgreSQL this issues a transactional ``NOTIFY``, delivered to the
+  listener thread of every worker only once the write commits;
+- elsewhere (SQLite in tests) it bumps a row in ``ref_cache_versions`` that
+  the same thread polls.
+
+The writing worker also drops its own copy right after the commit, so a
+client never reads back stale data from the worker that served its write.
+"""
+import logging
+import select
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, func, select as sql_select
+from sqlalchemy.orm import Session
+
+from config.config import settings
+from database import SessionLocal, engine, dialect_insert
+from app.http_cache import make_etag
+from . import models
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "refcache"
+# Session.info key holding the tables changed by the current transaction
+_PENDING_KEY = "refcache_changed"
+
+
+class ReferenceTable:
+    def __init__(self, name: str, loader: Callable[[Session], List[Any]], enabled: bool = True):
+        self.name = name
+        self.loader = loader
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        # (rows, rows by id, etag) swapped as one object so readers never see half of a reload
+        self._snapshot: Optional[Tuple[List[Any], Dict[int, Any], str]] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def all(self, db: Session) -> List[Any]:
+        return self._rows(db)[0]
+
+    def get(self, db: Session, row_id: int) -> Optional[Any]:
+        return self._rows(db)[1].get(row_id)
+
+    def all_with_etag(self, db: Session) -> Tuple[List[Any], str]:
+        """All rows together with the ETag of exactly that snapshot"""
+        rows, _, etag = self._rows(db)
+        return rows, etag
+
+    def size(self) -> Optional[int]:
+        snapshot = self._snapshot
+        return len(snapshot[0]) if snapshot is not None else None
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+
+    def _rows(self, db: Session) -> Tuple[List[Any], Dict[int, Any], str]:
+        snapshot = self._snapshot
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot
+        self.misses += 1
+
+        generation = self._generation
+        rows = self.loader(db)
+        snapshot = (rows, {row.id: row for row in rows}, make_etag(self.name, rows))
+        if self.enabled:
+            with self._lock:
+                # An invalidation that raced with the load means rows may already be stale
+                if generation == self._generation:
+                    self._snapshot = snapshot
+        return snapshot
+
+
+class ReferenceCache:
+    def __init__(self, enabled: bool, poll_interval: float):
+        self.enabled = enabled
+        self.poll_interval = poll_interval
+        self.tables: Dict[str, ReferenceTable] = {}
+        self._versions: Dict[str, int] = {}
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def register(self, name: str, loader: Callable[[Session], List[Any]]) -> ReferenceTable:
+        table = ReferenceTable(name, loader, enabled=self.enabled)
+        self.tables[name] = table
+        return table
+
+    def changed(self, db: Session, name: str) -> None:
+        """Announce a change to a cached table as part of the session's current transaction"""
+        db.info.setdefault(_PENDING_KEY, set()).add(name)
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(sql_select(func.pg_notify(CHANNEL, name)))
+            return
+        stmt = dialect_insert(db, models.RefCacheVersion).values(name=name, version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[models.RefCacheVersion.name],
+            set_={"version": models.RefCacheVersion.version + 1}
+        )
+        db.execute(stmt)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        if name is None:
+            for table in self.tables.values():
+                table.invalidate()
+        elif name in self.tables:
+            self.tables[name].invalidate()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "hits": table.hits,
+                "misses": table.misses,
+                "hit_ratio": table.hits / (table.hits + table.misses) if table.hits + table.misses else None,
+                "cached_rows": table.size()
+            }
+            for name, table in self.tables.items()
+        }
+
+    def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+        self._stopping.clear()
+        if engine.dialect.name == "postgresql":
+            target, thread_name = self._listen, "refcache-listen"
+        else:
+            self._versions = self._read_versions()
+            target, thread_name = self._poll, "refcache-poll"
+        self._thread = threading.Thread(target=target, name=thread_name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+    def _listen(self) -> None:
+        while not self._stopping.is_set():
+            connection = None
+            try:
+                connection = engine.raw_connection()
+                dbapi_connection = connection.driver_connection
+                dbapi_connection.autocommit = True
+                dbapi_connection.cursor().execute(f"LISTEN {CHANNEL}")
+                # Notifications sent while we were not listening are lost, so start from scratch
+                self.invalidate()
+                while not self._stopping.is_set():
+                    if select.select([dbapi_connection], [], [], self.poll_interval) == ([], [], []):
+                        continue
+                    dbapi_connection.poll()
+                    while dbapi_connection.notifies:
+                        self.invalidate(dbapi_connection.notifies.pop(0).payload)
+            except Exception:
+                logger.exception("Reference cache listener failed; reconnecting")
+                self._stopping.wait(self.poll_interval)
+            finally:
+                if connection is not None:
+                    connection.invalidate()
+
+    def _poll(self) -> None:
+        while not self._stopping.wait(self.poll_interval):
+            try:
+                versions = self._read_versions()
+            except Exception:
+                logger.exception("Failed to poll reference cache versions")
+                continue
+            for name, version in versions.items():
+                if self._versions.get(name) != version:
+                    self.invalidate(name)
+            self._versions = versions
+
+    def _read_versions(self) -> Dict[str, int]:
+        db = SessionLocal()
+        try:
+            return dict(db.query(models.RefCacheVersion.name, models.RefCacheVersion.version).all())
+        finally:
+            db.close()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for name in session.info.pop(_PENDING_KEY, ()):
+        reference_cache.invalidate(name)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+reference_cache = ReferenceCache(
+    enabled=settings.REFCACHE_ENABLED,
+    poll_interval=settings.REFCACHE_POLL_INTERVAL,
+)
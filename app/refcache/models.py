@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, BigInteger
+from database import Base
+
+
+class RefCacheVersion(Base):
+    __tablename__ = "ref_cache_versions"
+
+    # Bumped on every committed change to a cached table; polled where LISTEN/NOTIFY is unavailable
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from .cache import reference_cache
+
+router = APIRouter(prefix="/cache", tags=["cache"])
+
+
+@router.get("/stats")
+def read_cache_stats():
+    """Hit/miss counters of this worker's reference-data cache"""
+    return reference_cache.stats()
@@ -0,0 +1,84 @@
+"""
+Full-text index DDL for posts and comments.
+
+PostgreSQL keeps a generated ``search_vector`` tsvector column on posts and
+comments with a GIN index. SQLite (local runs) mirrors both tables into an
+FTS5 virtual table kept current by triggers.
+"""
+from sqlalchemy import text
+
+
+# 'simple' only lowercases and splits; language stemming does not suit our mostly Korean content
+TEXT_SEARCH_CONFIG = "simple"
+
+POSTGRES_DDL = [
+    f"""
+    ALTER TABLE posts ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(contents, '')), 'B')
+    ) STORED
+    """,
+    f"""
+    ALTER TABLE comments ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(contents, ''))) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_posts_search_vector ON posts USING GIN (search_vector)",
+    "CREATE INDEX IF NOT EXISTS idx_comments_search_vector ON comments USING GIN (search_vector)",
+]
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+        title, body, kind UNINDEXED, ref_id UNINDEXED, post_id UNINDEXED
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_fts_post_insert AFTER INSERT ON posts BEGIN
+        INSERT INTO search_fts (title, body, kind, ref_id, post_id)
+        VALUES (NEW.title, NEW.contents, 'post', NEW.id, NEW.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_fts_post_update AFTER UPDATE OF title, contents ON posts BEGIN
+        UPDATE search_fts SET title = NEW.title, body = NEW.contents
+        WHERE kind = 'post' AND ref_id = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_fts_post_delete AFTER DELETE ON posts BEGIN
+        DELETE FROM search_fts WHERE post_id = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_fts_comment_insert AFTER INSERT ON comments BEGIN
+        INSERT INTO search_fts (title, body, kind, ref_id, post_id)
+        VALUES ('', NEW.contents, 'comment', NEW.id, NEW.post_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_fts_comment_update AFTER UPDATE OF contents ON comments BEGIN
+        UPDATE search_fts SET body = NEW.contents
+        WHERE kind = 'comment' AND ref_id = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_fts_comment_delete AFTER DELETE ON comments BEGIN
+        DELETE FROM search_fts WHERE kind = 'comment' AND ref_id = OLD.id;
+    END
+    """,
+]
+
+
+def ensure_search_index(engine) -> None:
+    """Create the full-text columns, indexes or FTS tables if they do not exist yet"""
+    if engine.dialect.name == "postgresql":
+        statements = POSTGRES_DDL
+    elif engine.dialect.name == "sqlite":
+        statements = SQLITE_DDL
+    else:
+        return
+
+    with engine.begin() as conn:
+        for statement in statements:
+            conn.execute(text(statement))
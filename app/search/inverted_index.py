@@ -0,0 +1,167 @@
+"""
+Incrementally maintained inverted index over posts and comments.
+
+Each (term, kind, block) row stores the sorted ids of the documents containing
+the term as a packed array of unsigned 32-bit integers. Ids are bucketed into
+blocks of BLOCK_SIZE so that indexing a new document only rewrites the small
+tail block of each posting list rather than the whole list.
+
+Writers lock the tail row of every term they touch until their transaction
+commits. New posts and comments that share common terms (frequent Korean
+bigrams, in particular) therefore index one at a time. That is accepted at
+this community's write rate. If it turns into a bottleneck, postings should go
+to an insert-only table that a worker merges, and SEARCH_INDEX_ENABLED=False
+takes the index out of the write path in the meantime.
+"""
+import sys
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from config.config import settings
+from database import dialect_insert
+from . import models
+from .tokenizer import Tokenizer, get_tokenizer
+
+
+BLOCK_SIZE = 4096
+
+
+def pack(doc_ids: Iterable[int]) -> bytes:
+    packed = array("I", doc_ids)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack(data: bytes) -> array:
+    doc_ids = array("I")
+    doc_ids.frombytes(data or b"")
+    if sys.byteorder == "big":
+        doc_ids.byteswap()
+    return doc_ids
+
+
+def intersect(posting_lists: List[array]) -> List[int]:
+    """Intersect sorted posting lists, probing the longer lists from the shortest one"""
+    if not posting_lists:
+        return []
+    posting_lists = sorted(posting_lists, key=len)
+    result = list(posting_lists[0])
+    for other in posting_lists[1:]:
+        matched = []
+        low = 0
+        for doc_id in result:
+            low = bisect_left(other, doc_id, low)
+            if low == len(other):
+                break
+            if other[low] == doc_id:
+                matched.append(doc_id)
+        result = matched
+        if not result:
+            break
+    return result
+
+
+class InvertedIndex:
+    def __init__(self, tokenizer: Tokenizer):
+        self.tokenizer = tokenizer
+
+    def index_document(self, db: Session, kind: str, doc_id: int, text: str, previous_text: Optional[str] = None) -> None:
+        """Add (or re-index) a document inside the caller's transaction"""
+        terms = self.tokenizer.terms(text)
+        previous_terms = self.tokenizer.terms(previous_text) if previous_text is not None else set()
+        self._update_postings(db, kind, doc_id, add=terms - previous_terms, remove=previous_terms - terms)
+
+    def remove_document(self, db: Session, kind: str, doc_id: int, text: str) -> None:
+        self._update_postings(db, kind, doc_id, add=set(), remove=self.tokenizer.terms(text))
+
+    def candidates(self, db: Session, kind: str, query: str) -> List[int]:
+        """Ids of documents containing every query term, newest first"""
+        terms = self.tokenizer.terms(query)
+        if not terms:
+            return []
+        rows = db.query(models.SearchPosting).filter(
+            models.SearchPosting.kind == kind,
+            models.SearchPosting.term.in_(terms)
+        ).all()
+
+        blocks: Dict[int, Dict[str, array]] = defaultdict(dict)
+        for row in rows:
+            blocks[row.block][row.term] = unpack(row.doc_ids)
+
+        doc_ids = []
+        for block in sorted(blocks, reverse=True):
+            if len(blocks[block]) < len(terms):
+                continue
+            doc_ids.extend(reversed(intersect(list(blocks[block].values()))))
+        return doc_ids
+
+    def _update_postings(self, db: Session, kind: str, doc_id: int, add: Set[str], remove: Set[str]) -> None:
+        if not add and not remove:
+            return
+        block = doc_id // BLOCK_SIZE
+
+        if add:
+            # In term order, like the locking read below, so speculative inserts cannot deadlock either
+            db.execute(
+                dialect_insert(db, models.SearchPosting).values(
+                    [{"term": term, "kind": kind, "block": block, "doc_ids": b"", "doc_count": 0} for term in sorted(add)]
+                ).on_conflict_do_nothing()
+            )
+
+        # Lock rows in a stable order so concurrent writers cannot deadlock
+        rows = db.query(models.SearchPosting).filter(
+            models.SearchPosting.kind == kind,
+            models.SearchPosting.block == block,
+            models.SearchPosting.term.in_(add | remove)
+        ).order_by(models.SearchPosting.term).with_for_update().all()
+
+        changes = []
+        for row in rows:
+            doc_ids = unpack(row.doc_ids)
+            position = bisect_left(doc_ids, doc_id)
+            present = position < len(doc_ids) and doc_ids[position] == doc_id
+            if row.term in add and not present:
+                doc_ids.insert(position, doc_id)
+            elif row.term in remove and present:
+                doc_ids.pop(position)
+            else:
+                continue
+            changes.append({
+                "term": row.term, "kind": kind, "block": block,
+                "doc_ids": pack(doc_ids), "doc_count": len(doc_ids)
+            })
+
+        if changes:
+            # Detach the loaded rows so the bulk UPDATE by primary key is the only write
+            for row in rows:
+                db.expunge(row)
+            db.execute(update(models.SearchPosting), changes)
+
+    def rebuild(self, db: Session, kind: str, documents: Iterable) -> int:
+        """Rebuild one kind from (doc_id, text) pairs; returns the number of posting rows written"""
+        postings: Dict[tuple, List[int]] = defaultdict(list)
+        for doc_id, text in documents:
+            for term in self.tokenizer.terms(text):
+                postings[(term, doc_id // BLOCK_SIZE)].append(doc_id)
+
+        db.query(models.SearchPosting).filter(models.SearchPosting.kind == kind).delete(synchronize_session=False)
+        rows = [
+            {"term": term, "kind": kind, "block": block, "doc_ids": pack(sorted(doc_ids)), "doc_count": len(doc_ids)}
+            for (term, block), doc_ids in postings.items()
+        ]
+        if rows:
+            db.execute(models.SearchPosting.__table__.insert(), rows)
+        return len(rows)
+
+
+def post_document(title: str, contents: str) -> str:
+    return f"{title or ''}\n{contents or ''}"
+
+
+search_index = InvertedIndex(get_tokenizer(settings.SEARCH_TOKENIZER))
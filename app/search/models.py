@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, Text, Integer, LargeBinary
+from database import Base
+
+
+class SearchPosting(Base):
+    __tablename__ = "search_postings"
+
+    term = Column(Text, primary_key=True)
+    kind = Column(String(20), primary_key=True)
+    # Posting lists are split into blocks of consecutive document ids so appends stay small
+    block = Column(Integer, primary_key=True, autoincrement=False)
+    doc_ids = Column(LargeBinary, nullable=False)
+    doc_count = Column(Integer, nullable=False, default=0)
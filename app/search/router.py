@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from database import get_db
+from app.pagination import set_next_cursor
+from . import schemas, service
+from .inverted_index import search_index
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("/", response_model=List[schemas.SearchHit])
+def search(
+    response: Response,
+    q: str = Query(min_length=1, max_length=200),
+    board_id: Optional[List[int]] = Query(None),
+    kind: Optional[schemas.SearchKind] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    mode: schemas.SearchMode = schemas.SearchMode.FULLTEXT,
+    db: Session = Depends(get_db)
+):
+    # mode=ngram uses the n-gram inverted index, which handles Korean word forms better
+    if mode == schemas.SearchMode.NGRAM and not search_index.tokenizer.searchable(q):
+        raise HTTPException(status_code=400, detail="Query too short for ngram search")
+    try:
+        hits, next_cursor = service.SearchService.search(
+            db, q=q, board_ids=board_id, kind=kind.value if kind else None, cursor=cursor, limit=limit,
+            mode=mode.value
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    set_next_cursor(response, next_cursor)
+    return hits
@@ -0,0 +1,39 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from enum import Enum
+
+
+class SearchKind(str, Enum):
+    POST = "post"
+    COMMENT = "comment"
+
+
+class SearchMode(str, Enum):
+    FULLTEXT = "fulltext"
+    NGRAM = "ngram"
+
+
+class SearchHit(BaseModel):
+    kind: SearchKind = Field(description="Whether the match is a post or a comment")
+    id: int = Field(description="ID of the matching post or comment")
+    post_id: int = Field(description="ID of the post the match belongs to")
+    board_id: int = Field(description="ID of the board the post belongs to")
+    title: str = Field(description="Title of the post the match belongs to")
+    snippet: str = Field(description="Beginning of the matching text")
+    created_at: datetime = Field(description="When the post or comment was created")
+    rank: float = Field(description="Relevance score; higher is better")
+
+    class Config:
+        from_attributes = True
+        schema_extra = {
+            "example": {
+                "kind": "post",
+                "id": 12,
+                "post_id": 12,
+                "board_id": 2,
+                "title": "함께 기도해주세요",
+                "snippet": "샬롬! 최근 가족 중 한 분이 아프셔서 병원에 입원하셨어요.",
+                "created_at": "2024-01-15T11:00:00Z",
+                "rank": 0.6079271
+            }
+        }
@@ -0,0 +1,204 @@
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+from typing import Optional, List, Tuple
+from datetime import datetime
+from app.pagination import encode_cursor, decode_cursor
+from app.community import models as community_models
+from . import schemas
+from .index import TEXT_SEARCH_CONFIG
+from .inverted_index import search_index, post_document
+
+
+SNIPPET_LENGTH = 200
+
+# Every verified inverted-index hit gets the same rank, so its pages are ordered by (kind, id)
+INDEX_HIT_RANK = 1.0
+
+
+class SearchService:
+    @staticmethod
+    def search(
+        db: Session,
+        q: str,
+        board_ids: Optional[List[int]] = None,
+        kind: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        mode: str = "fulltext"
+    ) -> Tuple[List[schemas.SearchHit], Optional[str]]:
+        # Hits are ordered by (rank DESC, kind DESC, id DESC); the cursor is that key of the last hit
+        params = {"limit": limit}
+        after = None
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != 3 or not isinstance(values[1], str):
+                raise ValueError("Invalid cursor")
+            try:
+                params.update(after_rank=float(values[0]), after_kind=values[1], after_id=int(values[2]))
+            except (ValueError, TypeError) as e:
+                raise ValueError("Invalid cursor") from e
+            after = "WHERE (rank, kind, id) < (:after_rank, :after_kind, :after_id)"
+
+        if mode == "ngram":
+            after_key = (params["after_kind"], params["after_id"]) if cursor else None
+            hits = SearchService._search_index(db, q, board_ids, kind, after_key, limit)
+            return hits, SearchService._next_cursor(hits, limit)
+
+        if db.get_bind().dialect.name == "postgresql":
+            sql = SearchService._postgres_query(board_ids, kind, after)
+            params["q"] = q
+        else:
+            sql = SearchService._sqlite_query(board_ids, kind, after)
+            params["q"] = SearchService._fts5_query(q)
+        if not params["q"]:
+            return [], None
+
+        statement = text(sql)
+        if board_ids:
+            params["board_ids"] = list(board_ids)
+            if db.get_bind().dialect.name != "postgresql":
+                statement = statement.bindparams(bindparam("board_ids", expanding=True))
+
+        rows = db.execute(statement, params).mappings().all()
+        hits = [
+            schemas.SearchHit(
+                kind=row["kind"],
+                id=row["id"],
+                post_id=row["post_id"],
+                board_id=row["board_id"],
+                title=row["title"],
+                snippet=(row["body"] or "")[:SNIPPET_LENGTH],
+                created_at=SearchService._as_datetime(row["created_at"]),
+                rank=row["rank"]
+            )
+            for row in rows
+        ]
+
+        return hits, SearchService._next_cursor(hits, limit)
+
+    @staticmethod
+    def _next_cursor(hits: List[schemas.SearchHit], limit: int) -> Optional[str]:
+        if len(hits) < limit:
+            return None
+        last = hits[-1]
+        return encode_cursor(last.rank, last.kind.value, last.id)
+
+    @staticmethod
+    def _search_index(
+        db: Session,
+        q: str,
+        board_ids: Optional[List[int]],
+        kind: Optional[str],
+        after: Optional[Tuple[str, int]],
+        limit: int
+    ) -> List[schemas.SearchHit]:
+        # n-gram intersection can over-match, so candidates are confirmed by substring check
+        words = [word.lower() for word in q.split()]
+        hits = []
+        for kind_ in ("post", "comment"):
+            if kind not in (None, kind_) or (after and kind_ > after[0]):
+                continue
+            doc_ids = search_index.candidates(db, kind_, q)
+            if after and kind_ == after[0]:
+                doc_ids = [doc_id for doc_id in doc_ids if doc_id < after[1]]
+
+            for start in range(0, len(doc_ids), limit * 2):
+                chunk = doc_ids[start:start + limit * 2]
+                for hit, text in SearchService._load_documents(db, kind_, chunk, board_ids):
+                    if all(word in text.lower() for word in words):
+                        hits.append(hit)
+                        if len(hits) == limit:
+                            return hits
+        return hits
+
+    @staticmethod
+    def _load_documents(db: Session, kind: str, doc_ids: List[int], board_ids: Optional[List[int]]):
+        Post, Comment = community_models.Post, community_models.Comment
+        if kind == "post":
+            query = db.query(Post).filter(Post.id.in_(doc_ids))
+        else:
+            query = db.query(Comment, Post).join(Post, Post.id == Comment.post_id).filter(Comment.id.in_(doc_ids))
+        if board_ids:
+            query = query.filter(Post.board_id.in_(board_ids))
+
+        if kind == "post":
+            rows = {post.id: (post, post) for post in query.all()}
+        else:
+            rows = {comment.id: (comment, post) for comment, post in query.all()}
+        for doc_id in doc_ids:
+            if doc_id not in rows:
+                continue
+            document, post = rows[doc_id]
+            text = post_document(post.title, post.contents) if kind == "post" else document.contents
+            yield schemas.SearchHit(
+                kind=kind,
+                id=document.id,
+                post_id=post.id,
+                board_id=post.board_id,
+                title=post.title,
+                snippet=(document.contents or "")[:SNIPPET_LENGTH],
+                created_at=document.created_at,
+                rank=INDEX_HIT_RANK
+            ), text
+
+    @staticmethod
+    def _postgres_query(board_ids: Optional[List[int]], kind: Optional[str], after: Optional[str]) -> str:
+        board_filter = "AND p.board_id = ANY(:board_ids)" if board_ids else ""
+        parts = []
+        if kind in (None, "post"):
+            parts.append(f"""
+                SELECT 'post' AS kind, p.id AS id, p.id AS post_id, p.board_id, p.title,
+                       p.contents AS body, p.created_at,
+                       ts_rank(p.search_vector, query.tsq)::float8 AS rank
+                FROM posts p, query
+                WHERE p.search_vector @@ query.tsq {board_filter}
+            """)
+        if kind in (None, "comment"):
+            parts.append(f"""
+                SELECT 'comment' AS kind, c.id AS id, c.post_id, p.board_id, p.title,
+                       c.contents AS body, c.created_at,
+                       ts_rank(c.search_vector, query.tsq)::float8 AS rank
+                FROM comments c JOIN posts p ON p.id = c.post_id, query
+                WHERE c.search_vector @@ query.tsq {board_filter}
+            """)
+        return f"""
+            WITH query AS (SELECT websearch_to_tsquery('{TEXT_SEARCH_CONFIG}', :q) AS tsq)
+            SELECT * FROM ({" UNION ALL ".join(parts)}) hits
+            {after or ""}
+            ORDER BY rank DESC, kind DESC, id DESC
+            LIMIT :limit
+        """
+
+    @staticmethod
+    def _sqlite_query(board_ids: Optional[List[int]], kind: Optional[str], after: Optional[str]) -> str:
+        filters = ""
+        if board_ids:
+            filters += " AND p.board_id IN :board_ids"
+        if kind:
+            filters += f" AND search_fts.kind = '{schemas.SearchKind(kind).value}'"
+        return f"""
+            SELECT * FROM (
+                SELECT search_fts.kind AS kind, search_fts.ref_id AS id, search_fts.post_id AS post_id,
+                       p.board_id AS board_id, p.title AS title, search_fts.body AS body,
+                       coalesce(c.created_at, p.created_at) AS created_at,
+                       -bm25(search_fts) AS rank
+                FROM search_fts
+                JOIN posts p ON p.id = search_fts.post_id
+                LEFT JOIN comments c ON search_fts.kind = 'comment' AND c.id = search_fts.ref_id
+                WHERE search_fts MATCH :q {filters}
+            ) hits
+            {after or ""}
+            ORDER BY rank DESC, kind DESC, id DESC
+            LIMIT :limit
+        """
+
+    @staticmethod
+    def _fts5_query(q: str) -> str:
+        # Quote every term so user input is never parsed as FTS5 query syntax
+        return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
+    @staticmethod
+    def _as_datetime(value) -> datetime:
+        if isinstance(value, str):
+            return datetime.fromisoformat(value)
+        return value
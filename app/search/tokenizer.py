@@ -0,0 +1,87 @@
+"""
+Pluggable tokenizers for the search index.
+
+Korean is agglutinative: "기도해주세요" should match a search for "기도", which
+whitespace splitting cannot do. The n-gram tokenizer indexes overlapping
+character bigrams and trigrams of every run of Hangul syllables instead.
+"""
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, List, Set
+
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_HANGUL_RE = re.compile(r"[가-힣]+")
+
+
+class Tokenizer(ABC):
+    name = "base"
+
+    @abstractmethod
+    def tokenize(self, text: str) -> List[str]:
+        """Index terms of text, in order and with repeats"""
+
+    def terms(self, text: str) -> Set[str]:
+        return set(self.tokenize(text))
+
+    def searchable(self, query: str) -> bool:
+        """Whether documents containing the query are sure to contain all of its terms"""
+        return True
+
+
+class WhitespaceTokenizer(Tokenizer):
+    """Lowercased word tokens"""
+
+    name = "whitespace"
+
+    def tokenize(self, text: str) -> List[str]:
+        return [word.lower() for word in _WORD_RE.findall(text or "")]
+
+
+class HangulNgramTokenizer(Tokenizer):
+    """Character n-grams for Hangul runs, whole lowercased words for everything else"""
+
+    name = "ngram"
+
+    def __init__(self, sizes=(2, 3)):
+        self.sizes = tuple(sorted(sizes))
+
+    def tokenize(self, text: str) -> List[str]:
+        tokens = []
+        for word in _WORD_RE.findall(text or ""):
+            word = word.lower()
+            position = 0
+            for run in _HANGUL_RE.finditer(word):
+                if run.start() > position:
+                    tokens.append(word[position:run.start()])
+                tokens.extend(self._ngrams(run.group()))
+                position = run.end()
+            if position < len(word):
+                tokens.append(word[position:])
+        return tokens
+
+    def searchable(self, query: str) -> bool:
+        # Hangul runs shorter than the smallest n-gram are only indexed as whole words, so "기"
+        # would miss every "기도"
+        return all(len(run) >= self.sizes[0] for run in _HANGUL_RE.findall(query or ""))
+
+    def _ngrams(self, run: str) -> List[str]:
+        if len(run) < self.sizes[0]:
+            return [run]
+        grams = []
+        for size in self.sizes:
+            grams.extend(run[i:i + size] for i in range(len(run) - size + 1))
+        return grams
+
+
+TOKENIZERS: Dict[str, Tokenizer] = {
+    WhitespaceTokenizer.name: WhitespaceTokenizer(),
+    HangulNgramTokenizer.name: HangulNgramTokenizer(),
+}
+
+
+def get_tokenizer(name: str) -> Tokenizer:
+    try:
+        return TOKENIZERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown tokenizer: {name}")
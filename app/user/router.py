@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from database import get_db
+from app.http_cache import PRIVATE_NO_CACHE, conditional_response, make_etag
+from app.batch import MAX_BATCH_IDS, parse_ids, set_missing_ids
 from . import schemas, service
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -28,17 +30,48 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
             response_model=List[schemas.UserResponse],
             summary="List all users",
             description="""
-Retrieve a paginated list of all users in the system.
+Retrieve a paginated list of all users in the system, or a batch of users by ID.
 
 - **skip**: Number of users to skip (for pagination)
 - **limit**: Maximum number of users to return (max 100)
+- **ids**: Comma separated user IDs (max 100). Users are returned in the given order and
+  IDs that do not exist are listed in the `X-Missing-Ids` header; skip and limit are ignored
             """,
             response_description="List of users")
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_users(response: Response, skip: int = 0, limit: int = 100, ids: Optional[str] = None, db: Session = Depends(get_db)):
+    if ids is not None:
+        users, missing = service.UserService.get_users_by_ids(db, ids=_parse_ids(ids))
+        set_missing_ids(response, missing)
+        return users
     users = service.UserService.get_users(db, skip=skip, limit=limit)
     return users
 
 
+@router.get("/profiles", 
+            response_model=List[schemas.ProfileResponse],
+            summary="Get profiles of many users",
+            description="""
+Retrieve the profiles of a batch of users in one request.
+
+- **user_ids**: Comma separated user IDs (max 100)
+
+Profiles are returned in the order of `user_ids`. Users without a profile are listed
+in the `X-Missing-Ids` header. Use this instead of one request per author when rendering a feed.
+            """,
+            response_description="Profiles in request order")
+def read_profiles(user_ids: str, response: Response, db: Session = Depends(get_db)):
+    profiles, missing = service.ProfileService.get_profiles_by_users(db, user_ids=_parse_ids(user_ids))
+    set_missing_ids(response, missing)
+    return profiles
+
+
+def _parse_ids(value: str) -> List[int]:
+    try:
+        return parse_ids(value, max_ids=MAX_BATCH_IDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/{user_id}", 
             response_model=schemas.UserResponse,
             summary="Get user by ID",
@@ -154,10 +187,15 @@ This is a convenience endpoint to get a user's profile without knowing the profi
             responses={
                 404: {"description": "Profile not found"}
             })
-def read_user_profile(user_id: int, db: Session = Depends(get_db)):
+def read_user_profile(user_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     db_profile = service.ProfileService.get_profile_by_user(db, user_id=user_id)
     if db_profile is None:
         raise HTTPException(status_code=404, detail="Profile not found")
+
+    etag = make_etag(db_profile.id, db_profile.user_id, db_profile.nickname, db_profile.thumbnail, db_profile.church_id)
+    not_modified = conditional_response(request, response, etag, cache_control=PRIVATE_NO_CACHE)
+    if not_modified is not None:
+        return not_modified
     return db_profile
 
 
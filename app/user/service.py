@@ -1,5 +1,7 @@
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
+from app.batch import id_in, order_by_ids
+from app.loader import batch_loader
 from . import models, schemas
 
 
@@ -12,6 +14,12 @@ class UserService:
     def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[models.User]:
         return db.query(models.User).offset(skip).limit(limit).all()
 
+    @staticmethod
+    def get_users_by_ids(db: Session, ids: List[int]) -> Tuple[List[models.User], List[int]]:
+        """Users in the order of ids, plus the ids that do not exist"""
+        users = db.query(models.User).filter(id_in(db, models.User.id, ids)).all()
+        return order_by_ids(users, ids)
+
     @staticmethod
     def create_user(db: Session, user: schemas.UserCreate) -> models.User:
         db_user = models.User(
@@ -53,6 +61,12 @@ class ProfileService:
     def get_profile_by_user(db: Session, user_id: int) -> Optional[models.Profile]:
         return db.query(models.Profile).filter(models.Profile.user_id == user_id).first()
 
+    @staticmethod
+    def get_profiles_by_users(db: Session, user_ids: List[int]) -> Tuple[List[models.Profile], List[int]]:
+        """Profiles in the order of user_ids, plus the user ids that have no profile"""
+        profiles = db.query(models.Profile).filter(id_in(db, models.Profile.user_id, user_ids)).all()
+        return order_by_ids(profiles, user_ids, key=lambda profile: profile.user_id)
+
     @staticmethod
     def create_profile(db: Session, profile: schemas.ProfileCreate) -> models.Profile:
         db_profile = models.Profile(
@@ -85,3 +99,10 @@ class ProfileService:
             db.commit()
             return True
         return False
+
+
+@batch_loader("profile")
+def _load_profiles(db: Session, user_ids: List[int]) -> Dict[int, models.Profile]:
+    """Profiles keyed by user id, for DataLoader.get("profile", user_id)"""
+    profiles = db.query(models.Profile).filter(id_in(db, models.Profile.user_id, user_ids)).all()
+    return {profile.user_id: profile for profile in profiles}
@@ -0,0 +1,42 @@
+"""Add board post count and latest post summary
+
+Revision ID: 0c5b9e3a7d21
+Revises: f4d7a2c96e18
+Create Date: 2026-10-16 16:20:54.913208
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0c5b9e3a7d21'
+down_revision = 'f4d7a2c96e18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """boards.post_count/last_post_at/last_post_id, backfilled from existing posts"""
+    op.add_column('boards', sa.Column('post_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('boards', sa.Column('last_post_at', sa.DateTime(timezone=True)))
+    op.add_column('boards', sa.Column('last_post_id', sa.Integer()))
+    op.execute("""
+        UPDATE boards
+        SET post_count = latest.post_count,
+            last_post_at = latest.created_at,
+            last_post_id = latest.id
+        FROM (
+            SELECT DISTINCT ON (board_id)
+                board_id, id, created_at, count(*) OVER (PARTITION BY board_id) AS post_count
+            FROM posts
+            ORDER BY board_id, created_at DESC, id DESC
+        ) AS latest
+        WHERE boards.id = latest.board_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('boards', 'last_post_id')
+    op.drop_column('boards', 'last_post_at')
+    op.drop_column('boards', 'post_count')
@@ -0,0 +1,96 @@
+"""Move view actions to monthly partitioned view_logs
+
+Revision ID: 1a9c7e3f5d82
+Revises: 8d4e6f1a2b57
+Create Date: 2026-10-16 21:05:33.490128
+
+"""
+from datetime import datetime, timezone
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1a9c7e3f5d82'
+down_revision = '8d4e6f1a2b57'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+MOVE_BATCH_SIZE = 10000
+
+
+def _add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _month_start(value):
+    value = value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def upgrade() -> None:
+    """view_logs range partitioned by month on created_at, filled from the view rows of action_logs in batches"""
+    op.create_table(
+        'view_logs',
+        sa.Column('id', sa.Integer(), nullable=False, server_default=sa.text("nextval('action_logs_id_seq')")),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('target_type', sa.String(length=50), nullable=False),
+        sa.Column('target_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.CheckConstraint("target_type IN ('post', 'comment')", name='check_view_target_type'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_index('idx_view_logs_user_target', 'view_logs', ['user_id', 'target_type', 'target_id', 'created_at'])
+    op.create_index('idx_view_logs_target', 'view_logs', ['target_type', 'target_id', 'created_at'])
+
+    conn = op.get_bind()
+    oldest = conn.execute(sa.text("SELECT min(created_at) FROM action_logs WHERE action_type = 'view'")).scalar()
+    current = _month_start(datetime.now(timezone.utc))
+    month = _month_start(oldest) if oldest is not None and oldest < current else current
+    while month <= _add_months(current, MONTHS_AHEAD):
+        op.execute(
+            f"CREATE TABLE view_logs_{month:%Y_%m} PARTITION OF view_logs "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+
+    # Views already folded into the rollups under action_logs' mark must not be folded again
+    op.execute("""
+        INSERT INTO job_states (name, last_id)
+        SELECT 'rollup_view_logs', last_id FROM job_states WHERE name = 'rollup_actions'
+        ON CONFLICT (name) DO NOTHING
+    """)
+
+    # Short transactions so action_logs stays writable while the rows move;
+    # each batch deletes and inserts in one statement, so a rerun resumes cleanly
+    with op.get_context().autocommit_block():
+        while conn.execute(sa.text("SELECT 1 FROM action_logs WHERE action_type = 'view' LIMIT 1")).first():
+            conn.execute(sa.text("""
+                WITH moved AS (
+                    DELETE FROM action_logs
+                    WHERE id IN (
+                        SELECT id FROM action_logs WHERE action_type = 'view' ORDER BY id LIMIT :batch_size
+                    )
+                    RETURNING id, user_id, target_type, target_id, is_on, created_at
+                )
+                INSERT INTO view_logs (id, user_id, target_type, target_id, created_at)
+                SELECT id, user_id, target_type, target_id, created_at FROM moved WHERE is_on
+            """), {"batch_size": MOVE_BATCH_SIZE})
+
+
+def downgrade() -> None:
+    # action_logs holds one row per (user, action, target), so only the latest view of each pair returns
+    op.execute("""
+        INSERT INTO action_logs (id, user_id, action_type, target_type, target_id, is_on, created_at)
+        SELECT DISTINCT ON (user_id, target_type, target_id)
+            id, user_id, 'view', target_type, target_id, true, created_at
+        FROM view_logs
+        ORDER BY user_id, target_type, target_id, created_at DESC, id DESC
+        ON CONFLICT DO NOTHING
+    """)
+    op.execute("DELETE FROM job_states WHERE name = 'rollup_view_logs'")
+    op.drop_table('view_logs')
@@ -0,0 +1,39 @@
+"""Add action counts
+
+Revision ID: 2e7a5c0f9d46
+Revises: 6b2f9d4e8c13
+Create Date: 2026-10-16 18:41:09.662430
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2e7a5c0f9d46'
+down_revision = '6b2f9d4e8c13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """action_counts keyed by (target_type, target_id, action_type), backfilled from active action logs"""
+    op.create_table(
+        'action_counts',
+        sa.Column('target_type', sa.String(length=50), nullable=False),
+        sa.Column('target_id', sa.Integer(), nullable=False),
+        sa.Column('action_type', sa.String(length=50), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('target_type', 'target_id', 'action_type')
+    )
+    op.execute("""
+        INSERT INTO action_counts (target_type, target_id, action_type, count)
+        SELECT target_type, target_id, action_type, count(*)
+        FROM action_logs
+        WHERE is_on
+        GROUP BY target_type, target_id, action_type
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('action_counts')
@@ -0,0 +1,25 @@
+"""Add profiles user_id index
+
+Revision ID: 3d6f8b2e1a95
+Revises: 9a1e4c7f3b08
+Create Date: 2026-10-16 17:31:45.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d6f8b2e1a95'
+down_revision = '9a1e4c7f3b08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Profiles are looked up by user_id, one at a time and in batches"""
+    op.create_index('ix_profiles_user_id', 'profiles', ['user_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_profiles_user_id', table_name='profiles')
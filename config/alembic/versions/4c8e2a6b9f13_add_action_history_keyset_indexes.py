@@ -0,0 +1,59 @@
+"""Add action history keyset indexes
+
+Revision ID: 4c8e2a6b9f13
+Revises: 1a9c7e3f5d82
+Create Date: 2026-10-16 21:44:07.215839
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c8e2a6b9f13'
+down_revision = '1a9c7e3f5d82'
+branch_labels = None
+depends_on = None
+
+
+def _create_view_logs_index(conn) -> None:
+    """Concurrent builds are not supported on a partitioned table, so build each partition's index and attach it"""
+    op.execute("CREATE INDEX IF NOT EXISTS idx_view_logs_user_created ON ONLY view_logs (user_id, created_at DESC, id DESC)")
+    partitions = conn.execute(sa.text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = CAST('view_logs' AS regclass) ORDER BY child.relname"
+    )).scalars().all()
+    for partition in partitions:
+        op.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_user_created_idx "
+            f"ON {partition} (user_id, created_at DESC, id DESC)"
+        )
+        op.execute(f"ALTER INDEX idx_view_logs_user_created ATTACH PARTITION {partition}_user_created_idx")
+
+
+def upgrade() -> None:
+    """(user_id | target, action_type, created_at DESC, id) for cursor pagination; idx_action_logs_target is now a prefix"""
+    # Built concurrently outside a transaction so neither table stops taking writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_action_logs_user_action_created', 'action_logs',
+            ['user_id', 'action_type', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'idx_action_logs_target_action_created', 'action_logs',
+            ['target_type', 'target_id', 'action_type', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True
+        )
+        op.drop_index('idx_action_logs_target', table_name='action_logs', postgresql_concurrently=True)
+        _create_view_logs_index(op.get_bind())
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        # Indexes on a partitioned table cannot be dropped concurrently
+        op.drop_index('idx_view_logs_user_created', table_name='view_logs')
+        op.create_index('idx_action_logs_target', 'action_logs', ['target_type', 'target_id'], postgresql_concurrently=True)
+        op.drop_index('idx_action_logs_target_action_created', table_name='action_logs', postgresql_concurrently=True)
+        op.drop_index('idx_action_logs_user_action_created', table_name='action_logs', postgresql_concurrently=True)
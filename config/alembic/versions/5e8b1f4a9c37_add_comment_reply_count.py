@@ -0,0 +1,41 @@
+"""Add comment reply counts and reply paging index
+
+Revision ID: 5e8b1f4a9c37
+Revises: c41d9e07b2a6
+Create Date: 2026-10-16 10:41:52.208314
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8b1f4a9c37'
+down_revision = 'c41d9e07b2a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Denormalized reply_count on comments plus the (parent_id, created_at, id) index"""
+    op.add_column('comments', sa.Column('reply_count', sa.Integer(), nullable=False, server_default='0'))
+    
+    # Backfill from existing replies
+    op.execute("""
+        UPDATE comments
+        SET reply_count = replies.total
+        FROM (
+            SELECT parent_id, COUNT(*) AS total
+            FROM comments
+            WHERE parent_id IS NOT NULL
+            GROUP BY parent_id
+        ) AS replies
+        WHERE comments.id = replies.parent_id
+    """)
+    
+    op.create_index('idx_comments_parent_created_id', 'comments', ['parent_id', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_comments_parent_created_id', table_name='comments')
+    op.drop_column('comments', 'reply_count')
@@ -0,0 +1,27 @@
+"""Add post unique viewer sketch and count
+
+Revision ID: 5f0b8e2d7c64
+Revises: 7c1d3a9e5b20
+Create Date: 2026-10-16 19:48:52.317046
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f0b8e2d7c64'
+down_revision = '7c1d3a9e5b20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """posts.viewer_sketch (HyperLogLog registers) and the unique_viewer_count estimated from it"""
+    op.add_column('posts', sa.Column('unique_viewer_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('posts', sa.Column('viewer_sketch', sa.LargeBinary()))
+
+
+def downgrade() -> None:
+    op.drop_column('posts', 'viewer_sketch')
+    op.drop_column('posts', 'unique_viewer_count')
@@ -0,0 +1,96 @@
+"""Deduplicate action logs and add a unique (user, action, target) index
+
+Revision ID: 6b2f9d4e8c13
+Revises: 3d6f8b2e1a95
+Create Date: 2026-10-16 18:04:27.530916
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b2f9d4e8c13'
+down_revision = '3d6f8b2e1a95'
+branch_labels = None
+depends_on = None
+
+DEDUPE_BATCH_SIZE = 10000
+# Writers still on the old code can recreate duplicates while the index builds
+INDEX_ATTEMPTS = 3
+
+
+def _delete_duplicates(conn) -> None:
+    """Keep the newest row per key, deleting the rest in short batches, and recount likes of the posts that had them"""
+    conn.execute(sa.text("DROP TABLE IF EXISTS duplicate_action_logs"))
+    conn.execute(sa.text("""
+        CREATE TEMPORARY TABLE duplicate_action_logs AS
+        SELECT id, action_type, target_type, target_id
+        FROM (
+            SELECT id, action_type, target_type, target_id,
+                   row_number() OVER (
+                       PARTITION BY user_id, action_type, target_type, target_id
+                       ORDER BY created_at DESC, id DESC
+                   ) AS rn
+            FROM action_logs
+        ) AS ranked
+        WHERE rn > 1
+    """))
+    conn.execute(sa.text("CREATE INDEX ON duplicate_action_logs (id)"))
+
+    last_id = 0
+    while True:
+        last_id = conn.execute(sa.text("""
+            WITH batch AS (
+                SELECT id FROM duplicate_action_logs WHERE id > :last_id ORDER BY id LIMIT :batch_size
+            ), removed AS (
+                DELETE FROM action_logs WHERE id IN (SELECT id FROM batch)
+            )
+            SELECT max(id) FROM batch
+        """), {"last_id": last_id, "batch_size": DEDUPE_BATCH_SIZE}).scalar()
+        if last_id is None:
+            break
+
+    # Duplicate likes were counted once each; recount only the posts that had them
+    conn.execute(sa.text("""
+        UPDATE posts
+        SET like_count = (
+            SELECT count(*) FROM action_logs
+            WHERE action_logs.action_type = 'like'
+              AND action_logs.target_type = 'post'
+              AND action_logs.target_id = posts.id
+              AND action_logs.is_on
+        )
+        WHERE posts.id IN (
+            SELECT target_id FROM duplicate_action_logs
+            WHERE action_type = 'like' AND target_type = 'post'
+        )
+    """))
+    conn.execute(sa.text("DROP TABLE duplicate_action_logs"))
+
+
+def upgrade() -> None:
+    """Keep the newest row per (user_id, action_type, target_type, target_id), then enforce uniqueness"""
+    conn = op.get_bind()
+    # Short transactions and a concurrent build so action_logs stays writable throughout
+    with op.get_context().autocommit_block():
+        for _ in range(INDEX_ATTEMPTS):
+            _delete_duplicates(conn)
+            try:
+                op.create_index(
+                    'uq_action_logs_user_action_target',
+                    'action_logs',
+                    ['user_id', 'action_type', 'target_type', 'target_id'],
+                    unique=True,
+                    postgresql_concurrently=True
+                )
+                return
+            except sa.exc.IntegrityError:
+                # A duplicate was written during the build, which leaves an invalid index behind
+                op.execute("DROP INDEX CONCURRENTLY IF EXISTS uq_action_logs_user_action_target")
+    raise RuntimeError("action_logs kept receiving duplicate actions; stop writers and rerun the migration")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('uq_action_logs_user_action_target', table_name='action_logs', postgresql_concurrently=True)
@@ -0,0 +1,25 @@
+"""Add action_logs (user_id, target_type, target_id) index
+
+Revision ID: 7c1d3a9e5b20
+Revises: 2e7a5c0f9d46
+Create Date: 2026-10-16 19:12:38.204715
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1d3a9e5b20'
+down_revision = '2e7a5c0f9d46'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """A viewer's actions on a page of targets are looked up without knowing the action type"""
+    op.create_index('idx_action_logs_user_target', 'action_logs', ['user_id', 'target_type', 'target_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_action_logs_user_target', table_name='action_logs')
@@ -0,0 +1,35 @@
+"""Add hourly and daily action rollups
+
+Revision ID: 8d4e6f1a2b57
+Revises: 5f0b8e2d7c64
+Create Date: 2026-10-16 20:26:14.871392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d4e6f1a2b57'
+down_revision = '5f0b8e2d7c64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """action_rollups_hourly/daily keyed by target, action type and bucket; filled by the rollup job"""
+    for table in ('action_rollups_hourly', 'action_rollups_daily'):
+        op.create_table(
+            table,
+            sa.Column('target_type', sa.String(length=50), nullable=False),
+            sa.Column('target_id', sa.Integer(), nullable=False),
+            sa.Column('action_type', sa.String(length=50), nullable=False),
+            sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+            sa.PrimaryKeyConstraint('target_type', 'target_id', 'action_type', 'bucket')
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('action_rollups_daily')
+    op.drop_table('action_rollups_hourly')
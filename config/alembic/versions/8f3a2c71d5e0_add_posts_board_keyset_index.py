@@ -0,0 +1,29 @@
+"""Add keyset pagination index on posts
+
+Revision ID: 8f3a2c71d5e0
+Revises: 4bcd98e0f114
+Create Date: 2026-10-16 09:12:41.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f3a2c71d5e0'
+down_revision = '4bcd98e0f114'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Composite index serving board listings ordered by (created_at DESC, id DESC)"""
+    op.create_index(
+        'idx_posts_board_created_id',
+        'posts',
+        ['board_id', sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_posts_board_created_id', table_name='posts')
@@ -0,0 +1,28 @@
+"""Add reference cache version table
+
+Revision ID: 9a1e4c7f3b08
+Revises: 0c5b9e3a7d21
+Create Date: 2026-10-16 16:57:12.640381
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a1e4c7f3b08'
+down_revision = '0c5b9e3a7d21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Change counters polled by the reference cache on databases without LISTEN/NOTIFY"""
+    op.create_table('ref_cache_versions',
+        sa.Column('name', sa.String(50), primary_key=True),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('ref_cache_versions')
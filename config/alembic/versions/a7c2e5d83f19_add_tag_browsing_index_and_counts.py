@@ -0,0 +1,37 @@
+"""Add tag browsing index and tag counts
+
+Revision ID: a7c2e5d83f19
+Revises: 5e8b1f4a9c37
+Create Date: 2026-10-16 11:20:08.761345
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c2e5d83f19'
+down_revision = '5e8b1f4a9c37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """(tag, post_id) index for posts-by-tag lookups and an incrementally maintained tag_counts table"""
+    op.create_index('idx_post_tags_tag_post', 'post_tags', ['tag', 'post_id'])
+    
+    op.create_table('tag_counts',
+        sa.Column('tag', sa.Text(), primary_key=True),
+        sa.Column('post_count', sa.Integer(), nullable=False, server_default='0')
+    )
+    
+    # Seed counts from existing tags; afterwards they are maintained by the tag services
+    op.execute("""
+        INSERT INTO tag_counts (tag, post_count)
+        SELECT tag, COUNT(*) FROM post_tags GROUP BY tag
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('tag_counts')
+    op.drop_index('idx_post_tags_tag_post', table_name='post_tags')
@@ -0,0 +1,48 @@
+"""Add precomputed hot ranking for posts
+
+Revision ID: b83e0d5f2c64
+Revises: e6a4c1b7d392
+Create Date: 2026-10-16 15:12:07.481936
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b83e0d5f2c64'
+down_revision = 'e6a4c1b7d392'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """post_scores ranked per board, plus posts.activity_at so refreshes only rescore touched posts"""
+    op.add_column('posts', sa.Column('activity_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()))
+    op.create_index('ix_posts_activity_at', 'posts', ['activity_at'])
+
+    op.create_table('post_scores',
+        sa.Column('post_id', sa.Integer(), sa.ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('board_id', sa.Integer(), sa.ForeignKey('boards.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now())
+    )
+    op.create_index(
+        'idx_post_scores_board_score', 'post_scores',
+        ['board_id', sa.text('score DESC'), sa.text('post_id DESC')]
+    )
+
+    op.create_table('job_states',
+        sa.Column('name', sa.String(100), primary_key=True),
+        sa.Column('last_run_at', sa.DateTime(timezone=True)),
+        sa.Column('last_id', sa.BigInteger())
+    )
+    # With no watermark yet, the first refresh_post_scores run scores every existing post
+
+
+def downgrade() -> None:
+    op.drop_table('job_states')
+    op.drop_index('idx_post_scores_board_score', table_name='post_scores')
+    op.drop_table('post_scores')
+    op.drop_index('ix_posts_activity_at', table_name='posts')
+    op.drop_column('posts', 'activity_at')
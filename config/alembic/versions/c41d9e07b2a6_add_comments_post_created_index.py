@@ -0,0 +1,25 @@
+"""Add comment thread index
+
+Revision ID: c41d9e07b2a6
+Revises: 8f3a2c71d5e0
+Create Date: 2026-10-16 10:03:17.542981
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41d9e07b2a6'
+down_revision = '8f3a2c71d5e0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Composite index serving a post's comments in (created_at, id) order"""
+    op.create_index('idx_comments_post_created_id', 'comments', ['post_id', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_comments_post_created_id', table_name='comments')
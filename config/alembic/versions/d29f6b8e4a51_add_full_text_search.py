@@ -0,0 +1,40 @@
+"""Add full-text search columns and indexes
+
+Revision ID: d29f6b8e4a51
+Revises: a7c2e5d83f19
+Create Date: 2026-10-16 12:34:26.904117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd29f6b8e4a51'
+down_revision = 'a7c2e5d83f19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Generated tsvector columns on posts and comments with GIN indexes"""
+    op.execute("""
+        ALTER TABLE posts ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(contents, '')), 'B')
+        ) STORED
+    """)
+    op.execute("""
+        ALTER TABLE comments ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', coalesce(contents, ''))) STORED
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS idx_posts_search_vector ON posts USING GIN (search_vector)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_comments_search_vector ON comments USING GIN (search_vector)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_comments_search_vector")
+    op.execute("DROP INDEX IF EXISTS idx_posts_search_vector")
+    op.drop_column('comments', 'search_vector')
+    op.drop_column('posts', 'search_vector')
@@ -0,0 +1,32 @@
+"""Add n-gram inverted index postings
+
+Revision ID: e6a4c1b7d392
+Revises: d29f6b8e4a51
+Create Date: 2026-10-16 13:58:44.310572
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6a4c1b7d392'
+down_revision = 'd29f6b8e4a51'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Posting lists of the search inverted index, one row per (term, kind, id block)"""
+    op.create_table('search_postings',
+        sa.Column('term', sa.Text(), primary_key=True),
+        sa.Column('kind', sa.String(20), primary_key=True),
+        sa.Column('block', sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column('doc_ids', sa.LargeBinary(), nullable=False),
+        sa.Column('doc_count', sa.Integer(), nullable=False, server_default='0')
+    )
+    # Existing posts and comments are indexed with: python scripts/benchmark_search.py --rebuild
+
+
+def downgrade() -> None:
+    op.drop_table('search_postings')
@@ -0,0 +1,35 @@
+"""Add precomputed post excerpts
+
+Revision ID: f4d7a2c96e18
+Revises: b83e0d5f2c64
+Create Date: 2026-10-16 15:48:31.205417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4d7a2c96e18'
+down_revision = 'b83e0d5f2c64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """posts.excerpt, backfilled with the same rule as app.community.service.make_excerpt (160 chars)"""
+    op.add_column('posts', sa.Column('excerpt', sa.Text()))
+    op.execute("""
+        UPDATE posts SET excerpt = CASE
+            WHEN char_length(c.text) <= 160 THEN c.text
+            ELSE rtrim(left(c.text, 160)) || '…'
+        END
+        FROM (
+            SELECT id, btrim(regexp_replace(contents, '\\s+', ' ', 'g')) AS text FROM posts
+        ) AS c
+        WHERE posts.id = c.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('posts', 'excerpt')
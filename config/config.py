@@ -53,6 +53,47 @@ class Settings:
     CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
     CELERY_RESULT_BACKEND: str = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
     
+    # View counter buffering ("memory" keeps pending views per worker, "redis" shares them)
+    VIEW_COUNTER_BACKEND: str = os.getenv("VIEW_COUNTER_BACKEND", "memory")
+    VIEW_COUNTER_FLUSH_INTERVAL: float = float(os.getenv("VIEW_COUNTER_FLUSH_INTERVAL", "5"))
+    VIEW_COUNTER_FLUSH_THRESHOLD: int = int(os.getenv("VIEW_COUNTER_FLUSH_THRESHOLD", "1000"))
+    # Repeat views of a post by the same viewer within this many seconds are not counted (0 disables)
+    VIEW_DEDUP_WINDOW: float = float(os.getenv("VIEW_DEDUP_WINDOW", "1800"))
+    VIEW_DEDUP_MAX_ENTRIES: int = int(os.getenv("VIEW_DEDUP_MAX_ENTRIES", "100000"))
+    # Dedup anonymous views by client address and user agent; needs the real client address (see ops/README.md)
+    VIEW_DEDUP_ANONYMOUS: bool = os.getenv("VIEW_DEDUP_ANONYMOUS", "True").lower() == "true"
+    
+    # Search index settings (tokenizer used by the incrementally built inverted index)
+    SEARCH_INDEX_ENABLED: bool = os.getenv("SEARCH_INDEX_ENABLED", "True").lower() == "true"
+    SEARCH_TOKENIZER: str = os.getenv("SEARCH_TOKENIZER", "ngram")
+    
+    # Seconds between incremental refreshes of the "hot" post ranking, and how far each refresh
+    # reaches back before the previous one to catch counter updates that committed late
+    POST_SCORE_REFRESH_INTERVAL: float = float(os.getenv("POST_SCORE_REFRESH_INTERVAL", "60"))
+    POST_SCORE_REFRESH_LAG: float = float(os.getenv("POST_SCORE_REFRESH_LAG", "60"))
+    
+    # Seconds between repairs of drifted action_counts rows
+    ACTION_COUNT_RECONCILE_INTERVAL: float = float(os.getenv("ACTION_COUNT_RECONCILE_INTERVAL", "3600"))
+    
+    # Hourly/daily action rollups: run interval, seconds a new log row is given to commit, rows per batch
+    ACTION_ROLLUP_INTERVAL: float = float(os.getenv("ACTION_ROLLUP_INTERVAL", "300"))
+    ACTION_ROLLUP_LAG: float = float(os.getenv("ACTION_ROLLUP_LAG", "60"))
+    ACTION_ROLLUP_BATCH_SIZE: int = int(os.getenv("ACTION_ROLLUP_BATCH_SIZE", "50000"))
+    
+    # Monthly view_logs partitions: months kept (0 keeps all), months created ahead, drop or detach expired ones
+    VIEW_LOG_RETENTION_MONTHS: int = int(os.getenv("VIEW_LOG_RETENTION_MONTHS", "6"))
+    VIEW_LOG_PARTITIONS_AHEAD: int = int(os.getenv("VIEW_LOG_PARTITIONS_AHEAD", "3"))
+    VIEW_LOG_EXPIRED_PARTITIONS: str = os.getenv("VIEW_LOG_EXPIRED_PARTITIONS", "drop")
+    VIEW_LOG_PARTITION_INTERVAL: float = float(os.getenv("VIEW_LOG_PARTITION_INTERVAL", "86400"))
+    
+    # Per-worker cache of POST /actions/state results (TTL in seconds, 0 disables)
+    ACTION_STATE_CACHE_TTL: float = float(os.getenv("ACTION_STATE_CACHE_TTL", "5"))
+    ACTION_STATE_CACHE_MAX_USERS: int = int(os.getenv("ACTION_STATE_CACHE_MAX_USERS", "10000"))
+    
+    # In-process cache of boards and churches (invalidated by LISTEN/NOTIFY, or by polling off PostgreSQL)
+    REFCACHE_ENABLED: bool = os.getenv("REFCACHE_ENABLED", "True").lower() == "true"
+    REFCACHE_POLL_INTERVAL: float = float(os.getenv("REFCACHE_POLL_INTERVAL", "5"))
+    
     def get_test_database_url(self) -> str:
         """Generate test database URL with separate port"""
         if self.TEST_DATABASE_URL:
@@ -21,6 +21,14 @@ def get_db():
     finally:
         db.close()
 
+def dialect_insert(db, table):
+    """INSERT construct supporting ON CONFLICT for the database the session is bound to"""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
 # Legacy model for demonstration (keeping for backward compatibility)
 class TaskResult(Base):
     __tablename__ = "task_results"
@@ -46,8 +54,12 @@ def import_models():
             from app.user.models import User, Profile
             from app.church.models import Church
             from app.verification.models import IdentityVerification
-            from app.community.models import Board, Post, PostTag, Comment
-            from app.action.models import ActionLog
+            from app.community.models import Board, Post, PostScore, PostTag, TagCount, Comment
+            from app.action.models import ActionLog, ViewLog, ActionCount
+            from app.search.models import SearchPosting
+            from app.jobs.models import JobState
+            from app.refcache.models import RefCacheVersion
+            from app.analytics.models import ActionRollupHourly, ActionRollupDaily
             
             return {
                 'User': User,
@@ -56,9 +68,18 @@ def import_models():
                 'IdentityVerification': IdentityVerification,
                 'Board': Board,
                 'Post': Post,
+                'PostScore': PostScore,
                 'PostTag': PostTag,
+                'TagCount': TagCount,
                 'Comment': Comment,
-                'ActionLog': ActionLog
+                'ActionLog': ActionLog,
+                'ViewLog': ViewLog,
+                'ActionCount': ActionCount,
+                'SearchPosting': SearchPosting,
+                'JobState': JobState,
+                'RefCacheVersion': RefCacheVersion,
+                'ActionRollupHourly': ActionRollupHourly,
+                'ActionRollupDaily': ActionRollupDaily
             }
         except ImportError as e2:
             print(f"Error: Could not import models: {e2}")
@@ -81,3 +102,13 @@ def create_tables():
     # Create all tables
     Base.metadata.create_all(bind=engine)
     print("✓ Database tables created")
+    
+    # Full-text search columns and indexes live outside the ORM models
+    from app.search.index import ensure_search_index
+    ensure_search_index(engine)
+    print("✓ Search index ready")
+    
+    # view_logs only accepts rows for months that have a partition
+    from app.action.partitions import ensure_view_log_partitions
+    ensure_view_log_partitions(engine, months_ahead=settings.VIEW_LOG_PARTITIONS_AHEAD)
+    print("✓ View log partitions ready")
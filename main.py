@@ -10,10 +10,15 @@ import json
 
 # Import routers
 from app.user.router import router as user_router
-from app.community.router import router as community_router
+from app.community.router import router as community_router, tag_router
 from app.church.router import router as church_router
 from app.verification.router import router as verification_router
 from app.action.router import router as action_router
+from app.search.router import router as search_router
+from app.refcache.router import router as cache_router
+from app.analytics.router import router as analytics_router
+from app.community.view_buffer import view_counter
+from app.refcache.cache import reference_cache
 
 # Create tables on startup
 create_tables()
@@ -80,6 +85,18 @@ For detailed examples and usage patterns, see the individual endpoint documentat
                 "name": "boards",
                 "description": "Discussion board operations. Create and manage community discussion boards, posts, and comments."
             },
+            {
+                "name": "tags",
+                "description": "Tag browsing. List tags with post counts and page through the posts carrying a tag."
+            },
+            {
+                "name": "search",
+                "description": "Full-text search over post titles, post contents and comments."
+            },
+            {
+                "name": "cache",
+                "description": "Reference-data cache statistics. Per-worker hit/miss counters for cached boards and churches."
+            },
             {
                 "name": "identity-verification",
                 "description": "Identity verification system. Handle photo-based verification requests and admin reviews."
@@ -88,6 +105,10 @@ For detailed examples and usage patterns, see the individual endpoint documentat
                 "name": "action-logs",
                 "description": "User action tracking. Log and manage user interactions like views, likes, bookmarks, and reports."
             },
+            {
+                "name": "analytics",
+                "description": "Action analytics. Hourly and daily action counts per post, comment or board, served from rollup tables."
+            },
             {
                 "name": "development",
                 "description": "Development and testing endpoints for sample data generation and cleanup."
@@ -142,6 +163,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Missing-Ids", "ETag", "Last-Modified"],
 )
 
 # Set custom OpenAPI schema
@@ -150,9 +172,26 @@ app.openapi = custom_openapi
 # Include routers
 app.include_router(user_router)
 app.include_router(community_router)
+app.include_router(tag_router)
 app.include_router(church_router)
 app.include_router(verification_router)
 app.include_router(action_router)
+app.include_router(search_router)
+app.include_router(cache_router)
+app.include_router(analytics_router)
+
+
+@app.on_event("startup")
+def start_background_workers():
+    view_counter.start()
+    reference_cache.start()
+
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    # Flush buffered view counts so no views are lost on restart
+    view_counter.stop()
+    reference_cache.stop()
 
 
 @app.get("/", 
@@ -191,6 +230,10 @@ def read_root():
             "actions": {
                 "path": "/actions",
                 "description": "User action logging (likes, views, etc.)"
+            },
+            "search": {
+                "path": "/search",
+                "description": "Full-text search over posts and comments"
             }
         },
         "features": [
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark the n-gram inverted index against plain LIKE scans.
+
+For each query, the posts matching a LIKE '%word%' scan are taken as ground
+truth. The script reports the recall of the inverted index search and the
+median and p95 latency of both approaches.
+"""
+
+import sys
+import time
+import statistics
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import and_, or_
+
+from database import SessionLocal
+from app.community.models import Post, Comment
+from app.search.inverted_index import search_index, post_document
+
+DEFAULT_QUERIES = [
+    '기도',
+    '기도해',
+    '말씀',
+    '감사',
+    '요한복음',
+    '함께 기도',
+    '로마서 12장',
+]
+
+
+def like_scan(db, query):
+    conditions = []
+    for word in query.split():
+        pattern = f"%{word}%"
+        conditions.append(or_(Post.title.ilike(pattern), Post.contents.ilike(pattern)))
+    return {post_id for (post_id,) in db.query(Post.id).filter(and_(*conditions)).all()}
+
+
+def index_search(db, query):
+    words = [word.lower() for word in query.split()]
+    candidates = search_index.candidates(db, "post", query)
+    matches = set()
+    for start in range(0, len(candidates), 500):
+        chunk = candidates[start:start + 500]
+        for post in db.query(Post).filter(Post.id.in_(chunk)).all():
+            text = post_document(post.title, post.contents).lower()
+            if all(word in text for word in words):
+                matches.add(post.id)
+    return matches
+
+
+def timed(function, db, query, runs):
+    latencies = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = function(db, query)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return result, latencies
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def rebuild_index(db):
+    print("🔨 Rebuilding inverted index from existing posts and comments...")
+    posts = ((post.id, post_document(post.title, post.contents)) for post in db.query(Post).yield_per(1000))
+    post_rows = search_index.rebuild(db, "post", posts)
+    comments = ((comment.id, comment.contents) for comment in db.query(Comment).yield_per(1000))
+    comment_rows = search_index.rebuild(db, "comment", comments)
+    db.commit()
+    print(f"✅ Wrote {post_rows} post and {comment_rows} comment posting rows")
+
+
+def main():
+    if '--help' in sys.argv or '-h' in sys.argv:
+        print("""
+Usage: python scripts/benchmark_search.py [OPTIONS] [QUERY ...]
+
+Options:
+  --rebuild      Rebuild the inverted index from existing data first
+  --runs N       Timed runs per query (default: 5)
+  --help, -h     Show this help message
+        """)
+        return True
+
+    args = sys.argv[1:]
+    rebuild = '--rebuild' in args
+    runs = 5
+    if '--runs' in args:
+        runs = int(args[args.index('--runs') + 1])
+        del args[args.index('--runs'):args.index('--runs') + 2]
+    queries = [arg for arg in args if not arg.startswith('--')] or DEFAULT_QUERIES
+
+    db = SessionLocal()
+    try:
+        if rebuild:
+            rebuild_index(db)
+
+        print(f"\n📊 {'query':<16}{'matches':>8}{'recall':>8}{'LIKE p50':>10}{'LIKE p95':>10}{'index p50':>11}{'index p95':>11}")
+        for query in queries:
+            truth, like_ms = timed(like_scan, db, query, runs)
+            found, index_ms = timed(index_search, db, query, runs)
+            recall = len(truth & found) / len(truth) if truth else 1.0
+            print(
+                f"   {query:<16}{len(truth):>8}{recall:>8.2%}"
+                f"{statistics.median(like_ms):>8.1f}ms{percentile(like_ms, 0.95):>8.1f}ms"
+                f"{statistics.median(index_ms):>9.1f}ms{percentile(index_ms, 0.95):>9.1f}ms"
+            )
+        return True
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
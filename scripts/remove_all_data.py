@@ -29,6 +29,15 @@ def get_table_dependencies():
     return [
         # Tables with foreign keys (clear first)
         'action_logs',
+        'view_logs',
+        'action_counts',
+        'action_rollups_hourly',
+        'action_rollups_daily',
+        'search_postings',
+        'tag_counts',
+        'post_scores',
+        'job_states',
+        'ref_cache_versions',
         'identity_verifications', 
         'comments',
         'post_tags',
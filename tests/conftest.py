@@ -0,0 +1,151 @@
+"""
+Shared fixtures: the API routers on an in-memory SQLite database.
+
+main.py creates tables on the configured PostgreSQL database at import, so the
+tests mount the routers on their own app and override get_db instead.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql import functions
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401  registers every model on Base.metadata
+from config.config import settings
+from database import Base, get_db
+from app.pagination import NEXT_CURSOR_HEADER
+from app.action.router import router as action_router
+from app.analytics.router import router as analytics_router
+from app.action.state_cache import ActionStateCache
+from app.action import service as action_service
+from app.community import view_buffer
+from app.church.router import router as church_router
+from app.community.router import router as community_router, tag_router
+from app.refcache.cache import reference_cache
+from app.refcache.router import router as cache_router
+from app.search.index import ensure_search_index
+from app.search.router import router as search_router
+from app.user.router import router as user_router
+
+# SQLite's CURRENT_TIMESTAMP has whole seconds and no fractional part, while
+# DateTime parameters are bound as "YYYY-MM-DD HH:MM:SS.ffffff". Text comparison
+# of the two would break (created_at, id) keyset filters, so the test database
+# gets microsecond timestamps in the bound format, like PostgreSQL's now().
+# Only SQLite's rendering of now() changes; the models are left untouched.
+@compiles(functions.now, "sqlite")
+def _sqlite_now(element, compiler, **kw):
+    return "(strftime('%Y-%m-%d %H:%M:%f000', 'now'))"
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+    @event.listens_for(engine, "connect")
+    def _foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def fresh_process_state(monkeypatch):
+    """Every test starts a new database, so per-process view buffers and caches start empty too"""
+    monkeypatch.setattr(view_buffer.view_counter, "store", view_buffer.MemoryViewStore(settings.VIEW_DEDUP_MAX_ENTRIES))
+    monkeypatch.setattr(action_service, "action_state_cache", ActionStateCache(
+        ttl=settings.ACTION_STATE_CACHE_TTL, max_users=settings.ACTION_STATE_CACHE_MAX_USERS
+    ))
+    reference_cache.invalidate()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(session_factory):
+    def override_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    api = FastAPI()
+    for router in (
+        user_router, community_router, tag_router, church_router, action_router, search_router, cache_router,
+        analytics_router
+    ):
+        api.include_router(router)
+    api.dependency_overrides[get_db] = override_get_db
+    with TestClient(api) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def user(client):
+    return client.post("/users/", json={}).json()
+
+
+@pytest.fixture
+def board(client):
+    return client.post("/boards/", json={"title": "General"}).json()
+
+
+@pytest.fixture
+def make_post(client, user, board):
+    def make_post(title="title", contents="contents"):
+        response = client.post(
+            f"/boards/{board['id']}/posts",
+            params={"author_id": user["id"]},
+            json={"board_id": board["id"], "title": title, "contents": contents}
+        )
+        assert response.status_code == 200
+        return response.json()
+    return make_post
+
+
+@pytest.fixture
+def make_comment(client, user):
+    def make_comment(post, contents="comment", parent=None):
+        response = client.post(
+            f"/boards/posts/{post['id']}/comments",
+            params={"author_id": user["id"]},
+            json={"post_id": post["id"], "contents": contents, "parent_id": parent["id"] if parent else None}
+        )
+        assert response.status_code == 200
+        return response.json()
+    return make_comment
+
+
+@pytest.fixture
+def walk(client):
+    def walk(url, limit, key=lambda item: item["id"], **params):
+        """Follow X-Next-Cursor from the first page to the last, returning the keys of every page"""
+        pages = []
+        params = {**params, "limit": limit}
+        while True:
+            response = client.get(url, params=params)
+            assert response.status_code == 200
+            pages.append([key(item) for item in response.json()])
+            cursor = response.headers.get(NEXT_CURSOR_HEADER)
+            if cursor is None:
+                return pages
+            params["cursor"] = cursor
+    return walk
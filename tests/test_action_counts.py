@@ -0,0 +1,73 @@
+from app.action import counters
+from app.action.models import ActionCount
+
+
+def like(user, post, is_on=True):
+    return {"user_id": user["id"], "action_type": "like", "target_type": "post", "target_id": post["id"], "is_on": is_on}
+
+
+def counts_of(client, *posts):
+    response = client.get("/actions/counts", params={
+        "target_type": "post", "target_ids": ",".join(str(post["id"]) for post in posts)
+    })
+    assert response.status_code == 200
+    return [item["counts"] for item in response.json()]
+
+
+def test_counts_follow_actions_turned_on_and_off(client, user, make_post):
+    post = make_post()
+    client.post("/actions/", json=like(user, post))
+    client.post("/actions/", json=like(user, post))
+    assert counts_of(client, post)[0]["like"] == 1
+
+    client.post("/actions/", json=like(user, post, is_on=False))
+    assert counts_of(client, post)[0]["like"] == 0
+
+    client.post("/actions/", json=like(user, post))
+    assert counts_of(client, post)[0]["like"] == 1
+
+
+def test_decrements_stop_at_zero(db):
+    counters.adjust_action_counts(db, {("post", 1, "like"): 1})
+    counters.adjust_action_counts(db, {("post", 1, "like"): -3})
+    db.commit()
+
+    assert counters.get_action_count(db, "post", 1, "like") == 0
+
+
+def test_counts_list_targets_in_request_order_with_zeros(client, user, make_post):
+    first, second = make_post(), make_post()
+    client.post("/actions/", json=like(user, second))
+
+    assert [counts["like"] for counts in counts_of(client, second, first)] == [1, 0]
+    assert client.get("/actions/counts", params={"target_type": "post", "target_ids": "1", "action_types": "nope"}).status_code == 400
+
+
+def test_reconcile_repairs_drifted_and_stale_counts(client, db, user, make_post):
+    first, second = make_post(), make_post()
+    client.post("/actions/", json=like(user, first))
+    client.post("/actions/", json={**like(user, first), "action_type": "view"})
+    db.query(ActionCount).filter(ActionCount.target_id == first["id"], ActionCount.action_type == "like").update({"count": 7})
+    db.query(ActionCount).filter(ActionCount.target_id == first["id"], ActionCount.action_type == "view").update({"count": 9})
+    db.add(ActionCount(target_type="post", target_id=second["id"], action_type="like", count=4))
+    db.commit()
+
+    assert counters.reconcile_action_counts(db) == 2
+    db.commit()
+
+    first_counts, second_counts = counts_of(client, first, second)
+    assert first_counts["like"] == 1 and second_counts["like"] == 0
+    # View counts are running totals and are never reconciled
+    assert first_counts["view"] == 9
+    assert counters.reconcile_action_counts(db) == 0
+
+
+def test_reconcile_creates_missing_counts(client, db, user, make_post):
+    post = make_post()
+    client.post("/actions/", json=like(user, post))
+    db.query(ActionCount).delete()
+    db.commit()
+
+    assert counters.reconcile_action_counts(db) == 1
+    db.commit()
+    assert counts_of(client, post)[0]["like"] == 1
@@ -0,0 +1,53 @@
+import pytest
+
+from app.pagination import MAX_PAGE_SIZE, encode_cursor
+
+
+def act(client, user, post, action_type):
+    response = client.post("/actions/", json={
+        "user_id": user["id"], "action_type": action_type, "target_type": "post", "target_id": post["id"]
+    })
+    assert response.status_code == 200
+    return response.json()
+
+
+# Outside PostgreSQL view_logs numbers its rows apart from action_logs, so ids alone may repeat
+def key(action):
+    return (action["action_type"], action["id"])
+
+
+def test_action_history_cursor_pages_merge_action_types(client, walk, user, make_post):
+    posts = [make_post(), make_post()]
+    for action_type in ("like", "view", "bookmark"):
+        for post in posts:
+            act(client, user, post, action_type)
+    full = [key(action) for action in client.get(f"/actions/user/{user['id']}").json()]
+
+    pages = walk(f"/actions/user/{user['id']}", limit=4, key=key, paginate="cursor")
+    keys = [action_key for page in pages for action_key in page]
+    assert len(keys) == len(set(keys)) == 6
+    assert keys == full
+
+    pages = walk(f"/actions/target/post/{posts[0]['id']}", limit=1, paginate="cursor")
+    assert [len(page) for page in pages] == [1, 1, 1, 0]
+
+
+def test_action_history_filters_by_action_type(client, walk, user, make_post):
+    posts = [make_post() for _ in range(3)]
+    likes = [act(client, user, post, "like") for post in posts]
+    act(client, user, posts[0], "bookmark")
+
+    pages = walk(f"/actions/user/{user['id']}", limit=2, paginate="cursor", action_type="like")
+    assert [action_id for page in pages for action_id in page] == [like["id"] for like in reversed(likes)]
+
+
+@pytest.mark.parametrize("url", ["/actions/user/1", "/actions/target/post/1"])
+@pytest.mark.parametrize("limit", [0, MAX_PAGE_SIZE + 1])
+def test_action_history_rejects_out_of_range_limits(client, url, limit):
+    assert client.get(url, params={"paginate": "cursor", "limit": limit}).status_code == 422
+
+
+@pytest.mark.parametrize("url", ["/actions/user/1", "/actions/target/post/1"])
+def test_action_history_rejects_malformed_cursors(client, url):
+    assert client.get(url, params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get(url, params={"cursor": encode_cursor("2024-01-01")}).status_code == 400
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.action.models import ActionLog, ViewLog
+from app.analytics import rollup
+from app.analytics.models import ActionRollupDaily, ActionRollupHourly
+
+START = datetime(2024, 3, 1, 10, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def users(client):
+    return [client.post("/users/", json={}).json() for _ in range(3)]
+
+
+def log(db, user, post, minutes, action_type="like", is_on=True):
+    db.add(ActionLog(
+        user_id=user["id"], action_type=action_type, target_type="post", target_id=post["id"],
+        is_on=is_on, created_at=START + timedelta(minutes=minutes)
+    ))
+
+
+def log_view(db, view_id, user, post, minutes):
+    db.add(ViewLog(
+        id=view_id, user_id=user["id"], target_type="post", target_id=post["id"],
+        created_at=START + timedelta(minutes=minutes)
+    ))
+
+
+def series(client, url, **params):
+    response = client.get(url, params={"start": "2024-03-01T00:00:00Z", "end": "2024-03-02T00:00:00Z", **params})
+    assert response.status_code == 200
+    return [(point["bucket"][:16], point["count"]) for point in response.json()]
+
+
+def run(db, batch_size=1000):
+    result = rollup.rollup_actions(db, lag=60, batch_size=batch_size)
+    db.commit()
+    return result
+
+
+def test_actions_and_views_roll_up_into_hours_and_days(client, db, users, make_post):
+    post = make_post()
+    log(db, users[0], post, 5)
+    log(db, users[1], post, 50)
+    log(db, users[2], post, 70)
+    # Actions turned off are not counted
+    log(db, users[0], post, 20, action_type="bookmark", is_on=False)
+    for view_id, minutes in enumerate([1, 2, 61], start=1):
+        log_view(db, view_id, users[0], post, minutes)
+    db.commit()
+
+    result = run(db)
+
+    assert result["last_ids"] == {"rollup_actions": 4, "rollup_view_logs": 3}
+    url = f"/analytics/actions/post/{post['id']}"
+    assert series(client, url, action_type="like") == [("2024-03-01T10:00", 2), ("2024-03-01T11:00", 1)]
+    assert series(client, url, action_type="view") == [("2024-03-01T10:00", 2), ("2024-03-01T11:00", 1)]
+    assert series(client, url, action_type="like", granularity="day") == [("2024-03-01T00:00", 3)]
+    assert series(client, url, action_type="bookmark") == []
+
+
+def test_each_row_is_folded_in_once(db, users, make_post):
+    post = make_post()
+    log(db, users[0], post, 5)
+    log(db, users[1], post, 10)
+    log(db, users[2], post, 15)
+    db.commit()
+
+    # Batches pick up where the previous run stopped
+    assert run(db, batch_size=2)["last_ids"]["rollup_actions"] == 2
+    assert run(db, batch_size=2)["last_ids"]["rollup_actions"] == 3
+    assert run(db, batch_size=2) == {"buckets": 0, "last_ids": {"rollup_actions": 3, "rollup_view_logs": 0}}
+
+    assert [row.count for row in db.query(ActionRollupHourly)] == [3]
+    assert [row.count for row in db.query(ActionRollupDaily)] == [3]
+
+
+def test_rows_younger_than_the_lag_wait_for_the_next_run(client, db, users, make_post):
+    post = make_post()
+    log(db, users[0], post, 5)
+    db.commit()
+    client.post("/actions/", json={
+        "user_id": users[1]["id"], "action_type": "like", "target_type": "post", "target_id": post["id"]
+    })
+
+    assert run(db)["last_ids"]["rollup_actions"] == 1
+    assert sum(row.count for row in db.query(ActionRollupHourly)) == 1
+
+
+def test_board_series_sums_the_boards_posts(client, db, users, board, make_post):
+    first, second = make_post(), make_post()
+    log(db, users[0], first, 5)
+    log(db, users[1], second, 30)
+    log(db, users[0], second, 90)
+    db.commit()
+    run(db)
+
+    assert series(client, f"/analytics/boards/{board['id']}/actions", action_type="like") == [
+        ("2024-03-01T10:00", 2), ("2024-03-01T11:00", 1)
+    ]
+    assert series(client, f"/analytics/boards/{board['id'] + 1}/actions", action_type="like") == []
+
+
+@pytest.mark.parametrize("params", [
+    {"action_type": "share"},
+    {"action_type": "like", "start": "2024-03-02T00:00:00Z", "end": "2024-03-01T00:00:00Z"},
+    {"action_type": "like", "start": "2024-01-01T00:00:00Z", "end": "2024-03-01T00:00:00Z"},
+])
+def test_series_rejects_bad_parameters(client, params):
+    assert client.get("/analytics/actions/post/1", params=params).status_code == 400
+    assert client.get("/analytics/actions/board/1", params={"action_type": "like"}).status_code == 400
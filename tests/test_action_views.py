@@ -0,0 +1,61 @@
+"""View writes go to view_logs; on SQLite its ids come from the table itself rather than nextval()"""
+from app.action.models import ViewLog
+from app.community.view_buffer import view_counter
+
+
+def view(user, post, **fields):
+    return {"user_id": user["id"], "action_type": "view", "target_type": "post", "target_id": post["id"], **fields}
+
+
+def test_create_view_logs_a_view(client, db, user, make_post):
+    post = make_post()
+    response = client.post("/actions/", json=view(user, post))
+
+    assert response.status_code == 200
+    logged = response.json()
+    assert logged["action_type"] == "view" and logged["is_on"] is True
+    assert db.query(ViewLog).filter(ViewLog.id == logged["id"]).count() == 1
+    assert client.get(f"/actions/{logged['id']}").json()["action_type"] == "view"
+
+
+def test_view_ids_increase(client, user, make_post):
+    posts = [make_post(), make_post()]
+    ids = [client.post("/actions/", json=view(user, post)).json()["id"] for post in posts]
+
+    assert ids[0] < ids[1]
+
+
+def test_toggle_view(client, user, make_post):
+    post = make_post()
+    response = client.post("/actions/toggle", params=view(user, post))
+
+    assert response.status_code == 200
+    assert response.json()["action_type"] == "view"
+
+
+def test_batch_views_and_repeats_within_the_dedup_window(client, user, make_post):
+    posts = [make_post(), make_post()]
+    first = client.post("/actions/", json=view(user, posts[0])).json()
+
+    response = client.post("/actions/batch", json={"actions": [view(user, post) for post in posts]})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == (
+        ["unchanged", "created"] if view_counter.dedup_window > 0 else ["created", "created"]
+    )
+    if view_counter.dedup_window > 0:
+        assert results[0]["action_log"]["id"] == first["id"]
+
+
+def test_views_show_up_in_history_and_counts(client, user, make_post):
+    post = make_post()
+    client.post("/actions/", json=view(user, post))
+    client.post("/actions/", json={**view(user, post), "action_type": "like"})
+
+    history = client.get(f"/actions/user/{user['id']}", params={"action_type": "view"}).json()
+    assert [action["target_id"] for action in history] == [post["id"]]
+
+    counts = client.get("/actions/counts", params={"target_type": "post", "target_ids": str(post["id"])}).json()
+    assert counts[0]["counts"]["view"] == 1
+    assert counts[0]["counts"]["like"] == 1
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from app.http_cache import make_etag
+
+
+def revalidate(client, url, response, **params):
+    return client.get(url, params=params, headers={"If-None-Match": response.headers["ETag"]})
+
+
+def test_etags_are_stable_and_follow_their_values():
+    created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    assert make_etag(1, "title", created_at) == make_etag(1, "title", created_at)
+    assert make_etag(1, "title", created_at) != make_etag(1, "title!", created_at)
+    assert make_etag(1, weak=True) == "W/" + make_etag(1)
+
+
+def test_post_revalidates_until_it_is_edited(client, make_post):
+    post = make_post()
+    url = f"/boards/posts/{post['id']}"
+    first = client.get(url)
+
+    assert first.headers["ETag"].startswith("W/")
+    assert first.headers["Cache-Control"] == "no-cache"
+    not_modified = revalidate(client, url, first)
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert not_modified.headers["ETag"] == first.headers["ETag"]
+
+    client.put(url, json={"title": "edited"})
+    changed = revalidate(client, url, first)
+    assert changed.status_code == 200 and changed.json()["title"] == "edited"
+
+
+def test_post_views_are_counted_on_revalidation(client, make_post):
+    post = make_post()
+    url = f"/boards/posts/{post['id']}"
+    first = client.get(url, params={"viewer_id": 1})
+    assert revalidate(client, url, first, viewer_id=2).status_code == 304
+
+    # View counts are not part of the validator, so the ETag stays put while views are counted
+    second = client.get(url, params={"viewer_id": 3})
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert second.json()["view_count"] == 3
+
+
+def test_if_modified_since_uses_last_modified(client, make_post):
+    post = make_post()
+    url = f"/boards/posts/{post['id']}"
+    last_modified = client.get(url).headers["Last-Modified"]
+
+    assert client.get(url, headers={"If-Modified-Since": last_modified}).status_code == 304
+    earlier = format_datetime(datetime.now(timezone.utc) - timedelta(days=1), usegmt=True)
+    assert client.get(url, headers={"If-Modified-Since": earlier}).status_code == 200
+    assert client.get(url, headers={"If-Modified-Since": "yesterday"}).status_code == 200
+    # If-None-Match wins over If-Modified-Since
+    assert client.get(url, headers={"If-None-Match": '"other"', "If-Modified-Since": last_modified}).status_code == 200
+
+
+def test_if_none_match_lists_and_wildcards(client, make_post):
+    post = make_post()
+    url = f"/boards/posts/{post['id']}"
+    etag = client.get(url).headers["ETag"]
+
+    assert client.get(url, headers={"If-None-Match": f'"other", {etag}'}).status_code == 304
+    # Weak comparison: the W/ prefix does not matter
+    assert client.get(url, headers={"If-None-Match": etag[2:]}).status_code == 304
+    assert client.get(url, headers={"If-None-Match": "*"}).status_code == 304
+
+
+def test_comments_revalidate_until_a_comment_is_added(client, make_post, make_comment):
+    post = make_post()
+    make_comment(post)
+    url = f"/boards/posts/{post['id']}/comments"
+    first = client.get(url)
+
+    assert revalidate(client, url, first).status_code == 304
+    # The page parameters are part of the validator
+    assert revalidate(client, url, first, top_level=True).status_code == 200
+
+    make_comment(post, contents="another")
+    assert revalidate(client, url, first).status_code == 200
+
+
+def test_profile_is_private_and_revalidates(client, user):
+    client.post("/users/profiles/", json={"user_id": user["id"], "nickname": "grace"})
+    url = f"/users/{user['id']}/profile"
+    first = client.get(url)
+
+    assert first.headers["Cache-Control"] == "private, no-cache"
+    assert revalidate(client, url, first).status_code == 304
+
+
+def test_church_directory_is_public_and_changes_with_the_directory(client):
+    client.post("/churches/", json={"name": "Hope Church"})
+    first = client.get("/churches/")
+
+    assert first.headers["Cache-Control"] == "public, max-age=300"
+    assert revalidate(client, "/churches/", first).status_code == 304
+    assert client.get("/churches/", params={"limit": 1}).headers["ETag"] != first.headers["ETag"]
+
+    client.post("/churches/", json={"name": "Grace Church"})
+    assert revalidate(client, "/churches/", first).status_code == 200
@@ -0,0 +1,40 @@
+import pytest
+
+from app.pagination import MAX_PAGE_SIZE, encode_cursor
+
+
+@pytest.fixture
+def posts(make_post):
+    return [make_post(title=f"post {i}") for i in range(5)]
+
+
+def test_board_posts_cursor_pages_cover_every_post_once(walk, board, posts):
+    pages = walk(f"/boards/{board['id']}/posts", limit=2, paginate="cursor")
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [post_id for page in pages for post_id in page] == [post["id"] for post in reversed(posts)]
+
+
+def test_board_posts_full_last_page_is_followed_by_an_empty_page(walk, board, posts):
+    pages = walk(f"/boards/{board['id']}/posts", limit=5, paginate="cursor")
+
+    assert pages == [[post["id"] for post in reversed(posts)], []]
+
+
+def test_board_posts_offset_mode_is_unchanged(client, board, posts):
+    response = client.get(f"/boards/{board['id']}/posts", params={"skip": 1, "limit": 2})
+
+    assert [post["id"] for post in response.json()] == [posts[3]["id"], posts[2]["id"]]
+    assert "X-Next-Cursor" not in response.headers
+
+
+@pytest.mark.parametrize("limit", [0, -1, MAX_PAGE_SIZE + 1])
+def test_board_posts_reject_out_of_range_limits(client, board, limit):
+    response = client.get(f"/boards/{board['id']}/posts", params={"paginate": "cursor", "limit": limit})
+
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(None, 1), encode_cursor("2024-01-01")])
+def test_malformed_cursor_is_rejected(client, board, cursor):
+    assert client.get(f"/boards/{board['id']}/posts", params={"cursor": cursor}).status_code == 400
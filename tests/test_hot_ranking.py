@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func
+
+from app.community import counters, ranking
+from app.community.models import Post, PostScore
+from app.pagination import MAX_PAGE_SIZE
+
+
+def hot_ids(client, board):
+    response = client.get(f"/boards/{board['id']}/posts", params={"sort": "hot"})
+    assert response.status_code == 200
+    return [post["id"] for post in response.json()]
+
+
+def test_hot_posts_cursor_pages_cover_every_post_once(walk, board, make_post):
+    posts = [make_post(title=f"post {i}") for i in range(5)]
+    pages = walk(f"/boards/{board['id']}/posts", limit=2, sort="hot")
+
+    assert sorted(post_id for page in pages for post_id in page) == sorted(post["id"] for post in posts)
+
+
+def test_engagement_outranks_recency_after_a_refresh(client, db, board, make_post):
+    older, newer = make_post(), make_post()
+    assert hot_ids(client, board) == [newer["id"], older["id"]]
+
+    for _ in range(5):
+        counters.adjust_post_counter(db, older["id"], "like_count", 1)
+    counters.adjust_post_counter(db, older["id"], "comment_count", 1)
+    # Listings read the stored scores, so the likes only count once the scores are refreshed
+    db.commit()
+    assert hot_ids(client, board) == [newer["id"], older["id"]]
+
+    assert ranking.refresh_scores(db, since=None) == 2
+    db.commit()
+    assert hot_ids(client, board) == [older["id"], newer["id"]]
+
+
+def test_refresh_only_rescores_posts_touched_since(db, make_post):
+    first, second = make_post(), make_post()
+    since = db.query(func.max(Post.activity_at)).scalar() + timedelta(microseconds=1)
+
+    counters.adjust_post_counter(db, first["id"], "view_count", 30)
+    db.commit()
+
+    assert ranking.refresh_scores(db, since=since) == 1
+    db.commit()
+    scores = {row.post_id: row.score for row in db.query(PostScore)}
+    assert scores[first["id"]] > scores[second["id"]]
+
+
+def test_hot_score_weighs_engagement_against_age():
+    created_at = datetime(2024, 1, 1)
+    later = created_at + timedelta(seconds=ranking.HOT_SCORE_TIME_SCALE)
+
+    # Ten times the engagement is worth HOT_SCORE_TIME_SCALE seconds of freshness
+    assert ranking.hot_score(10, 0, 0, created_at) == pytest.approx(ranking.hot_score(1, 0, 0, later))
+    assert ranking.hot_score(0, 0, 0, created_at) == ranking.hot_score(1, 0, 0, created_at)
+    assert ranking.hot_score(0, 1, 0, created_at) > ranking.hot_score(1, 0, 0, created_at)
+
+
+def test_hot_listing_rejects_bad_sort_and_limits(client, board):
+    assert client.get(f"/boards/{board['id']}/posts", params={"sort": "top"}).status_code == 400
+    assert client.get(f"/boards/{board['id']}/posts", params={"sort": "hot", "limit": MAX_PAGE_SIZE + 1}).status_code == 422
@@ -0,0 +1,40 @@
+import pytest
+
+
+def comment(client, user, post, contents):
+    return client.post(
+        f"/boards/posts/{post['id']}/comments", params={"author_id": user["id"]},
+        json={"post_id": post["id"], "contents": contents}
+    ).json()
+
+
+def test_detail_bundles_post_tags_comments_and_viewer_state(client, user, make_post):
+    post = make_post()
+    client.post(f"/boards/posts/{post['id']}/tags", params={"tag": "prayer"})
+    comments = [comment(client, user, post, f"comment {i}") for i in range(3)]
+    client.post("/actions/", json={
+        "user_id": user["id"], "action_type": "like", "target_type": "post", "target_id": post["id"]
+    })
+
+    response = client.get(f"/boards/posts/{post['id']}/full", params={"viewer_id": user["id"], "comment_limit": 2})
+
+    assert response.status_code == 200
+    detail = response.json()
+    assert detail["post"]["id"] == post["id"]
+    assert detail["tags"] == ["prayer"]
+    assert [item["id"] for item in detail["comments"]] == [item["id"] for item in comments[:2]]
+    assert detail["viewer"]["liked"] is True and detail["viewer"]["bookmarked"] is False
+
+
+def test_detail_without_viewer_has_no_viewer_state(client, make_post):
+    post = make_post()
+
+    assert client.get(f"/boards/posts/{post['id']}/full").json()["viewer"] is None
+    assert client.get("/boards/posts/999/full").status_code == 404
+
+
+@pytest.mark.parametrize("comment_limit", [-1, 101])
+def test_detail_rejects_out_of_range_comment_limit(client, make_post, comment_limit):
+    post = make_post()
+
+    assert client.get(f"/boards/posts/{post['id']}/full", params={"comment_limit": comment_limit}).status_code == 422
@@ -0,0 +1,125 @@
+import time
+
+import pytest
+
+from app.refcache import cache as refcache
+from app.refcache.cache import ReferenceCache, reference_cache
+from app.refcache.models import RefCacheVersion
+
+
+class Row:
+    def __init__(self, id, name):
+        self.id, self.name = id, name
+
+    # make_etag hashes values it cannot serialize by their str()
+    def __repr__(self):
+        return f"Row({self.id}, {self.name})"
+
+
+@pytest.fixture
+def rows():
+    return [Row(1, "first")]
+
+
+@pytest.fixture
+def table(rows):
+    loads = []
+
+    def load(db):
+        loads.append(len(rows))
+        return list(rows)
+
+    table = ReferenceCache(enabled=True, poll_interval=60).register("rows", load)
+    table.loads = loads
+    return table
+
+
+def test_rows_are_loaded_once_until_invalidated(table, rows):
+    assert [row.name for row in table.all(None)] == ["first"]
+    rows.append(Row(2, "second"))
+    assert table.get(None, 2) is None
+    assert table.loads == [1] and (table.hits, table.misses) == (1, 1)
+
+    table.invalidate()
+    assert table.get(None, 2).name == "second"
+    assert table.size() == 2 and table.loads == [1, 2]
+
+
+def test_etag_follows_the_snapshot(table, rows):
+    _, etag = table.all_with_etag(None)
+    assert table.all_with_etag(None)[1] == etag
+
+    rows[0] = Row(1, "renamed")
+    table.invalidate()
+    assert table.all_with_etag(None)[1] != etag
+
+
+def test_a_load_raced_by_an_invalidation_is_not_kept(rows):
+    cache = ReferenceCache(enabled=True, poll_interval=60)
+
+    def load(db):
+        # A write commits while the rows are being read
+        cache.invalidate("rows")
+        return list(rows)
+
+    table = cache.register("rows", load)
+    assert len(table.all(None)) == 1
+    assert table.size() is None
+
+
+def test_disabled_cache_always_loads(rows):
+    table = ReferenceCache(enabled=False, poll_interval=60).register("rows", lambda db: list(rows))
+    table.all(None)
+    table.all(None)
+
+    assert (table.hits, table.misses) == (0, 2)
+
+
+def test_committed_writes_invalidate_this_worker(client, db, board):
+    assert client.get(f"/boards/{board['id']}").json()["title"] == "General"
+    client.put(f"/boards/{board['id']}", json={"title": "Notices"})
+
+    assert client.get(f"/boards/{board['id']}").json()["title"] == "Notices"
+    assert [board["title"] for board in client.get("/boards/").json()] == ["Notices"]
+    assert db.get(RefCacheVersion, "boards").version >= 2
+
+
+def test_rolled_back_changes_keep_the_cache(client, db):
+    client.post("/churches/", json={"name": "Hope Church"})
+    client.get("/churches/")
+    churches = reference_cache.tables["churches"]
+    assert churches.size() == 1
+
+    reference_cache.changed(db, "churches")
+    db.rollback()
+    # The next commit of the session must not carry the rolled back change along
+    db.commit()
+    assert churches.size() == 1
+
+
+def test_other_workers_see_changes_by_polling(monkeypatch, engine, session_factory, db, rows):
+    monkeypatch.setattr(refcache, "engine", engine)
+    monkeypatch.setattr(refcache, "SessionLocal", session_factory)
+    worker = ReferenceCache(enabled=True, poll_interval=0.01)
+    table = worker.register("rows", lambda db: list(rows))
+    table.all(None)
+    worker.start()
+    try:
+        # Another worker commits a change; only the version row reaches this one
+        reference_cache.changed(db, "rows")
+        db.commit()
+        deadline = time.monotonic() + 5
+        while table.size() is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert table.size() is None
+    finally:
+        worker.stop()
+
+
+def test_stats_report_hits_and_misses(client, board):
+    client.get(f"/boards/{board['id']}")
+    client.get(f"/boards/{board['id']}")
+
+    stats = client.get("/cache/stats").json()["boards"]
+    assert stats["cached_rows"] == 1
+    assert stats["hits"] >= 1 and 0 < stats["hit_ratio"] < 1
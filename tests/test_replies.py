@@ -0,0 +1,33 @@
+import pytest
+
+from app.pagination import MAX_PAGE_SIZE
+
+
+@pytest.fixture
+def thread(make_post, make_comment):
+    post = make_post()
+    parent = make_comment(post, "parent")
+    children = [make_comment(post, f"reply {i}", parent=parent) for i in range(3)]
+    return post, parent, children
+
+
+def test_replies_cursor_pages_are_oldest_first(walk, thread):
+    _, parent, children = thread
+    pages = walk(f"/boards/comments/{parent['id']}/replies", limit=2)
+
+    assert [reply_id for page in pages for reply_id in page] == [child["id"] for child in children]
+
+
+def test_replies_are_counted_on_the_parent(client, thread):
+    post, parent, _ = thread
+
+    assert client.get(f"/boards/comments/{parent['id']}").json()["reply_count"] == 3
+    top_level = client.get(f"/boards/posts/{post['id']}/comments", params={"top_level": True}).json()
+    assert [(comment["id"], comment["reply_count"]) for comment in top_level] == [(parent["id"], 3)]
+
+
+@pytest.mark.parametrize("limit", [0, MAX_PAGE_SIZE + 1])
+def test_replies_reject_out_of_range_limits(client, thread, limit):
+    _, parent, _ = thread
+
+    assert client.get(f"/boards/comments/{parent['id']}/replies", params={"limit": limit}).status_code == 422
@@ -0,0 +1,74 @@
+import pytest
+
+from app.pagination import encode_cursor
+
+
+def search(client, **params):
+    response = client.get("/search/", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_search_finds_posts_and_comments(client, make_post, make_comment):
+    post = make_post(title="Sunday worship", contents="Choir practice after the service")
+    make_post(title="Bazaar", contents="Bring your own bags")
+    comment = make_comment(post, contents="Choir robes are in the closet")
+
+    hits = search(client, q="choir")
+    assert sorted((hit["kind"], hit["id"]) for hit in hits) == [("comment", comment["id"]), ("post", post["id"])]
+    assert all(hit["post_id"] == post["id"] and hit["title"] == "Sunday worship" for hit in hits)
+
+    assert [hit["id"] for hit in search(client, q="choir", kind="comment")] == [comment["id"]]
+    # Every term has to match
+    assert search(client, q="choir bazaar") == []
+
+
+def test_search_filters_by_board(client, user, make_post):
+    other = client.post("/boards/", json={"title": "Youth"}).json()
+    make_post(title="Retreat", contents="Retreat schedule")
+    response = client.post(
+        f"/boards/{other['id']}/posts",
+        params={"author_id": user["id"]},
+        json={"board_id": other["id"], "title": "Retreat", "contents": "Youth retreat"}
+    )
+
+    assert [hit["id"] for hit in search(client, q="retreat", board_id=other["id"])] == [response.json()["id"]]
+
+
+def test_search_follows_edits_and_deletes(client, make_post):
+    post = make_post(title="Notice", contents="Parking lot closed")
+    client.put(f"/boards/posts/{post['id']}", json={"contents": "Parking lot open"})
+
+    assert search(client, q="closed") == []
+    assert [hit["snippet"] for hit in search(client, q="open")] == ["Parking lot open"]
+
+    client.delete(f"/boards/posts/{post['id']}")
+    assert search(client, q="parking") == []
+
+
+def test_search_cursor_pages_cover_every_hit_once(client, walk, make_post):
+    posts = [make_post(title=f"prayer {i}", contents="prayer request") for i in range(5)]
+    key = lambda hit: (hit["kind"], hit["id"])
+
+    pages = walk("/search/", limit=2, key=key, q="prayer")
+
+    hits = [hit for page in pages for hit in page]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sorted(hits) == sorted(("post", post["id"]) for post in posts)
+
+
+def test_search_query_syntax_is_treated_as_text(client, make_post):
+    make_post(title="Q&A", contents="questions AND answers")
+
+    assert len(search(client, q='answers OR "')) == 0
+    assert len(search(client, q="AND answers")) == 1
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(1.0, "post"), encode_cursor(1.0, ["post"], 3)])
+def test_search_rejects_malformed_cursors(client, cursor):
+    assert client.get("/search/", params={"q": "prayer", "cursor": cursor}).status_code == 400
+
+
+@pytest.mark.parametrize("params", [{"q": ""}, {"q": "prayer", "limit": 0}, {"q": "prayer", "limit": 101}])
+def test_search_rejects_out_of_range_parameters(client, params):
+    assert client.get("/search/", params=params).status_code == 422
@@ -0,0 +1,88 @@
+import pytest
+
+from app.search.inverted_index import BLOCK_SIZE, InvertedIndex, intersect, pack, unpack
+from app.search.tokenizer import HangulNgramTokenizer, get_tokenizer
+
+tokenizer = HangulNgramTokenizer()
+
+
+def search(client, q, **params):
+    response = client.get("/search/", params={"q": q, "mode": "ngram", **params})
+    assert response.status_code == 200
+    return [(hit["kind"], hit["id"]) for hit in response.json()]
+
+
+def test_tokenizer_splits_hangul_runs_into_ngrams():
+    assert tokenizer.tokenize("기도해요") == ["기도", "도해", "해요", "기도해", "도해요"]
+    # Other scripts stay whole words, lowercased, next to the Hangul runs of the same word
+    assert tokenizer.tokenize("QT모임 Notice") == ["qt", "모임", "notice"]
+    assert tokenizer.terms("기 도") == {"기", "도"}
+
+
+def test_tokenizer_only_searches_queries_it_can_match():
+    assert tokenizer.searchable("기도")
+    assert tokenizer.searchable("qt")
+    assert not tokenizer.searchable("기")
+    assert not tokenizer.searchable("기도 중")
+    with pytest.raises(ValueError):
+        get_tokenizer("morpheme")
+
+
+def test_posting_lists_round_trip_and_intersect():
+    assert list(unpack(pack([3, 70000, 2 ** 32 - 1]))) == [3, 70000, 2 ** 32 - 1]
+    assert list(unpack(None)) == []
+    assert intersect([unpack(pack([1, 4, 9, 12])), unpack(pack([4, 12, 20])), unpack(pack([2, 4, 12]))]) == [4, 12]
+    assert intersect([unpack(pack([1, 2])), unpack(pack([]))]) == []
+
+
+def test_ngram_search_matches_inside_korean_words(client, make_post, make_comment):
+    post = make_post(title="수요예배 안내", contents="함께 기도해주세요")
+    other = make_post(title="바자회", contents="기부 물품을 받습니다")
+    comment = make_comment(other, contents="기도하겠습니다")
+
+    assert search(client, "기도") == [("post", post["id"]), ("comment", comment["id"])]
+    assert search(client, "예배") == [("post", post["id"])]
+    assert search(client, "기도", kind="comment") == [("comment", comment["id"])]
+    assert search(client, "기도 바자회") == []
+
+
+def test_ngram_search_follows_edits_and_deletes(client, make_post):
+    post = make_post(title="공지", contents="주차장 폐쇄")
+    client.put(f"/boards/posts/{post['id']}", json={"contents": "주차장 개방"})
+
+    assert search(client, "폐쇄") == []
+    assert search(client, "개방") == [("post", post["id"])]
+
+    client.delete(f"/boards/posts/{post['id']}")
+    assert search(client, "주차장") == []
+
+
+def test_ngram_search_cursor_pages_are_newest_first(walk, make_post):
+    posts = [make_post(title=f"기도 제목 {i}") for i in range(5)]
+
+    pages = walk("/search/", limit=2, q="기도", mode="ngram")
+
+    assert pages == [[posts[4]["id"], posts[3]["id"]], [posts[2]["id"], posts[1]["id"]], [posts[0]["id"]]]
+
+
+def test_ngram_search_rejects_queries_shorter_than_an_ngram(client):
+    assert client.get("/search/", params={"q": "기", "mode": "ngram"}).status_code == 400
+
+
+def test_index_spans_blocks_and_rebuilds(db):
+    index = InvertedIndex(tokenizer)
+    late = BLOCK_SIZE + 5
+    index.index_document(db, "post", 3, "기도 모임")
+    index.index_document(db, "post", late, "기도 제목")
+    index.index_document(db, "post", 7, "찬양 모임")
+
+    assert index.candidates(db, "post", "기도") == [late, 3]
+    assert index.candidates(db, "post", "모임") == [7, 3]
+
+    index.index_document(db, "post", 3, "찬양 모임", previous_text="기도 모임")
+    assert index.candidates(db, "post", "기도") == [late]
+    assert index.candidates(db, "post", "찬양 모임") == [7, 3]
+
+    assert index.rebuild(db, "post", [(1, "기도"), (2, "기도해")]) == 3
+    assert index.candidates(db, "post", "기도") == [2, 1]
+    assert index.candidates(db, "post", "찬양") == []
@@ -0,0 +1,79 @@
+import pytest
+
+from app.community import counters
+from app.community.models import TagCount
+from app.pagination import MAX_PAGE_SIZE
+
+
+def tag_counts(client):
+    response = client.get("/tags/")
+    assert response.status_code == 200
+    return {item["tag"]: item["post_count"] for item in response.json()}
+
+
+def test_tag_posts_cursor_pages_are_newest_first(client, walk, make_post):
+    posts = [make_post(title=f"post {i}") for i in range(5)]
+    for post in posts:
+        client.post(f"/boards/posts/{post['id']}/tags", params={"tag": "news"})
+    pages = walk("/tags/news/posts", limit=2)
+
+    assert [post_id for page in pages for post_id in page] == [post["id"] for post in reversed(posts)]
+
+
+def test_tag_counts_follow_added_and_removed_tags(client, make_post):
+    first, second = make_post(), make_post()
+    client.post(f"/boards/posts/{first['id']}/tags", params={"tag": "news"})
+    client.post(f"/boards/posts/{second['id']}/tags", params={"tag": "news"})
+    client.post(f"/boards/posts/{second['id']}/tags", params={"tag": "qna"})
+    assert tag_counts(client) == {"news": 2, "qna": 1}
+
+    assert client.delete(f"/boards/posts/{first['id']}/tags/news").status_code == 200
+    assert client.delete(f"/boards/posts/{second['id']}/tags/qna").status_code == 200
+    # Tags with no posts left drop out of the listing
+    assert tag_counts(client) == {"news": 1}
+
+
+def test_set_tags_counts_only_the_difference(client, make_post):
+    post = make_post()
+    client.put(f"/boards/posts/{post['id']}/tags", json={"tags": ["news", "qna"]})
+    response = client.put(f"/boards/posts/{post['id']}/tags", json={"tags": [" qna ", "event", "event"]})
+
+    assert response.status_code == 200
+    assert sorted(tag["tag"] for tag in response.json()) == ["event", "qna"]
+    assert tag_counts(client) == {"event": 1, "qna": 1}
+
+    client.put(f"/boards/posts/{post['id']}/tags", json={"tags": []})
+    assert tag_counts(client) == {}
+
+
+def test_deleting_a_post_releases_its_tags(client, make_post):
+    first, second = make_post(), make_post()
+    client.put(f"/boards/posts/{first['id']}/tags", json={"tags": ["news", "qna"]})
+    client.put(f"/boards/posts/{second['id']}/tags", json={"tags": ["news"]})
+
+    assert client.delete(f"/boards/posts/{first['id']}").status_code == 200
+    assert tag_counts(client) == {"news": 1}
+
+
+def test_tag_counts_are_ordered_by_post_count(client, make_post):
+    posts = [make_post() for _ in range(3)]
+    for post in posts:
+        client.post(f"/boards/posts/{post['id']}/tags", params={"tag": "news"})
+    client.post(f"/boards/posts/{posts[0]['id']}/tags", params={"tag": "event"})
+    client.post(f"/boards/posts/{posts[0]['id']}/tags", params={"tag": "archive"})
+
+    assert [item["tag"] for item in client.get("/tags/").json()] == ["news", "archive", "event"]
+
+
+def test_tag_count_decrements_stop_at_zero(db):
+    counters.adjust_tag_counts(db, {"news": 1, "qna": -1})
+    counters.adjust_tag_counts(db, {"news": -3})
+    db.commit()
+
+    # A decrement never creates a count row
+    assert {row.tag: row.post_count for row in db.query(TagCount)} == {"news": 0}
+
+
+@pytest.mark.parametrize("limit", [0, MAX_PAGE_SIZE + 1])
+def test_tag_posts_reject_out_of_range_limits(client, limit):
+    assert client.get("/tags/news/posts", params={"limit": limit}).status_code == 422
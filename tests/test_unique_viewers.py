@@ -0,0 +1,75 @@
+import pytest
+
+from app.community import counters, view_buffer
+from app.community.hll import REGISTERS, HyperLogLog
+from app.community.models import Post
+
+
+def sketch_of(values):
+    sketch = HyperLogLog()
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+@pytest.mark.parametrize("distinct", [10, 1000, 50000])
+def test_estimate_is_close_to_the_distinct_count(distinct):
+    sketch = sketch_of(f"user:{i}" for i in range(distinct))
+    # Repeats never move a register
+    for i in range(distinct):
+        sketch.add(f"user:{i}")
+
+    assert sketch.count() == pytest.approx(distinct, rel=0.05)
+
+
+def test_merged_sketches_estimate_the_union():
+    first = sketch_of(f"user:{i}" for i in range(3000))
+    second = sketch_of(f"user:{i}" for i in range(2000, 5000))
+
+    first.merge(second)
+
+    assert first.count() == pytest.approx(5000, rel=0.05)
+    assert HyperLogLog(first.to_bytes()).count() == first.count()
+
+
+def test_unreadable_registers_start_an_empty_sketch():
+    assert HyperLogLog(b"").count() == 0
+    assert HyperLogLog(b"\x01" * (REGISTERS - 1)).count() == 0
+    assert HyperLogLog(None).to_bytes() == bytes(REGISTERS)
+
+
+def test_memory_store_dedups_within_the_window_and_stays_bounded():
+    store = view_buffer.MemoryViewStore(dedup_max_entries=2)
+
+    assert store.first_view("user:1", 1, window=60)
+    assert not store.first_view("user:1", 1, window=60)
+    assert store.first_view("user:1", 2, window=60)
+    # Expired entries count as a first view again
+    assert store.first_view("user:2", 1, window=0)
+    assert store.first_view("user:2", 1, window=60)
+    # The least recently seen viewer was evicted to stay at two entries
+    assert store.first_view("user:1", 1, window=60)
+
+
+def test_stored_sketches_accumulate_across_flushes(db, make_post):
+    post = make_post()
+    counters.merge_viewer_sketches(db, {post["id"]: sketch_of(["user:1", "user:2"])})
+    counters.merge_viewer_sketches(db, {post["id"]: sketch_of(["user:2", "user:3"])})
+    db.commit()
+
+    assert db.get(Post, post["id"]).unique_viewer_count == 3
+
+
+def test_repeat_views_count_once_per_viewer(client, monkeypatch, session_factory, make_post):
+    monkeypatch.setattr(view_buffer, "SessionLocal", session_factory)
+    monkeypatch.setattr(view_buffer.view_counter, "dedup_window", 60)
+    post = make_post()
+
+    for viewer_id in (1, 1, 2, 1):
+        client.get(f"/boards/posts/{post['id']}", params={"viewer_id": viewer_id})
+    assert client.get(f"/boards/posts/{post['id']}", params={"viewer_id": 2}).json()["view_count"] == 2
+
+    view_buffer.view_counter.flush()
+    flushed = client.get(f"/boards/posts/{post['id']}", params={"viewer_id": 1}).json()
+    assert flushed["view_count"] == 2
+    assert flushed["unique_viewer_count"] == 2
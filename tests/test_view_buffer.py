@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+from app.community import counters, view_buffer
+from app.community.models import Post
+
+
+@pytest.fixture
+def buffer(monkeypatch, session_factory):
+    monkeypatch.setattr(view_buffer, "SessionLocal", session_factory)
+    buffer = view_buffer.ViewCounterBuffer(
+        view_buffer.MemoryViewStore(dedup_max_entries=100), flush_interval=60, flush_threshold=3
+    )
+    yield buffer
+    buffer.stop()
+
+
+def view_count(session_factory, post_id):
+    session = session_factory()
+    try:
+        return session.get(Post, post_id).view_count
+    finally:
+        session.close()
+
+
+def test_views_are_pending_until_flushed(buffer, session_factory, make_post):
+    post = make_post()
+    buffer.record(post["id"])
+    buffer.record(post["id"])
+
+    assert buffer.pending(post["id"]) == 2
+    assert view_count(session_factory, post["id"]) == 0
+
+    assert buffer.flush() == 1
+    assert buffer.pending(post["id"]) == 0
+    assert view_count(session_factory, post["id"]) == 2
+
+
+def test_full_buffer_is_flushed_by_the_background_flusher(buffer, session_factory, make_post):
+    posts = [make_post() for _ in range(3)]
+    for post in posts:
+        # The threshold counts posts with pending views; record() itself never writes
+        buffer.record(post["id"])
+
+    assert buffer._thread is not None
+    deadline = time.monotonic() + 5
+    while buffer.pending(posts[-1]["id"]) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [view_count(session_factory, post["id"]) for post in posts] == [1, 1, 1]
+
+
+def test_failed_flush_keeps_the_views(buffer, monkeypatch, make_post):
+    post = make_post()
+    buffer.record(post["id"])
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(counters, "apply_post_counter_deltas", fail)
+        with pytest.raises(RuntimeError):
+            buffer.flush()
+    assert buffer.pending(post["id"]) == 1
+
+    buffer.flush()
+    assert buffer.pending(post["id"]) == 0
+
+
+def test_batched_deltas_never_go_below_zero(db, make_post):
+    first, second = make_post(), make_post()
+    counters.apply_post_counter_deltas(db, "view_count", {second["id"]: 4, first["id"]: 2})
+    counters.apply_post_counter_deltas(db, "view_count", {first["id"]: -5, second["id"]: -1})
+    db.commit()
+
+    assert db.get(Post, first["id"]).view_count == 0
+    assert db.get(Post, second["id"]).view_count == 3
+    with pytest.raises(ValueError):
+        counters.apply_post_counter_deltas(db, "title", {first["id"]: 1})
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.action import partitions
+from app.action.models import ViewLog
+
+NOW = datetime(2024, 3, 15, 12, 30, tzinfo=timezone.utc)
+
+
+class RecordingSession:
+    """Stands in for a PostgreSQL session: answers the partition lookup and records every other statement"""
+
+    def __init__(self, attached):
+        self.attached = attached
+        self.statements = []
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if "pg_inherits" in sql:
+            return [(name,) for name in self.attached]
+        self.statements.append(sql)
+        return []
+
+
+def test_month_helpers():
+    assert partitions.month_start(NOW) == datetime(2024, 3, 1, tzinfo=timezone.utc)
+    assert partitions.month_start(datetime(2024, 3, 31, 23, 30)) == datetime(2024, 3, 1, tzinfo=timezone.utc)
+    # Months roll over year boundaries both ways
+    assert partitions.add_months(datetime(2024, 11, 1), 3) == datetime(2025, 2, 1)
+    assert partitions.add_months(datetime(2024, 1, 1), -1) == datetime(2023, 12, 1)
+    assert partitions.partition_name(datetime(2024, 3, 1)) == "view_logs_2024_03"
+
+
+def test_maintain_creates_missing_months_and_drops_expired_ones():
+    db = RecordingSession(["view_logs_2023_12", "view_logs_2024_01", "view_logs_2024_03", "view_logs_default"])
+
+    result = partitions.maintain_partitions(db, retention_months=2, months_ahead=2, now=NOW)
+
+    assert result == {"created": ["view_logs_2024_04", "view_logs_2024_05"], "removed": ["view_logs_2023_12"]}
+    assert db.statements[0] == (
+        "CREATE TABLE IF NOT EXISTS view_logs_2024_04 PARTITION OF view_logs "
+        "FOR VALUES FROM ('2024-04-01T00:00:00+00:00') TO ('2024-05-01T00:00:00+00:00')"
+    )
+    assert db.statements[-1] == "DROP TABLE view_logs_2023_12"
+
+
+def test_maintain_detaches_expired_partitions_for_archiving():
+    db = RecordingSession(["view_logs_2023_12", "view_logs_2024_03"])
+
+    result = partitions.maintain_partitions(db, retention_months=1, months_ahead=0, expired="detach", now=NOW)
+
+    assert result == {"created": [], "removed": ["view_logs_2023_12"]}
+    assert db.statements == ["ALTER TABLE view_logs DETACH PARTITION view_logs_2023_12"]
+
+
+def test_zero_retention_keeps_every_partition():
+    db = RecordingSession(["view_logs_2020_01", "view_logs_2024_03"])
+
+    assert partitions.maintain_partitions(db, retention_months=0, months_ahead=0, now=NOW) == {"created": [], "removed": []}
+    assert db.statements == []
+
+
+@pytest.mark.parametrize("expired", ["archive", "DROP", ""])
+def test_unknown_expired_action_is_rejected_before_any_ddl(expired):
+    db = RecordingSession(["view_logs_2023_12"])
+
+    with pytest.raises(ValueError):
+        partitions.maintain_partitions(db, retention_months=1, months_ahead=1, expired=expired, now=NOW)
+    assert db.statements == []
+
+
+def test_maintain_deletes_expired_rows_without_partitioning(db, user):
+    for view_id, created_at in enumerate([NOW - timedelta(days=70), NOW - timedelta(days=20), NOW], start=1):
+        db.add(ViewLog(id=view_id, user_id=user["id"], target_type="post", target_id=1, created_at=created_at))
+    db.commit()
+
+    result = partitions.maintain_partitions(db, retention_months=1, months_ahead=1, now=NOW)
+    db.commit()
+
+    assert result == {"created": [], "removed": []}
+    # Rows from February onwards are kept; only January's view is gone
+    assert sorted(view.id for view in db.query(ViewLog)) == [2, 3]
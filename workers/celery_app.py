@@ -16,4 +16,22 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
+    beat_schedule={
+        "refresh-post-scores": {
+            "task": "workers.tasks.refresh_post_scores",
+            "schedule": settings.POST_SCORE_REFRESH_INTERVAL,
+        },
+        "reconcile-action-counts": {
+            "task": "workers.tasks.reconcile_action_counts",
+            "schedule": settings.ACTION_COUNT_RECONCILE_INTERVAL,
+        },
+        "rollup-actions": {
+            "task": "workers.tasks.rollup_actions",
+            "schedule": settings.ACTION_ROLLUP_INTERVAL,
+        },
+        "maintain-view-log-partitions": {
+            "task": "workers.tasks.maintain_view_log_partitions",
+            "schedule": settings.VIEW_LOG_PARTITION_INTERVAL,
+        },
+    },
 )
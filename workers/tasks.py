@@ -50,6 +50,15 @@ def cleanup_old_data():
         # Delete all data in reverse dependency order
         tables = [
             "action_logs",
+            "view_logs",
+            "action_counts",
+            "action_rollups_hourly",
+            "action_rollups_daily",
+            "search_postings",
+            "post_scores",
+            "job_states",
+            "ref_cache_versions",
+            "tag_counts",
             "post_tags", 
             "comments",
             "posts",
@@ -78,3 +87,148 @@ def cleanup_old_data():
             "status": "error",
             "message": f"Failed to cleanup data: {str(e)}"
         }
+
+
+@celery_app.task
+def refresh_post_scores():
+    """Re-score posts whose counters changed since the previous run"""
+    try:
+        from datetime import timedelta
+        from sqlalchemy import func
+        from config.config import settings
+        from database import SessionLocal
+        from app.community import ranking
+        from app.jobs.service import JobStateService
+
+        db = SessionLocal()
+        try:
+            # Locking the watermark row keeps overlapping runs from both rescoring the same window
+            state = JobStateService.get_state(db, "refresh_post_scores", for_update=True)
+            started_at = db.query(func.now()).scalar()
+            refreshed = ranking.refresh_scores(db, since=state.last_run_at)
+            # activity_at is the writer's transaction start, so a write that began before this run but
+            # committed after its read carries an older stamp; the next run reaches back over the lag
+            JobStateService.advance(
+                db, state, last_run_at=started_at - timedelta(seconds=settings.POST_SCORE_REFRESH_LAG)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        return {
+            "status": "success",
+            "message": "Post scores refreshed successfully",
+            "refreshed": refreshed
+        }
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Failed to refresh post scores: {str(e)}"
+        }
+
+
+@celery_app.task
+def reconcile_action_counts():
+    """Repair action_counts rows that drifted from action_logs"""
+    try:
+        from database import SessionLocal
+        from app.action import counters
+
+        db = SessionLocal()
+        try:
+            repaired = counters.reconcile_action_counts(db)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        return {
+            "status": "success",
+            "message": "Action counts reconciled successfully",
+            "repaired": repaired
+        }
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Failed to reconcile action counts: {str(e)}"
+        }
+
+
+@celery_app.task
+def rollup_actions():
+    """Fold new action logs into the hourly and daily rollups, one committed batch at a time"""
+    try:
+        from config.config import settings
+        from database import SessionLocal
+        from app.analytics import rollup
+
+        db = SessionLocal()
+        buckets, last_ids = 0, None
+        try:
+            # Keep going until the high-water mark stops moving
+            while True:
+                result = rollup.rollup_actions(
+                    db, lag=settings.ACTION_ROLLUP_LAG, batch_size=settings.ACTION_ROLLUP_BATCH_SIZE
+                )
+                db.commit()
+                buckets += result["buckets"]
+                if result["last_ids"] == last_ids:
+                    break
+                last_ids = result["last_ids"]
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        return {
+            "status": "success",
+            "message": "Action rollups updated successfully",
+            "buckets": buckets,
+            "last_ids": last_ids
+        }
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Failed to roll up actions: {str(e)}"
+        }
+
+
+@celery_app.task
+def maintain_view_log_partitions():
+    """Create upcoming monthly view_logs partitions and drop or detach expired ones"""
+    try:
+        from config.config import settings
+        from database import SessionLocal
+        from app.action import partitions
+
+        db = SessionLocal()
+        try:
+            result = partitions.maintain_partitions(
+                db,
+                retention_months=settings.VIEW_LOG_RETENTION_MONTHS,
+                months_ahead=settings.VIEW_LOG_PARTITIONS_AHEAD,
+                expired=settings.VIEW_LOG_EXPIRED_PARTITIONS
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        return {
+            "status": "success",
+            "message": "View log partitions maintained successfully",
+            **result
+        }
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Failed to maintain view log partitions: {str(e)}"
+        }